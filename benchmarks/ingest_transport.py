@@ -0,0 +1,99 @@
+"""
+Compare ingest throughput of the JSON bulk POST path with the binary WebSocket path.
+
+Both paths run against the real FastAPI app in-process (Starlette TestClient),
+so the numbers include client-side encoding, request handling, validation or
+decoding on the server, and the ingest sink hand-off.
+
+Usage:
+    PYTHONPATH=src:src/cycleroom python benchmarks/ingest_transport.py --frames 20000 --batch 200
+"""
+
+import argparse
+import json
+import random
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.server import app
+from backend.ingest import register_sink, unregister_sink
+from cycleroom.backend.forwarder import serialize_frames
+from cycleroom.backend.keiser_m3_ble_parser import decode_frame, wall_clock_ns
+from cycleroom.backend.wire_format import encode_records
+
+
+def make_records(count, bikes=40, seed=42):
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        payload = bytes([0x02, 0x01, 6, 30, 0x81, i % 100]) + bytes(rng.randrange(256) for _ in range(13))
+        records.append((f"E5:5E:F0:73:{i % bikes:02X}:7A", time.monotonic_ns(), payload))
+    return records
+
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bench_json(client, records, batch_size):
+    started = time.perf_counter()
+    for batch in batched(records, batch_size):
+        frames = [(address, decode_frame(payload, received_ns)) for address, received_ns, payload in batch]
+        response = client.post("/api/bikes/bulk", json=serialize_frames(frames))
+        response.raise_for_status()
+    return time.perf_counter() - started
+
+
+def bench_websocket(client, records, batch_size, counter):
+    started = time.perf_counter()
+    with client.websocket_connect("/ws/ingest") as websocket:
+        for batch in batched(records, batch_size):
+            websocket.send_bytes(encode_records(
+                (address, wall_clock_ns(received_ns), payload) for address, received_ns, payload in batch
+            ))
+        while counter["frames"] < len(records):
+            time.sleep(0.001)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="Emit results as JSON")
+    args = parser.parse_args()
+
+    records = make_records(args.frames)
+    counter = {"frames": 0}
+
+    def count_frames(frames):
+        counter["frames"] += len(frames)
+
+    with TestClient(app) as client:
+        json_seconds = bench_json(client, records, args.batch)
+        register_sink(count_frames)
+        try:
+            ws_seconds = bench_websocket(client, records, args.batch, counter)
+        finally:
+            unregister_sink(count_frames)
+
+    json_bytes = len(json.dumps(serialize_frames([(a, decode_frame(p, t)) for a, t, p in records[:args.batch]])))
+    ws_bytes = len(encode_records((a, t, p) for a, t, p in records[:args.batch]))
+    results = {
+        "frames": args.frames,
+        "batch": args.batch,
+        "json_post": {"frames_per_sec": args.frames / json_seconds, "bytes_per_batch": json_bytes},
+        "websocket_binary": {"frames_per_sec": args.frames / ws_seconds, "bytes_per_batch": ws_bytes},
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name in ("json_post", "websocket_binary"):
+        print(f"{name:>17}: {results[name]['frames_per_sec']:>10,.0f} frames/sec, "
+              f"{results[name]['bytes_per_batch']:>8,} bytes per {args.batch}-frame batch")
+
+
+if __name__ == "__main__":
+    main()
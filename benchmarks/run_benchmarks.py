@@ -0,0 +1,346 @@
+"""
+End-to-end latency and throughput benchmarks for the CycleRoom pipeline.
+
+Synthetic fleets from SimulatedFleetSource are driven through each stage:
+
+    parser     decode_frame() and the NumPy batch decoder
+    scanner    frame-source callback → dedup → decode → queue → consumer
+    forwarder  BatchForwarder → POST /api/bikes/bulk → ingest sinks (in-process ASGI)
+    api        POST /api/bikes/bulk followed by GET /api/bikes
+    race       race.py position computation plus rendering (SDL dummy driver)
+
+Each (stage, bike count) runs in a fresh process so peak RSS is per run. For
+every run we report frames/sec and p50/p95/p99 ingest-to-visible latency in
+milliseconds. The scanner and forwarder stages are paced at the 4 Hz broadcast
+rate, so their frames/sec is the offered load and latency is the figure of
+merit; the other stages run flat out. InfluxDB and TimescaleDB are replaced by the in-memory stand-ins
+in benchmarks/stand_ins.py.
+
+Usage:
+    PYTHONPATH=src:src/cycleroom python benchmarks/run_benchmarks.py \\
+        --bikes 10 50 200 1000 --output bench.json [--compare previous.json]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+STAGES = ["parser", "scanner", "forwarder", "api", "race"]
+DEFAULT_BIKES = [10, 50, 200, 1000]
+RATE_HZ = 4.0
+
+
+def percentiles(latencies_ns):
+    if not latencies_ns:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    p50, p95, p99 = np.percentile(np.asarray(latencies_ns, dtype=np.float64) / 1e6, [50, 95, 99])
+    return {"p50_ms": round(p50, 4), "p95_ms": round(p95, 4), "p99_ms": round(p99, 4)}
+
+
+def fleet_ticks(bikes, ticks, seed=1):
+    """Pre-generate `ticks` broadcast rounds of (address, payload) for the fleet."""
+    from cycleroom.backend.frame_sources import SimulatedFleetSource
+    source = SimulatedFleetSource(bikes=bikes, rate_hz=RATE_HZ, seed=seed)
+    generator = source.generate(ticks)
+    return [[next(generator) for _ in range(bikes)] for _ in range(ticks)]
+
+
+# Stage: parser
+
+def bench_parser(bikes, ticks):
+    from cycleroom.backend.keiser_m3_ble_parser import decode_frame
+    from cycleroom.backend.keiser_m3_batch import decode_keiser_m3_batch
+    rounds = fleet_ticks(bikes, ticks)
+    latencies = []
+    started = time.perf_counter()
+    for tick in rounds:
+        tick_start = time.perf_counter_ns()
+        for _, payload in tick:
+            decode_frame(payload)
+            latencies.append(time.perf_counter_ns() - tick_start)
+    elapsed = time.perf_counter() - started
+
+    payloads = [payload for tick in rounds for _, payload in tick]
+    batch_started = time.perf_counter()
+    decode_keiser_m3_batch(payloads)
+    batch_elapsed = time.perf_counter() - batch_started
+    return {
+        "frames": len(payloads),
+        "frames_per_sec": len(payloads) / elapsed,
+        "batch_frames_per_sec": len(payloads) / batch_elapsed,
+        **percentiles(latencies),
+    }
+
+
+# Stage: scanner callback
+
+class TickSource:
+    """Frame source that replays pre-generated ticks at the broadcast rate."""
+
+    def __init__(self, rounds, rate_hz=RATE_HZ):
+        self.rounds = rounds
+        self.period = 1 / rate_hz
+
+    async def run(self, callback):
+        next_tick = time.monotonic()
+        for tick in self.rounds:
+            for address, payload in tick:
+                callback("M3", address, time.monotonic_ns(), payload)
+            next_tick += self.period
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+
+def bench_scanner(bikes, ticks):
+    from cycleroom.backend.ble_stream import create_frame_queue, drain_queue, stream_keiser_frames
+    from cycleroom.backend.dedup import AdvertisementDeduplicator
+    rounds = fleet_ticks(bikes, ticks)
+    total = bikes * ticks
+    latencies = []
+
+    async def run():
+        queue = create_frame_queue(maxsize=total + 1)
+        consumed = 0
+
+        async def consume():
+            nonlocal consumed
+            while consumed < total:
+                items = await drain_queue(queue)
+                now = time.monotonic_ns()
+                latencies.extend(now - frame.received_ns for _, frame in items)
+                consumed += len(items)
+
+        consumer = asyncio.create_task(consume())
+        started = time.perf_counter()
+        await stream_keiser_frames(queue, AdvertisementDeduplicator(), "M3", source=TickSource(rounds))
+        await consumer
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    return {"frames": total, "frames_per_sec": total / elapsed, **percentiles(latencies)}
+
+
+# Stage: forwarder → bulk ingest
+
+def bench_forwarder(bikes, ticks):
+    import httpx
+    import stand_ins
+    from backend.ingest import register_sink
+    from backend.server import app
+    from cycleroom.backend.forwarder import BatchForwarder
+    from cycleroom.backend.keiser_m3_ble_parser import decode_frame, wall_clock_ns
+    stand_ins.install()
+    rounds = fleet_ticks(bikes, ticks)
+    total = bikes * ticks
+    latencies = []
+
+    def record_latency(frames):
+        now = time.time_ns()
+        latencies.extend(now - int(frame["timestamp"].timestamp() * 1e9) for frame in frames)
+
+    register_sink(record_latency)
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        forwarder = BatchForwarder("http://bench/api/bikes/bulk", client=client)
+        queue = asyncio.Queue()
+        task = asyncio.create_task(forwarder.run(queue))
+        started = time.perf_counter()
+        next_tick = time.monotonic()
+        for tick in rounds:
+            for address, payload in tick:
+                queue.put_nowait((address, decode_frame(payload)))
+            next_tick += 1 / RATE_HZ
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+        while len(latencies) < total:
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - started
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return elapsed
+
+    # Keep the wall-clock conversion warm so it is not attributed to the first tick
+    wall_clock_ns(time.monotonic_ns())
+    elapsed = asyncio.run(run())
+    return {"frames": total, "frames_per_sec": total / elapsed, **percentiles(latencies)}
+
+
+# Stage: /api/bikes ingest and read
+
+def bench_api(bikes, ticks):
+    import httpx
+    import stand_ins
+    from backend.server import app
+    from cycleroom.backend.forwarder import serialize_frames
+    from cycleroom.backend.keiser_m3_ble_parser import decode_frame
+    stand_ins.install()
+    rounds = fleet_ticks(bikes, ticks)
+    latencies = []
+    errors = 0
+
+    async def run():
+        nonlocal errors
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            started = time.perf_counter()
+            for tick in rounds:
+                tick_start = time.perf_counter_ns()
+                payload = serialize_frames([(address, decode_frame(raw)) for address, raw in tick])
+                posted = await client.post("/api/bikes/bulk", json=payload)
+                read = await client.get("/api/bikes")
+                if posted.status_code != 200 or read.status_code != 200:
+                    errors += 1
+                visible = time.perf_counter_ns() - tick_start
+                latencies.extend([visible] * len(tick))
+            return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    total = bikes * ticks
+    return {"frames": total, "frames_per_sec": total / elapsed, "errors": errors, **percentiles(latencies)}
+
+
+# Stage: race.py position computation + rendering
+
+def bench_race(bikes, ticks):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import math
+    import warnings
+    warnings.filterwarnings("ignore")
+    from race import race
+    from cycleroom.backend.keiser_m3_ble_parser import decode_frame
+    race.load_assets()
+    race.WAYPOINTS = [
+        (int(400 + 300 * math.cos(2 * math.pi * i / 360)), int(300 + 200 * math.sin(2 * math.pi * i / 360)))
+        for i in range(360)
+    ]
+    rounds = fleet_ticks(bikes, ticks)
+    latencies = []
+    started = time.perf_counter()
+    for tick in rounds:
+        tick_start = time.perf_counter_ns()
+        race.bike_data = {}
+        for address, payload in tick:
+            frame = decode_frame(payload)
+            race.bike_data[address] = {
+                "speed": 0, "cadence": frame.cadence, "power": frame.power,
+                "trip_distance": frame.trip_distance, "gear": frame.gear,
+            }
+        race.assign_bike_colors()
+        race.screen.fill((0, 0, 0))
+        race.draw_bike_icons()
+        race.draw_leaderboard()
+        race.pygame.display.flip()
+        latencies.append(time.perf_counter_ns() - tick_start)
+    elapsed = time.perf_counter() - started
+    total = bikes * ticks
+    return {
+        "frames": total,
+        "frames_per_sec": total / elapsed,
+        "render_fps": ticks / elapsed,
+        **percentiles(latencies),
+    }
+
+
+BENCHMARKS = {
+    "parser": bench_parser,
+    "scanner": bench_scanner,
+    "forwarder": bench_forwarder,
+    "api": bench_api,
+    "race": bench_race,
+}
+
+
+def _run_in_child(stage, bikes, ticks, conn):
+    import logging
+    logging.disable(logging.CRITICAL)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    try:
+        result = BENCHMARKS[stage](bikes, ticks)
+        result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        conn.send(result)
+    except Exception as e:  # Report and keep the suite going
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_isolated(stage, bikes, ticks):
+    parent, child = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_run_in_child, args=(stage, bikes, ticks, child))
+    process.start()
+    child.close()
+    result = parent.recv() if parent.poll(timeout=600) else {"error": "timeout"}
+    process.join()
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, previous=None):
+    header = f"{'stage':<10}{'bikes':>6}{'frames/s':>14}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MB':>9}"
+    if previous:
+        header += f"{'Δ frames/s':>12}"
+    print(header)
+    for run in results["runs"]:
+        if "error" in run:
+            print(f"{run['stage']:<10}{run['bikes']:>6}  ERROR {run['error']}")
+            continue
+        line = (f"{run['stage']:<10}{run['bikes']:>6}{run['frames_per_sec']:>14,.0f}"
+                f"{run['p50_ms'] or 0:>10.3f}{run['p95_ms'] or 0:>10.3f}{run['p99_ms'] or 0:>10.3f}"
+                f"{run['peak_rss_mb']:>9.1f}")
+        if previous:
+            before = previous.get((run["stage"], run["bikes"]))
+            if before and before.get("frames_per_sec"):
+                change = (run["frames_per_sec"] / before["frames_per_sec"] - 1) * 100
+                line += f"{change:>+11.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CycleRoom pipeline benchmarks")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--bikes", nargs="+", type=int, default=DEFAULT_BIKES)
+    parser.add_argument("--ticks", type=int, default=20, help="Broadcast rounds per run (at 4 Hz)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Previous results JSON to compare frames/sec against")
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ticks": args.ticks,
+        "rate_hz": RATE_HZ,
+        "runs": [],
+    }
+    for stage in args.stages:
+        for bikes in args.bikes:
+            run = {"stage": stage, "bikes": bikes, **run_isolated(stage, bikes, args.ticks)}
+            results["runs"].append(run)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = {(run["stage"], run["bikes"]): run for run in json.load(f)["runs"]}
+    print_table(results, previous)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+In-memory stand-ins for InfluxDB and TimescaleDB used by the benchmark suite.
+
+They are patched into backend.utils.db_utils so the real routes run unchanged
+while storage costs stay out of the measurements. Both stores are fed by an
+ingest sink, the same way the real writers are.
+"""
+
+from backend.ingest import register_sink
+from backend.utils import db_utils
+
+
+class FakeInfluxRecord:
+    def __init__(self, bike_id, field, value):
+        self.values = {"bike_id": bike_id}
+        self._field = field
+        self._value = value
+
+    def get_field(self):
+        return self._field
+
+    def get_value(self):
+        return self._value
+
+    def get_time(self):
+        return None
+
+
+class FakeInfluxTable:
+    def __init__(self, records):
+        self.records = records
+
+
+class InMemoryInflux:
+    """Keeps the last trip_distance per bike and answers the cold-start `last()` query."""
+
+    def __init__(self):
+        self.latest = {}
+
+    def write(self, frames):
+        for frame in frames:
+            self.latest[frame["device_address"]] = frame.get("trip_distance")
+
+    def query(self, org=None, query=None):
+        records = [FakeInfluxRecord(bike_id, "trip_distance", value) for bike_id, value in self.latest.items()]
+        return [FakeInfluxTable(records)]
+
+
+class FakeTimescaleConnection:
+    def __init__(self, store):
+        self.store = store
+
+    async def fetch(self, query, bike_id=None, start=None, end=None, *args):
+        return [row for row in self.store.rows if row["bike_id"] == bike_id]
+
+    async def fetchrow(self, query, *args):
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def execute(self, query, *args):
+        return "OK"
+
+    async def close(self):
+        pass
+
+
+class FakeTimescalePool:
+    """Minimal asyncpg.Pool stand-in handing out FakeTimescaleConnection objects."""
+
+    def __init__(self, store):
+        self.connection = FakeTimescaleConnection(store)
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self.connection
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class InMemoryTimescale:
+    """Append-only list of bike_data rows."""
+
+    def __init__(self):
+        self.rows = []
+
+    def write(self, frames):
+        for frame in frames:
+            self.rows.append({
+                "bike_id": frame["device_address"],
+                "cadence": frame.get("cadence"),
+                "heart_rate": frame.get("heart_rate"),
+                "power": frame.get("power"),
+                "trip_distance": frame.get("trip_distance"),
+                "gear": frame.get("gear"),
+                "timestamp": frame["timestamp"],
+            })
+
+    def pool(self):
+        return FakeTimescalePool(self)
+
+
+def install():
+    """Patch the stand-ins into db_utils and feed them from the ingest path."""
+    influx = InMemoryInflux()
+    timescale = InMemoryTimescale()
+    db_utils.query_api = influx
+    db_utils.timescale_pool = timescale.pool()
+    db_utils.storage = db_utils.ServerStorage()
+    register_sink(influx.write)
+    register_sink(timescale.write)
+    return influx, timescale
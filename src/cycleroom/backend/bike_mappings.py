@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+
+class BikeMappingCache:
+    """
+    In-process copy of the latest bike number → device address selection.
+
+    Loaded once from the DISTINCT ON query and kept current by write-through
+    from `POST /api/bike-selection`, so reads never hit the database. The
+    reverse index gives the ingest path an O(1) device address → bike number
+    lookup; when two bike numbers share an address, the newest selection wins.
+    """
+
+    def __init__(self):
+        self.addresses: Dict[str, str] = {}
+        self.selected_at: Dict[str, Optional[datetime]] = {}
+        self.bike_numbers: Dict[str, str] = {}
+        self.loaded = False
+        self.version = 0
+
+    def set(self, bike_number: str, device_address: str, selected_at: Optional[datetime] = None):
+        """Record a new selection (write-through after the INSERT commits)."""
+        previous = self.addresses.get(bike_number)
+        self.addresses[bike_number] = device_address
+        self.selected_at[bike_number] = selected_at
+        self.bike_numbers[device_address] = bike_number
+        if previous is not None and previous != device_address and self.bike_numbers.get(previous) == bike_number:
+            self._reassign(previous)
+        self.version += 1
+
+    def _reassign(self, device_address: str):
+        """Hand an address to the newest remaining selection of it, or unmap it."""
+        owners = [number for number, address in self.addresses.items() if address == device_address]
+        if not owners:
+            del self.bike_numbers[device_address]
+            return
+        dated = [number for number in owners if self.selected_at.get(number) is not None]
+        self.bike_numbers[device_address] = max(dated, key=self.selected_at.get) if dated else owners[-1]
+
+    def load(self, rows: Iterable[dict]):
+        """Replace the cache with the latest selection per bike number."""
+        self.addresses.clear()
+        self.selected_at.clear()
+        self.bike_numbers.clear()
+        # Oldest first, so the newest selection owns a shared address
+        for row in sorted(rows, key=lambda row: row["date"]):
+            self.set(row["bike_number"], row["device_address"], row["date"])
+        self.loaded = True
+
+    def bike_number_for(self, device_address: str) -> Optional[str]:
+        return self.bike_numbers.get(device_address)
+
+    def mappings(self) -> Dict[str, str]:
+        """Bike number → device address for every known bike."""
+        return dict(self.addresses)
+
+    def annotate(self, frames: list):
+        """Ingest annotator: tag each frame with its bike number (None if unmapped)."""
+        lookup = self.bike_numbers.get
+        for frame in frames:
+            frame["bike_number"] = lookup(frame["device_address"])
+
+
+# Shared bike selection cache for the API process
+bike_mappings = BikeMappingCache()
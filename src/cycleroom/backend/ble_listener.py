@@ -1,51 +1,79 @@
 import asyncio
 import logging
+import os
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from bleak import BleakScanner
-from cycleroom.backend.keiser_m3_ble_parser import KeiserM3BLEBroadcast
+from cycleroom.backend.keiser_m3_ble_parser import decode_frame
+from cycleroom.backend.frame_sources import create_frame_source, run_for
+from cycleroom.backend.dedup import AdvertisementDeduplicator
+from cycleroom.backend.ble_stream import create_frame_queue, drain_queue, stream_keiser_frames
+
+logger = logging.getLogger(__name__)
 
 TARGET_PREFIX = "M3"
 
-async def scan_keiser_bikes(scan_duration=10):
-    # (Same scanning code as before)
+# "stream" keeps one scanner running; "window" uses the legacy scan/sleep loop
+SCAN_MODE = os.getenv("SCAN_MODE", "stream")
+
+# Latest frame per device address, updated by the stream consumer
+latest_frames = {}
+
+# Shared across scan windows so repeats spanning two windows are dropped too
+deduplicator = AdvertisementDeduplicator()
+
+async def scan_keiser_bikes(scan_duration=10, source=None):
     found_bikes = {}
-    def detection_callback(device, advertisement_data):
-        if device.name and device.name.startswith(TARGET_PREFIX):
-            try:
-                parsed_data = KeiserM3BLEBroadcast(advertisement_data.manufacturer_data[0x0645]).to_dict()
-                if parsed_data:
-                    found_bikes[device.address] = parsed_data
-                    logger.info(f"✅ Found Keiser Bike {device.name} ({device.address}) → {parsed_data}")
-            except KeyError as e:
-                logger.info(f"⚠️ Error parsing BLE data from {device.name}: {e}")
-    scanner = BleakScanner(detection_callback)
+    def on_advertisement(name, address, received_ns, payload):
+        if name and name.startswith(TARGET_PREFIX):
+            if deduplicator.is_duplicate(address, payload):
+                return
+            frame = decode_frame(payload, received_ns)
+            found_bikes[address] = frame
+            logger.debug("✅ Found Keiser Bike %s (%s) → %s", name, address, frame)
     logger.info("🔍 Starting BLE scan...")
-    await scanner.start()
-    await asyncio.sleep(scan_duration)
-    await scanner.stop()
-    logger.info(f"🔍 Scan complete. Found {len(found_bikes)} bikes.")
+    await run_for(source or create_frame_source(), on_advertisement, scan_duration)
+    logger.info(f"🔍 Scan complete. Found {len(found_bikes)} bikes. Dedup stats: {deduplicator.stats()}")
     return found_bikes
 
 # Define a continuous scanner that repeatedly scans
 async def continuous_ble_scanner():
+    source = create_frame_source()
     while True:
-        await scan_keiser_bikes()
+        await scan_keiser_bikes(source=source)
         await asyncio.sleep(5)  # wait 5 seconds before next scan
 
+# Consume decoded frames from the streaming scanner as they arrive
+async def consume_frames(queue):
+    while True:
+        for address, frame in await drain_queue(queue):
+            latest_frames[address] = frame
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logging.info("🚀 Starting FastAPI application")
-    scanner_task = asyncio.create_task(continuous_ble_scanner())
+    if SCAN_MODE == "stream":
+        queue = create_frame_queue()
+        tasks = [
+            asyncio.create_task(stream_keiser_frames(queue, deduplicator, TARGET_PREFIX)),
+            asyncio.create_task(consume_frames(queue)),
+        ]
+    else:
+        tasks = [asyncio.create_task(continuous_ble_scanner())]
     yield
-    scanner_task.cancel()
-    try:
-        await scanner_task
-    except asyncio.CancelledError:
-        logging.info("🚦 BLE scanner task cancelled cleanly.")
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            logging.info("🚦 BLE scanner task cancelled cleanly.")
 
 app = FastAPI(lifespan=lifespan)
 
+@app.get("/api/bikes")
+async def get_latest_frames():
+    return {address: frame.to_dict() for address, frame in latest_frames.items()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("ble_listener:app", host="127.0.0.1", port=8002, reload=True)
@@ -1,12 +1,24 @@
 
 import asyncio
+import json
 import logging
-from bleak import BleakScanner
 import httpx
 import os
+from urllib.parse import urlencode
+from cycleroom.backend.dedup import AdvertisementDeduplicator
+from cycleroom.backend.frame_sources import create_frame_source, run_for
+from cycleroom.backend.ble_stream import create_frame_queue, stream_keiser_frames
+from cycleroom.backend.forwarder import BatchForwarder
+from cycleroom.backend.ws_forwarder import WebSocketForwarder, FASTAPI_WS_URL
+from cycleroom.backend.spool import create_spool
+from cycleroom.backend.utils.metrics import metrics, serve_metrics
 
 # FastAPI Endpoint to Send Parsed Data
 FASTAPI_URL = os.getenv("FASTAPI_URL", "http://fastapi-app:8000/api/bikes")
+FASTAPI_BULK_URL = os.getenv("FASTAPI_BULK_URL", FASTAPI_URL.rstrip("/") + "/bulk")
+
+# Room (studio) this scanner covers; empty uses the API's default room
+ROOM = os.getenv("ROOM", "")
 
 # Logger Configuration
 logging.basicConfig(
@@ -18,46 +30,104 @@ logger = logging.getLogger(__name__)
 # Target Device Prefix
 TARGET_PREFIX = os.getenv("TARGET_PREFIX", "M3")
 
+# "stream" keeps one scanner running; "window" uses the legacy scan/sleep loop
+SCAN_MODE = os.getenv("SCAN_MODE", "stream")
+
+# How streamed frames reach FastAPI: "http" (JSON bulk POST) or "websocket" (binary)
+FORWARD_MODE = os.getenv("FORWARD_MODE", "http")
+
+# Seconds between spool backlog reports while undelivered data is waiting
+SPOOL_REPORT_INTERVAL = float(os.getenv("SPOOL_REPORT_INTERVAL", 30))
+
+# Port of the scanner's Prometheus /metrics endpoint; 0 disables it
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9150))
+
+# Drops repeated advertisements before they are stored or sent to FastAPI
+deduplicator = AdvertisementDeduplicator()
+
+# Keeps undelivered data on disk while FastAPI or the network is down
+spool = create_spool()
+if spool is not None:
+    metrics.gauge("cycleroom_scanner_spool_backlog", "Undelivered records waiting in the spool",
+                  fn=lambda: spool.backlog_records)
+
+# Add the Scanner's Room to an Ingest URL
+def room_url(url: str) -> str:
+    if not ROOM:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}{urlencode({'room': ROOM})}"
+
 # BLE Scanning Function
-async def scan_keiser_bikes(scan_duration=10):
+async def scan_keiser_bikes(scan_duration=10, source=None):
     found_bikes = {}
 
-    def detection_callback(device, advertisement_data):
-        if device.name and device.name.startswith(TARGET_PREFIX):
-            try:
-                manufacturer_data = advertisement_data.manufacturer_data.get(0x0645)
-                if manufacturer_data:
-                    parsed_data = {"device_name": device.name, "device_address": device.address}
-                    found_bikes[device.address] = parsed_data
-                    logger.info(f"✅ Found Keiser Bike {device.name} ({device.address}) → {parsed_data}")
-            except KeyError as e:
-                logger.warning(f"⚠️ Error parsing BLE data from {device.name}: {e}")
-
-    scanner = BleakScanner(detection_callback)
+    def on_advertisement(name, address, received_ns, payload):
+        if name and name.startswith(TARGET_PREFIX) and not deduplicator.is_duplicate(address, payload):
+            parsed_data = {"device_name": name, "device_address": address}
+            found_bikes[address] = parsed_data
+            logger.info(f"✅ Found Keiser Bike {name} ({address}) → {parsed_data}")
+
     logger.info("🔍 Starting BLE scan...")
-    await scanner.start()
-    await asyncio.sleep(scan_duration)
-    await scanner.stop()
-    logger.info(f"🔍 Scan complete. Found {len(found_bikes)} bikes.")
+    await run_for(source or create_frame_source(), on_advertisement, scan_duration)
+    logger.info(f"🔍 Scan complete. Found {len(found_bikes)} bikes. Dedup stats: {deduplicator.stats()}")
 
-    await send_data_to_fastapi(found_bikes)
+    if await send_data_to_fastapi(found_bikes):
+        await replay_spooled_windows()
 
 # Send Parsed Data to FastAPI Backend
-async def send_data_to_fastapi(data):
+async def send_data_to_fastapi(data, spool_on_failure=True) -> bool:
     async with httpx.AsyncClient() as client:
         try:
-            response = await client.post(FASTAPI_URL, json=data)
+            response = await client.post(room_url(FASTAPI_URL), json=data)
             if response.status_code == 200:
                 logger.info("✅ Successfully sent BLE data to FastAPI.")
-            else:
-                logger.error(f"❌ Failed to send BLE data. Status Code: {response.status_code}")
+                return True
+            logger.error(f"❌ Failed to send BLE data. Status Code: {response.status_code}")
+            if response.status_code < 500:
+                return False
         except httpx.RequestError as e:
             logger.error(f"❌ Error sending data to FastAPI: {e}")
+    if spool is not None and spool_on_failure:
+        spool.append(json.dumps(data).encode())
+        logger.info(f"📼 Spooled scan window for replay. Backlog: {spool.backlog_records} windows")
+    return False
+
+# Replay Scan Windows Spooled While FastAPI Was Unreachable (oldest first)
+async def replay_spooled_windows():
+    while spool is not None and spool.backlog_records:
+        records = spool.peek(1)
+        if not await send_data_to_fastapi(json.loads(records[0][2]), spool_on_failure=False):
+            return
+        spool.ack(records)
+
+# Log the Spool Backlog While There Is One
+async def report_spool(interval=SPOOL_REPORT_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        if spool.backlog_records:
+            logger.info(f"📼 Spool backlog: {spool.get_stats()}")
 
 # Main BLE Scanner Loop
 async def main():
+    if SCAN_MODE == "stream":
+        queue = create_frame_queue()
+        if FORWARD_MODE == "websocket":
+            forwarder = WebSocketForwarder(room_url(FASTAPI_WS_URL), spool=spool)
+        else:
+            forwarder = BatchForwarder(room_url(FASTAPI_BULK_URL), spool=spool)
+        tasks = [
+            stream_keiser_frames(queue, deduplicator, TARGET_PREFIX, raw=FORWARD_MODE == "websocket"),
+            forwarder.run(queue),
+        ]
+        if spool is not None:
+            tasks.append(report_spool())
+        if METRICS_PORT:
+            tasks.append(serve_metrics(METRICS_PORT))
+        await asyncio.gather(*tasks)
+        return
+    source = create_frame_source()
     while True:
-        await scan_keiser_bikes()
+        await scan_keiser_bikes(source=source)
         await asyncio.sleep(5)  # Scan every 5 seconds
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import os
+import time
+from cycleroom.backend.keiser_m3_ble_parser import decode_frame
+from cycleroom.backend.frame_sources import create_frame_source
+from cycleroom.backend.utils.metrics import metrics, PARSE_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+TARGET_PREFIX = os.getenv("TARGET_PREFIX", "M3")
+FRAME_QUEUE_SIZE = int(os.getenv("FRAME_QUEUE_SIZE", 10000))
+
+# Counters for the streaming scanner
+stream_stats = {"frames_queued": 0, "frames_overflowed": 0}
+
+# Per-device scanner metrics for /metrics
+frames_received = metrics.counter("cycleroom_scanner_frames_received_total",
+                                  "Advertisements received from matching devices", ("device",))
+frames_parsed = metrics.counter("cycleroom_scanner_frames_parsed_total", "Advertisements decoded", ("device",))
+frames_dropped = metrics.counter("cycleroom_scanner_frames_dropped_total",
+                                 "Advertisements dropped before forwarding", ("device", "reason"))
+parse_seconds = metrics.histogram("cycleroom_scanner_parse_seconds", "Time to decode one advertisement",
+                                  buckets=PARSE_BUCKETS)
+
+
+def create_frame_queue(maxsize: int = FRAME_QUEUE_SIZE) -> asyncio.Queue:
+    """Bounded queue of (device_address, KeiserM3Frame) tuples."""
+    queue = asyncio.Queue(maxsize=maxsize)
+    metrics.gauge("cycleroom_scanner_queue_depth", "Frames waiting to be forwarded", fn=queue.qsize)
+    return queue
+
+
+def enqueue_frame(queue: asyncio.Queue, item):
+    """Put an item on the queue, evicting the oldest entry if the queue is full."""
+    try:
+        queue.put_nowait(item)
+    except asyncio.QueueFull:
+        evicted = queue.get_nowait()
+        queue.put_nowait(item)
+        frames_dropped.labels(evicted[0], "overflow").inc()
+        stream_stats["frames_overflowed"] += 1
+    stream_stats["frames_queued"] += 1
+
+
+async def stream_keiser_frames(queue: asyncio.Queue, deduplicator=None, target_prefix: str = TARGET_PREFIX,
+                               raw: bool = False, source=None):
+    """
+    Keep one frame source running (a BleakScanner unless FRAME_SOURCE says
+    otherwise) and push every decoded frame into `queue` as soon as it
+    arrives. Runs until cancelled.
+
+    With `raw=True` the payload is not decoded and (device_address,
+    received_ns, payload) tuples are queued instead, for forwarding over the
+    binary ingest channel.
+    """
+    def on_advertisement(name, address, received_ns, payload):
+        if not (name and name.startswith(target_prefix)):
+            return
+        frames_received.labels(address).inc()
+        if deduplicator is not None and deduplicator.is_duplicate(address, payload):
+            frames_dropped.labels(address, "duplicate").inc()
+            return
+        if raw:
+            enqueue_frame(queue, (address, received_ns, bytes(payload)))
+            return
+        started = time.perf_counter()
+        frame = decode_frame(payload, received_ns)
+        parse_seconds.observe(time.perf_counter() - started)
+        frames_parsed.labels(address).inc()
+        enqueue_frame(queue, (address, frame))
+
+    source = source or create_frame_source()
+    logger.info(f"🔍 Starting continuous scan from {type(source).__name__}...")
+    try:
+        await source.run(on_advertisement)
+    finally:
+        logger.info(f"🛑 Continuous scan stopped. Stats: {stream_stats}")
+
+
+async def drain_queue(queue: asyncio.Queue, max_items: int = 1000) -> list:
+    """Wait for at least one item, then take whatever else is already queued."""
+    items = [await queue.get()]
+    while len(items) < max_items:
+        try:
+            items.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return items
@@ -0,0 +1,35 @@
+from typing import Dict
+
+class AdvertisementDeduplicator:
+    """
+    Per-device last-payload cache used to drop repeated advertisements.
+
+    Keiser bikes re-broadcast the same manufacturer payload many times between
+    metric updates. The payloads are only 17-19 bytes, so comparing them directly
+    is as cheap as hashing and has no collision risk.
+    """
+
+    def __init__(self):
+        self.last_payloads: Dict[str, bytes] = {}
+        self.frames_seen = 0
+        self.frames_dropped = 0
+
+    def is_duplicate(self, address: str, payload: bytes) -> bool:
+        """Record a payload for `address` and return True if it repeats the last one."""
+        self.frames_seen += 1
+        if self.last_payloads.get(address) == payload:
+            self.frames_dropped += 1
+            return True
+        self.last_payloads[address] = bytes(payload)
+        return False
+
+    def forget(self, address: str):
+        """Drop the cached payload for a device (e.g. when it goes out of range)."""
+        self.last_payloads.pop(address, None)
+
+    def stats(self) -> dict:
+        return {
+            "frames_seen": self.frames_seen,
+            "frames_dropped": self.frames_dropped,
+            "devices": len(self.last_payloads),
+        }
@@ -0,0 +1,80 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # The standard library encoder is the fallback
+    orjson = None
+
+RESPONSE_GZIP_MIN_BYTES = int(os.getenv("RESPONSE_GZIP_MIN_BYTES", 1024))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", 6))
+
+# Versions restart at 0 with the process, so ETags carry a per-process token
+PROCESS_TOKEN = f"{os.getpid():x}{time.time_ns():x}"
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """Serialize to compact JSON bytes with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names `etag` (weak comparison, as RFC 9110 requires for GET)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class SerializedSnapshot:
+    """The JSON bytes of one state version, plus a lazily compressed gzip copy."""
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+        self._gzipped = None
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=RESPONSE_GZIP_LEVEL)
+        return self._gzipped
+
+
+class SnapshotCache:
+    """
+    Serialize a versioned state once and share the bytes with every client.
+
+    `get()` only calls `build()` when the version differs from the cached
+    one, so any number of polls between two updates cost one serialization
+    (and at most one gzip) in total.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.version = None
+        self.snapshot: Optional[SerializedSnapshot] = None
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, version, build: Callable[[], object]) -> SerializedSnapshot:
+        if self.snapshot is not None and version == self.version:
+            self.stats["hits"] += 1
+            return self.snapshot
+        self.stats["misses"] += 1
+        self.snapshot = SerializedSnapshot(dumps(build()), f'"{self.name}-{PROCESS_TOKEN}-{version}"')
+        self.version = version
+        return self.snapshot
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Optional
+import httpx
+from cycleroom.backend.spool import SPOOL_DRAIN_RECORDS
+from cycleroom.backend.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+FORWARD_BATCH_SIZE = int(os.getenv("FORWARD_BATCH_SIZE", 200))
+FORWARD_FLUSH_INTERVAL = float(os.getenv("FORWARD_FLUSH_INTERVAL", 0.1))
+FORWARD_MAX_IN_FLIGHT = int(os.getenv("FORWARD_MAX_IN_FLIGHT", 4))
+FORWARD_MAX_RETRIES = int(os.getenv("FORWARD_MAX_RETRIES", 5))
+
+# Shared with the WebSocket forwarder, labelled by transport
+forward_seconds = metrics.histogram("cycleroom_forward_batch_seconds",
+                                    "Time to deliver one batch to the API", ("transport",))
+forwarded_frames = metrics.counter("cycleroom_forward_frames_total",
+                                   "Frames handed to the API, by outcome", ("transport", "outcome"))
+
+
+def serialize_frames(frames) -> list:
+    """Convert (device_address, KeiserM3Frame) tuples into the bulk ingest payload."""
+    payload = []
+    for address, frame in frames:
+        item = frame.to_dict()
+        item["device_address"] = address
+        payload.append(item)
+    return payload
+
+
+class BatchForwarder:
+    """
+    Forwards decoded frames to the FastAPI bulk ingest endpoint.
+
+    Frames are batched by size or time, sent over one persistent pooled
+    httpx client, and retried with exponential backoff. At most
+    `max_in_flight` batches are outstanding at once, so a slow server applies
+    backpressure to the queue instead of stalling the scanner.
+
+    With a `spool`, batches that still fail after the retries are written to
+    disk instead of dropped. A drainer replays them, `drain_records` spooled
+    batches per request, whenever the live queue is empty, so live frames
+    always go first and the backlog catches up at full speed once the server
+    is back.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        batch_size: int = FORWARD_BATCH_SIZE,
+        flush_interval: float = FORWARD_FLUSH_INTERVAL,
+        max_in_flight: int = FORWARD_MAX_IN_FLIGHT,
+        max_retries: int = FORWARD_MAX_RETRIES,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+        client: httpx.AsyncClient = None,
+        spool=None,
+        drain_records: int = SPOOL_DRAIN_RECORDS,
+    ):
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight),
+        )
+        self.spool = spool
+        self.drain_records = drain_records
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._tasks = set()
+        self._latency = forward_seconds.labels("http")
+        self._forwarded = {outcome: forwarded_frames.labels("http", outcome)
+                           for outcome in ("sent", "spooled", "replayed", "dropped")}
+        self.stats = {
+            "batches_sent": 0,
+            "frames_sent": 0,
+            "batches_failed": 0,
+            "frames_dropped": 0,
+            "frames_spooled": 0,
+            "frames_replayed": 0,
+            "retries": 0,
+            "last_batch_latency_ms": 0.0,
+        }
+
+    async def next_batch(self, queue: asyncio.Queue) -> list:
+        """Wait for one frame, then collect more until the batch is full or the flush interval expires."""
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self, queue: asyncio.Queue):
+        """Forward frames from `queue` until cancelled."""
+        drainer = asyncio.create_task(self.drain_spool(queue)) if self.spool is not None else None
+        try:
+            while True:
+                batch = await self.next_batch(queue)
+                await self._in_flight.acquire()
+                task = asyncio.create_task(self._send_and_release(serialize_frames(batch)))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            if drainer is not None:
+                drainer.cancel()
+                await asyncio.gather(drainer, return_exceptions=True)
+            await self.close()
+
+    async def _send_and_release(self, payload: list):
+        try:
+            await self.send_batch(payload)
+        finally:
+            self._in_flight.release()
+
+    async def _post(self, payload: list) -> Optional[int]:
+        """POST once. Returns the status code, or None if the request did not reach the server."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(self.url, json=payload)
+        except httpx.RequestError as e:
+            logger.warning(f"⚠️ Error forwarding {len(payload)} frames: {e}")
+            return None
+        if response.status_code < 300:
+            elapsed = time.perf_counter() - started
+            self.stats["batches_sent"] += 1
+            self.stats["frames_sent"] += len(payload)
+            self.stats["last_batch_latency_ms"] = elapsed * 1000
+            self._latency.observe(elapsed)
+        return response.status_code
+
+    async def send_batch(self, payload: list) -> bool:
+        """POST one batch, retrying transient failures. Returns True once delivered."""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                await asyncio.sleep(min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max))
+            status = await self._post(payload)
+            if status is None:
+                continue
+            if status < 300:
+                self._forwarded["sent"].inc(len(payload))
+                return True
+            if status < 500:
+                logger.error(f"❌ Bulk ingest rejected batch. Status Code: {status}")
+                break
+            logger.warning(f"⚠️ Bulk ingest returned {status} (attempt {attempt + 1})")
+        else:
+            # Still failing after every retry: the server is down, keep the batch on disk
+            if self.spool is not None:
+                self.spool.append(json.dumps(payload).encode())
+                self.stats["frames_spooled"] += len(payload)
+                self._forwarded["spooled"].inc(len(payload))
+                return False
+        self.stats["batches_failed"] += 1
+        self.stats["frames_dropped"] += len(payload)
+        self._forwarded["dropped"].inc(len(payload))
+        return False
+
+    async def drain_spool(self, queue: asyncio.Queue):
+        """Replay spooled batches while the live queue is idle, backing off while the server is down."""
+        failures = 0
+        while True:
+            await self.spool.has_backlog.wait()
+            if not queue.empty():
+                await asyncio.sleep(self.flush_interval)
+                continue
+            records = self.spool.peek(self.drain_records)
+            payload = [frame for _, _, data in records for frame in json.loads(data)]
+            async with self._in_flight:
+                status = await self._post(payload)
+            if status is not None and status < 500:
+                if status >= 300:
+                    logger.error(f"❌ Bulk ingest rejected {len(payload)} spooled frames. Status Code: {status}")
+                    self.stats["frames_dropped"] += len(payload)
+                    self._forwarded["dropped"].inc(len(payload))
+                else:
+                    self.stats["frames_replayed"] += len(payload)
+                    self._forwarded["replayed"].inc(len(payload))
+                self.spool.ack(records)
+                failures = 0
+                continue
+            await asyncio.sleep(min(self.backoff_base * 2 ** failures, self.backoff_max))
+            failures += 1
+
+    async def close(self):
+        """Wait for in-flight batches and close the pooled client."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.client.aclose()
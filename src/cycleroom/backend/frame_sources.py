@@ -0,0 +1,201 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from bleak import BleakScanner
+from cycleroom.backend.keiser_m3_ble_parser import FRAME_STRUCT
+
+logger = logging.getLogger(__name__)
+
+KEISER_MANUFACTURER_ID = 0x0645
+
+# Frame source selection: "bleak" (live), "replay" (capture file) or "simulator"
+FRAME_SOURCE = os.getenv("FRAME_SOURCE", "bleak")
+REPLAY_FILE = os.getenv("REPLAY_FILE", "filtered_output.json")
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", 1.0))
+SIM_BIKES = int(os.getenv("SIM_BIKES", 20))
+SIM_RATE_HZ = float(os.getenv("SIM_RATE_HZ", 4.0))
+
+
+class FrameSource(ABC):
+    """
+    Produces raw Keiser advertisements.
+
+    `run(callback)` calls `callback(device_name, device_address, received_ns,
+    payload)` for every advertisement until cancelled (or, for finite sources,
+    until exhausted). `received_ns` is on the monotonic clock.
+    """
+
+    @abstractmethod
+    async def run(self, callback):
+        """Deliver advertisements to `callback` until cancelled or exhausted."""
+
+
+class BleakFrameSource(FrameSource):
+    """Live advertisements from a BleakScanner."""
+
+    def __init__(self, manufacturer_id: int = KEISER_MANUFACTURER_ID):
+        self.manufacturer_id = manufacturer_id
+
+    async def run(self, callback):
+        def detection_callback(device, advertisement_data):
+            payload = advertisement_data.manufacturer_data.get(self.manufacturer_id)
+            if payload:
+                callback(device.name, device.address, time.monotonic_ns(), payload)
+
+        scanner = BleakScanner(detection_callback)
+        await scanner.start()
+        try:
+            await asyncio.Future()  # Run until cancelled
+        finally:
+            await scanner.stop()
+
+
+class ReplayFrameSource(FrameSource):
+    """
+    Replays a Bluetooth capture in the JSON format produced by the sensor
+    logger app (records with `id`, `manufacturerData` as hex and
+    `seconds_elapsed`), as used by utils/import_json.py.
+
+    `speed` scales the original timing (2.0 replays twice as fast); a speed of
+    0 replays as fast as possible. The replay position is kept across calls
+    of `run()`, so the legacy scan/sleep loop continues the recording window
+    after window instead of starting over.
+    """
+
+    def __init__(self, path: str = REPLAY_FILE, speed: float = REPLAY_SPEED, loop: bool = False, device_name: str = "M3"):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.device_name = device_name
+        self.records = None
+        self.position = 0
+
+    def load_records(self) -> list:
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        records = []
+        for entry in data:
+            payload_hex = entry.get("manufacturerData", "").strip()
+            try:
+                payload = bytes.fromhex(payload_hex)
+            except ValueError:
+                continue
+            if payload:
+                records.append((float(entry.get("seconds_elapsed", 0)), entry.get("id", "UNKNOWN_DEVICE"), payload))
+        records.sort(key=lambda record: record[0])
+        return records
+
+    async def run(self, callback):
+        if self.records is None:
+            self.records = self.load_records()
+            logger.info(f"📼 Replaying {len(self.records)} advertisements from {self.path}")
+        records = self.records
+        while records:
+            if self.position < len(records):
+                started = time.monotonic()
+                first_elapsed = records[self.position][0]
+                while self.position < len(records):
+                    elapsed, address, payload = records[self.position]
+                    if self.speed > 0:
+                        delay = started + (elapsed - first_elapsed) / self.speed - time.monotonic()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    callback(self.device_name, address, time.monotonic_ns(), payload)
+                    self.position += 1
+            if not self.loop:
+                break
+            self.position = 0
+            await asyncio.sleep(0)
+
+
+class SimulatedBike:
+    """State of one virtual M3 bike; `step()` advances it and returns a payload."""
+
+    def __init__(self, index: int, rng: random.Random):
+        self.index = index
+        self.rng = rng
+        self.address = f"SI:M0:00:00:{index // 256:02X}:{index % 256:02X}"
+        self.base_cadence = rng.uniform(70, 100)
+        self.interval_period = rng.uniform(60, 240)  # Seconds per effort cycle
+        self.phase = rng.uniform(0, 2 * math.pi)
+        self.gear = rng.randint(8, 16)
+        self.elapsed = 0.0
+        self.distance = 0.0  # Miles
+        self.calories = 0.0
+        self.heart_rate = rng.uniform(70, 90)
+
+    def step(self, dt: float) -> bytes:
+        self.elapsed += dt
+        effort = math.sin(2 * math.pi * self.elapsed / self.interval_period + self.phase)
+        if self.rng.random() < dt / 30:  # Occasional gear change
+            self.gear = min(24, max(1, self.gear + self.rng.choice((-1, 1))))
+        cadence = max(0.0, self.base_cadence + 15 * effort + self.rng.gauss(0, 2))
+        power = max(0.0, 0.02 * cadence ** 2 * (self.gear / 12) ** 1.5 + self.rng.gauss(0, 5))
+        speed_mph = 3.6 * power ** (1 / 3)
+        target_hr = 65 + 0.35 * power
+        self.heart_rate += (target_hr - self.heart_rate) * min(1.0, dt / 20)
+        self.distance += speed_mph * dt / 3600
+        self.calories += power * dt / 1000  # kJ of work ≈ kcal burned
+        duration = int(self.elapsed)
+        body = FRAME_STRUCT.pack(
+            6, 30, 0, (self.index % 255) + 1,
+            min(int(cadence * 10), 0xFFFF),
+            min(int(self.heart_rate * 10), 0xFFFF),
+            min(int(power), 0xFFFF),
+            min(int(self.calories), 0xFFFF),
+            (duration // 60) % 256, duration % 60,
+            int(self.distance * 10) & 0x7FFF,
+            self.gear,
+        )
+        return b"\x02\x01" + body
+
+
+class SimulatedFleetSource(FrameSource):
+    """Synthetic fleet of `bikes` M3 bikes, each broadcasting at `rate_hz`."""
+
+    def __init__(self, bikes: int = SIM_BIKES, rate_hz: float = SIM_RATE_HZ, seed: int = None, device_name: str = "M3"):
+        rng = random.Random(seed)
+        self.rate_hz = rate_hz
+        self.device_name = device_name
+        self.bikes = [SimulatedBike(index, rng) for index in range(bikes)]
+
+    def generate(self, ticks: int):
+        """Yield (device_address, payload) for `ticks` broadcast rounds without sleeping."""
+        dt = 1 / self.rate_hz
+        for _ in range(ticks):
+            for bike in self.bikes:
+                yield bike.address, bike.step(dt)
+
+    async def run(self, callback):
+        logger.info(f"🤖 Simulating {len(self.bikes)} bikes at {self.rate_hz} Hz")
+        period = 1 / self.rate_hz
+        next_tick = time.monotonic()
+        while True:
+            for bike in self.bikes:
+                callback(self.device_name, bike.address, time.monotonic_ns(), bike.step(period))
+            next_tick += period
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+
+async def run_for(source: FrameSource, callback, duration: float):
+    """Run a frame source for a fixed window (used by the legacy scan/sleep loop)."""
+    try:
+        await asyncio.wait_for(source.run(callback), duration)
+    except asyncio.TimeoutError:
+        pass
+
+
+def create_frame_source(kind: str = FRAME_SOURCE) -> FrameSource:
+    """Build the frame source selected by FRAME_SOURCE."""
+    if kind == "bleak":
+        return BleakFrameSource()
+    if kind == "replay":
+        return ReplayFrameSource()
+    if kind == "simulator":
+        return SimulatedFleetSource()
+    raise ValueError(f"Unknown frame source: {kind}")
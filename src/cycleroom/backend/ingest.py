@@ -0,0 +1,75 @@
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from backend.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Room of frames whose scanner does not name one
+DEFAULT_ROOM = os.getenv("DEFAULT_ROOM", "default")
+
+# Sinks receive every accepted batch of frame dicts. They are called inline on
+# the event loop, so they must only hand the batch off (e.g. to a queue).
+_sinks: List[Callable[[list], None]] = []
+
+# Annotators run before the sinks and may add keys to each frame dict in place
+_annotators: List[Callable[[list], None]] = []
+
+# Running ingest counters
+ingest_stats = {"batches": 0, "frames": 0, "sink_errors": 0}
+
+# Per-device ingest metrics for /metrics
+frames_ingested = metrics.counter("cycleroom_ingest_frames_total", "Frames received by the ingest endpoints",
+                                  ("device",))
+frames_dropped = metrics.counter("cycleroom_ingest_frames_dropped_total", "Frames the API discarded",
+                                 ("device", "reason"))
+
+
+def epoch_seconds(timestamp) -> float:
+    """Seconds since the epoch of a frame timestamp (datetime, ISO string or number; naive is UTC)."""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def register_sink(sink: Callable[[list], None]):
+    """Register a callable that receives each ingested batch of frames."""
+    _sinks.append(sink)
+
+
+def unregister_sink(sink: Callable[[list], None]):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def register_annotator(annotator: Callable[[list], None]):
+    """Register a callable that enriches each batch before any sink sees it."""
+    _annotators.append(annotator)
+
+
+def ingest_frames(frames: list, room: Optional[str] = None) -> int:
+    """
+    Hand a batch of decoded frame dicts to every registered sink.
+
+    Frames without a "room" key are tagged with `room` (DEFAULT_ROOM if None).
+    """
+    ingest_stats["batches"] += 1
+    ingest_stats["frames"] += len(frames)
+    room = room or DEFAULT_ROOM
+    for frame in frames:
+        if not frame.get("room"):
+            frame["room"] = room
+        frames_ingested.labels(frame.get("device_address")).inc()
+    for sink in _annotators + _sinks:
+        try:
+            sink(frames)
+        except Exception as e:
+            ingest_stats["sink_errors"] += 1
+            logger.error(f"❌ Ingest sink {sink!r} failed: {e}")
+    return len(frames)
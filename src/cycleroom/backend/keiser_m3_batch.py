@@ -0,0 +1,111 @@
+import numpy as np
+from cycleroom.backend.keiser_m3_ble_parser import FRAME_LENGTH, PREFIX_LENGTH
+
+# Columnar layout for decoded frames. Integer fields keep their wire width where
+# possible; cadence, heart rate and distance are scaled to floats like the scalar
+# parser. `interval` is -1 where the scalar parser leaves it as None
+# (data_type == 128), and `length` is the number of payload bytes actually
+# present so short frames (which are zero-filled) can be filtered out.
+KEISER_M3_DTYPE = np.dtype([
+    ("build_major", np.uint8),
+    ("build_minor", np.uint8),
+    ("data_type", np.uint8),
+    ("ordinal_id", np.uint8),
+    ("interval", np.int16),
+    ("real_time", np.bool_),
+    ("cadence", np.float64),
+    ("heart_rate", np.float64),
+    ("power", np.uint16),
+    ("caloric_burn", np.uint16),
+    ("duration", np.int32),
+    ("trip_distance", np.float64),
+    ("gear", np.uint8),
+    ("length", np.uint8),
+])
+
+_COLUMNS = np.arange(FRAME_LENGTH)
+
+
+def _u16(raw, low):
+    """Combine two little-endian byte columns into one uint16 column."""
+    return raw[:, low].astype(np.uint16) | (raw[:, low + 1].astype(np.uint16) << 8)
+
+
+def decode_keiser_m3_blob(blob, offsets, lengths=None):
+    """
+    Decode many Keiser M3 manufacturer-data payloads packed into one buffer.
+
+    Args:
+        blob: bytes-like object holding the payloads back to back.
+        offsets: start offset of each payload inside `blob`.
+        lengths: length of each payload. When omitted, each payload is assumed to
+            run up to the next offset (the last one up to the end of `blob`).
+
+    Returns:
+        A structured array with dtype KEISER_M3_DTYPE, one row per payload.
+    """
+    buf = np.frombuffer(blob, dtype=np.uint8)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    count = len(offsets)
+    if lengths is None:
+        ends = np.append(offsets[1:], len(buf))
+        lengths = ends - offsets
+    else:
+        lengths = np.asarray(lengths, dtype=np.int64)
+
+    # ✅ Trim the 2-byte prefix on long frames, then gather into a (count, 17) matrix
+    trim = np.where(lengths > FRAME_LENGTH, PREFIX_LENGTH, 0)
+    starts = offsets + trim
+    present = np.clip(lengths - trim, 0, FRAME_LENGTH)
+    mask = _COLUMNS < present[:, None]
+    raw = np.zeros((count, FRAME_LENGTH), dtype=np.uint8)
+    raw[mask] = buf[(starts[:, None] + _COLUMNS)[mask]]
+
+    out = np.zeros(count, dtype=KEISER_M3_DTYPE)
+    out["build_major"] = raw[:, 0]
+    out["build_minor"] = raw[:, 1]
+    data_type = raw[:, 2]
+    out["data_type"] = data_type
+    out["ordinal_id"] = raw[:, 3]
+    out["cadence"] = _u16(raw, 4) / 10  # Convert to RPM
+    out["heart_rate"] = _u16(raw, 6) / 10  # Convert to BPM
+    out["power"] = _u16(raw, 8)
+    out["caloric_burn"] = _u16(raw, 10)
+    out["duration"] = raw[:, 12].astype(np.int32) * 60 + raw[:, 13]
+    out["gear"] = raw[:, 16]
+    out["length"] = present
+
+    # ✅ Determine real-time or review mode
+    review = (data_type > 0) & (data_type < 128)
+    live = (data_type > 128) & (data_type < 255)
+    out["interval"] = np.select(
+        [(data_type == 0) | (data_type == 255), review, live],
+        [0, data_type, data_type.astype(np.int16) - 128],
+        default=-1,
+    )
+    out["real_time"] = (data_type == 0) | live
+
+    # ✅ Convert tripDistance to miles (MSB set → value is in KM)
+    distance = _u16(raw, 14)
+    in_km = (distance & 0x8000) != 0
+    out["trip_distance"] = np.where(
+        in_km,
+        ((distance & 0x7FFF) * 0.62137119) / 10.0,
+        distance / 10.0,
+    )
+    return out
+
+
+def decode_keiser_m3_batch(frames):
+    """
+    Decode a sequence of raw Keiser M3 manufacturer-data buffers at once.
+
+    Produces the same values as KeiserM3BLEBroadcast. Frames shorter than 17
+    bytes (after the prefix trim) are zero-filled like the scalar parser does;
+    check the `length` column to filter them out.
+    """
+    lengths = np.fromiter((len(frame) for frame in frames), dtype=np.int64, count=len(frames))
+    offsets = np.zeros(len(frames), dtype=np.int64)
+    if len(frames) > 1:
+        np.cumsum(lengths[:-1], out=offsets[1:])
+    return decode_keiser_m3_blob(b"".join(frames), offsets, lengths)
@@ -1,93 +1,109 @@
 import struct
+import time
 from datetime import datetime, timezone
+from typing import NamedTuple, Optional
 
-class KeiserM3BLEBroadcast:
-    def __init__(self, manufacture_data: bytes):
-        """Parses Keiser M3 BLE advertisement data into structured format."""
-        if len(manufacture_data) > 17:
-            manufacture_data = manufacture_data[2:]  # Trim first 2 bytes
-
-        self.build_major = None
-        self.build_minor = None
-        self.data_type = None
-        self.ordinal_id = 0
-        self.interval = None
-        self.real_time = False
-        self.cadence = None
-        self.heart_rate = None
-        self.power = None
-        self.caloric_burn = None
-        self.duration = None
-        self.trip_distance = None
-        self.gear = None
-        temp_distance = None
-
-        for index, byte in enumerate(manufacture_data):
-            self.build_major, self.build_minor, self.data_type = struct.unpack(">BBB", manufacture_data[:3])
-                self.build_major = byte
-            elif index == 1:
-                self.build_minor = byte
-            elif index == 2:
-                self.data_type = byte
-            elif index == 3:
-                self.ordinal_id = byte
-            elif index == 4:
-                self.cadence = byte
-            elif index == 5:
-                self.cadence = (byte << 8) | self.cadence
-            elif index == 6:
-                self.heart_rate = byte
-            elif index == 7:
-                self.heart_rate = (byte << 8) | self.heart_rate
-            elif index == 8:
-                self.power = byte
-            elif index == 9:
-                self.power = (byte << 8) | self.power
-            elif index == 10:
-                self.caloric_burn = byte
-            elif index == 11:
-                self.caloric_burn = (byte << 8) | self.caloric_burn
-            elif index == 12:
-                self.duration = byte * 60  # Convert minutes to seconds
-            elif index == 13:
-                self.duration += byte  # Add seconds
-            elif index == 14:
-                temp_distance = byte
-            elif index == 15:
-                temp_distance = (byte << 8) | temp_distance
-            elif index == 16:
-                self.gear = byte
-
-        # ✅ Convert cadence and heart rate
-        if self.cadence is not None:
-            self.cadence /= 10  # Convert to RPM
-        if self.heart_rate is not None:
-            self.heart_rate /= 10  # Convert to BPM
-
-        # ✅ Determine real-time or review mode
-        if self.data_type in [0, 255]:
-            self.interval = 0
-        elif 0 < self.data_type < 128:
-            self.interval = self.data_type
-        elif 128 < self.data_type < 255:
-            self.interval = self.data_type - 128
-
-        self.real_time = self.data_type == 0 or (128 < self.data_type < 255)
-
-        # ✅ Convert tripDistance to miles/km
-        if temp_distance is not None:
-            if temp_distance & 32768 != 0:  # MSB is 1 → Distance in KM, convert to Miles
-                self.trip_distance = ((temp_distance & 32767) * 0.62137119) / 10.0
-            else:
-                self.trip_distance = temp_distance / 10.0  # Already in miles
-
-        # ✅ Timestamp
-        self.timestamp = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
+# Keiser M3 frame layout (after the optional 2-byte prefix is trimmed)
+FRAME_LENGTH = 17
+PREFIX_LENGTH = 2
+
+# build_major, build_minor, data_type, ordinal_id, cadence, heart_rate, power,
+# caloric_burn, duration (minutes), duration (seconds), trip_distance, gear
+FRAME_STRUCT = struct.Struct("<4B4H2BHB")
+
+# Offset between the monotonic clock and wall-clock time, so that receive
+# timestamps are only converted when they leave the process. The two clocks
+# drift apart (NTP slewing, suspend), so the offset is re-read once it is
+# older than WALL_CLOCK_RESYNC_NS.
+WALL_CLOCK_RESYNC_NS = 10_000_000_000
+_wall_clock_synced_ns = time.monotonic_ns()
+_wall_clock_offset_ns = time.time_ns() - _wall_clock_synced_ns
+
+
+def wall_clock_offset_ns() -> int:
+    """Current wall clock minus monotonic clock, in nanoseconds."""
+    global _wall_clock_synced_ns, _wall_clock_offset_ns
+    now = time.monotonic_ns()
+    if now - _wall_clock_synced_ns >= WALL_CLOCK_RESYNC_NS:
+        _wall_clock_offset_ns = time.time_ns() - now
+        _wall_clock_synced_ns = now
+    return _wall_clock_offset_ns
+
+
+def wall_clock_ns(received_ns: int) -> int:
+    """Convert a monotonic receive timestamp into nanoseconds since the epoch."""
+    return received_ns + wall_clock_offset_ns()
+
+
+def monotonic_ns_from_wall_clock(wall_ns: int) -> int:
+    """Convert nanoseconds since the epoch into this process's monotonic clock."""
+    return wall_ns - wall_clock_offset_ns()
+
+
+def format_timestamp(received_ns: int) -> str:
+    """Format a monotonic receive timestamp as an ISO 8601 UTC string."""
+    return datetime.fromtimestamp(wall_clock_ns(received_ns) / 1e9, tz=timezone.utc).isoformat()
+
+
+class KeiserM3Frame(NamedTuple):
+    """Compact decoded Keiser M3 frame holding the raw wire values."""
+    received_ns: int
+    build_major: int
+    build_minor: int
+    data_type: int
+    ordinal_id: int
+    cadence_raw: int
+    heart_rate_raw: int
+    power: int
+    caloric_burn: int
+    duration_minutes: int
+    duration_seconds: int
+    distance_raw: int
+    gear: int
+
+    @property
+    def cadence(self) -> float:
+        return self.cadence_raw / 10  # Convert to RPM
+
+    @property
+    def heart_rate(self) -> float:
+        return self.heart_rate_raw / 10  # Convert to BPM
+
+    @property
+    def duration(self) -> int:
+        return self.duration_minutes * 60 + self.duration_seconds
+
+    @property
+    def interval(self) -> Optional[int]:
+        if self.data_type in (0, 255):
+            return 0
+        if 0 < self.data_type < 128:
+            return self.data_type
+        if 128 < self.data_type < 255:
+            return self.data_type - 128
+        return None
+
+    @property
+    def real_time(self) -> bool:
+        return self.data_type == 0 or (128 < self.data_type < 255)
+
+    @property
+    def trip_distance(self) -> float:
+        if self.distance_raw & 32768 != 0:  # MSB is 1 → Distance in KM, convert to Miles
+            return ((self.distance_raw & 32767) * 0.62137119) / 10.0
+        return self.distance_raw / 10.0  # Already in miles
+
+    @property
+    def timestamp(self) -> str:
+        return format_timestamp(self.received_ns)
 
     def to_dict(self):
-        """Convert parsed data to a dictionary."""
+        """Convert the frame to the JSON-friendly dictionary used by the API."""
+        return {"timestamp": self.timestamp, **self.metrics()}
+
+    def metrics(self):
+        """Decoded metrics without the timestamp."""
         return {
-            "timestamp": self.timestamp,
             "build_major": self.build_major,
             "build_minor": self.build_minor,
             "data_type": self.data_type,
@@ -102,3 +118,45 @@ class KeiserM3BLEBroadcast:
             "trip_distance": self.trip_distance,
             "gear": self.gear,
         }
+
+
+def decode_frame(manufacture_data, received_ns: Optional[int] = None) -> KeiserM3Frame:
+    """
+    Decode one Keiser M3 advertisement with a single struct unpack.
+
+    Frames longer than 17 bytes have their 2-byte prefix trimmed; shorter frames
+    are zero-filled. `received_ns` defaults to the current monotonic clock.
+    """
+    view = memoryview(manufacture_data)
+    if len(view) > FRAME_LENGTH:
+        view = view[PREFIX_LENGTH:]  # Trim first 2 bytes
+    if len(view) < FRAME_LENGTH:
+        view = memoryview(bytes(view).ljust(FRAME_LENGTH, b"\x00"))
+    if received_ns is None:
+        received_ns = time.monotonic_ns()
+    return KeiserM3Frame(received_ns, *FRAME_STRUCT.unpack_from(view))
+
+
+class KeiserM3BLEBroadcast:
+    def __init__(self, manufacture_data: bytes):
+        """Parses Keiser M3 BLE advertisement data into structured format."""
+        frame = decode_frame(manufacture_data)
+        self.frame = frame
+        self.build_major = frame.build_major
+        self.build_minor = frame.build_minor
+        self.data_type = frame.data_type
+        self.ordinal_id = frame.ordinal_id
+        self.interval = frame.interval
+        self.real_time = frame.real_time
+        self.cadence = frame.cadence
+        self.heart_rate = frame.heart_rate
+        self.power = frame.power
+        self.caloric_burn = frame.caloric_burn
+        self.duration = frame.duration
+        self.trip_distance = frame.trip_distance
+        self.gear = frame.gear
+        self.timestamp = frame.timestamp
+
+    def to_dict(self):
+        """Convert parsed data to a dictionary (compatibility shim over KeiserM3Frame)."""
+        return self.frame.to_dict()
@@ -0,0 +1,138 @@
+import os
+from collections import deque
+from typing import Dict, List, Optional
+
+from backend.utils.ranked_set import RankedSet
+
+LEADERBOARD_MAX_K = int(os.getenv("LEADERBOARD_MAX_K", 100))
+# Rank change events kept for clients catching up with events_since()
+LEADERBOARD_EVENT_HISTORY = int(os.getenv("LEADERBOARD_EVENT_HISTORY", 1000))
+
+
+class Leaderboard:
+    """
+    Riders ranked by trip distance, kept sorted as frames arrive.
+
+    Each rider's key (-distance, bike id) lives in a RankedSet, so a new
+    distance is one O(log n) remove and insert, and top-k, a rider's rank and
+    the gap to the rider ahead cost O(log n + k) instead of a full sort per
+    request. Every move publishes a rank change event naming the riders that
+    were passed.
+    """
+
+    def __init__(self, history: int = LEADERBOARD_EVENT_HISTORY):
+        self.ranking = RankedSet()
+        self.keys: Dict[str, tuple] = {}
+        self.bike_numbers: Dict[str, Optional[str]] = {}
+        self.version = 0
+        self.seq = 0
+        # (seq, event), oldest first
+        self.events: deque = deque(maxlen=history)
+
+    def __len__(self) -> int:
+        return len(self.ranking)
+
+    def update(self, frames: list):
+        """Ingest sink: re-rank every rider whose distance changed."""
+        changed = False
+        for frame in frames:
+            distance = frame.get("trip_distance")
+            if distance is None:
+                continue
+            bike_id = frame["device_address"]
+            self.bike_numbers[bike_id] = frame.get("bike_number")
+            key = (-distance, bike_id)
+            previous = self.keys.get(bike_id)
+            if key == previous:
+                continue
+            previous_rank = None
+            if previous is not None:
+                previous_rank = self.ranking.rank(previous)
+                self.ranking.remove(previous)
+            self.ranking.insert(key)
+            self.keys[bike_id] = key
+            changed = True
+            rank = self.ranking.rank(key)
+            if rank != previous_rank:
+                self._publish(bike_id, rank, previous_rank)
+        if changed:
+            self.version += 1
+
+    def _publish(self, bike_id: str, rank: int, previous_rank: Optional[int]):
+        event = {
+            "type": "rank_change",
+            "bike_id": bike_id,
+            "bike_number": self.bike_numbers.get(bike_id),
+            "rank": rank + 1,
+            "previous_rank": previous_rank + 1 if previous_rank is not None else None,
+        }
+        if previous_rank is not None and rank < previous_rank:
+            event["passed"] = [key[1] for key in self.ranking.slice(rank + 1, previous_rank - rank)]
+        elif previous_rank is not None:
+            event["passed_by"] = [key[1] for key in self.ranking.slice(previous_rank, rank - previous_rank)]
+        self.seq += 1
+        self.events.append((self.seq, event))
+
+    def _entry(self, rank: int, key: tuple, ahead: Optional[tuple]) -> dict:
+        return {
+            "rank": rank + 1,
+            "bike_id": key[1],
+            "bike_number": self.bike_numbers.get(key[1]),
+            "distance": -key[0],
+            "gap": key[0] - ahead[0] if ahead is not None else None,
+        }
+
+    def top(self, k: int, start: int = 0) -> List[dict]:
+        """Riders ranked `start + 1` to `start + k`, each with the gap to the rider ahead."""
+        entries = []
+        ahead = self.ranking[start - 1] if 0 < start <= len(self.ranking) else None
+        for rank, key in enumerate(self.ranking.slice(start, k), start=start):
+            entries.append(self._entry(rank, key, ahead))
+            ahead = key
+        return entries
+
+    def position(self, bike_id: str) -> Optional[dict]:
+        """A rider's rank, distance, gap to the rider ahead and who is ahead / behind."""
+        key = self.keys.get(bike_id)
+        if key is None:
+            return None
+        rank = self.ranking.rank(key)
+        ahead = self.ranking[rank - 1] if rank > 0 else None
+        behind = self.ranking[rank + 1] if rank + 1 < len(self.ranking) else None
+        return {
+            **self._entry(rank, key, ahead),
+            "riders": len(self.ranking),
+            "ahead": ahead[1] if ahead is not None else None,
+            "behind": behind[1] if behind is not None else None,
+        }
+
+    def events_since(self, seq: int) -> List[dict]:
+        """Rank change events after `seq`, oldest first (older ones may have been dropped)."""
+        events = []
+        for event_seq, event in reversed(self.events):
+            if event_seq <= seq:
+                break
+            events.append(event)
+        events.reverse()
+        return events
+
+    def remove(self, bike_id: str) -> bool:
+        key = self.keys.pop(bike_id, None)
+        if key is None:
+            return False
+        self.ranking.remove(key)
+        self.bike_numbers.pop(bike_id, None)
+        self.version += 1
+        return True
+
+    def reset(self):
+        """Forget every rider (e.g. before a new race). Event sequence numbers keep counting."""
+        self.ranking = RankedSet()
+        self.keys.clear()
+        self.bike_numbers.clear()
+        self.events.clear()
+        self.version += 1
+
+
+# Shared leaderboard for the API process
+leaderboard = Leaderboard()
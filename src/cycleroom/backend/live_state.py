@@ -0,0 +1,117 @@
+import os
+import time
+from typing import Callable, Dict, List, Optional
+
+from backend.ingest import epoch_seconds
+
+LIVE_STATE_TTL = float(os.getenv("LIVE_STATE_TTL", 30))
+
+
+class LiveStateStore:
+    """
+    Process-local table of the latest frame per bike.
+
+    The ingest path calls `update()` for every accepted batch. A frame older
+    than the one held for its bike (e.g. replayed from a scanner's spool
+    after an outage) is ignored. Each bike expires `ttl` seconds after its
+    last frame. `snapshot()` is cached per
+    version, so repeated polls between updates cost O(1); the cache is only
+    rebuilt when a frame arrives or the next bike is due to expire.
+    `on_evict` is called with the ids of the bikes dropped as stale.
+    """
+
+    def __init__(self, ttl: float = LIVE_STATE_TTL, on_evict: Optional[Callable[[List[str]], None]] = None):
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.frames: Dict[str, dict] = {}
+        self.updated_at: Dict[str, float] = {}
+        # Epoch seconds of each held frame's timestamp
+        self.frame_times: Dict[str, float] = {}
+        self.frames_outdated = 0
+        self.version = 0
+        self._snapshot = {}
+        self._snapshot_version = -1
+        self._next_expiry = float("inf")
+
+    def _is_outdated(self, bike_id: str, frame: dict) -> bool:
+        """Whether `frame` is older than the held one; records its time otherwise."""
+        timestamp = frame.get("timestamp")
+        if timestamp is None:
+            return False
+        timestamp = epoch_seconds(timestamp)
+        held = self.frame_times.get(bike_id)
+        if held is not None and timestamp < held:
+            return True
+        self.frame_times[bike_id] = timestamp
+        return False
+
+    def update(self, frames: list) -> list:
+        """Ingest sink: record the newest frame for each bike in the batch. Returns the frames kept."""
+        if not frames:
+            return frames
+        now = time.monotonic()
+        kept = []
+        for frame in frames:
+            bike_id = frame["device_address"]
+            if self._is_outdated(bike_id, frame):
+                self.frames_outdated += 1
+                continue
+            self.frames[bike_id] = frame
+            self.updated_at[bike_id] = now
+            kept.append(frame)
+        if kept:
+            self._next_expiry = min(self._next_expiry, now + self.ttl)
+            self.version += 1
+        return kept
+
+    def load(self, frames: Dict[str, dict]):
+        """Seed the table (e.g. from InfluxDB on a cold start) without overwriting newer frames."""
+        now = time.monotonic()
+        for bike_id, frame in frames.items():
+            if bike_id not in self.frames and not self._is_outdated(bike_id, frame):
+                self.frames[bike_id] = frame
+                self.updated_at[bike_id] = now
+        self._next_expiry = min(self._next_expiry, now + self.ttl)
+        self.version += 1
+
+    def get(self, bike_id: str) -> Optional[dict]:
+        """Latest frame for one bike, or None if unknown or stale."""
+        updated_at = self.updated_at.get(bike_id)
+        if updated_at is None or time.monotonic() - updated_at > self.ttl:
+            return None
+        return self.frames[bike_id]
+
+    def snapshot(self) -> Dict[str, dict]:
+        """All live bikes keyed by bike id. Do not mutate the returned dict."""
+        now = time.monotonic()
+        if self._snapshot_version == self.version and now < self._next_expiry:
+            return self._snapshot
+        self._evict_stale(now)
+        self._snapshot = dict(self.frames)
+        self._snapshot_version = self.version
+        return self._snapshot
+
+    def expire(self) -> List[str]:
+        """Drop the stale bikes once the next one is due. Returns their ids."""
+        now = time.monotonic()
+        if now < self._next_expiry:
+            return []
+        return self._evict_stale(now)
+
+    def _evict_stale(self, now: float) -> List[str]:
+        stale = [bike_id for bike_id, updated_at in self.updated_at.items() if now - updated_at > self.ttl]
+        for bike_id in stale:
+            del self.frames[bike_id]
+            del self.updated_at[bike_id]
+            self.frame_times.pop(bike_id, None)
+        oldest = min(self.updated_at.values(), default=None)
+        self._next_expiry = oldest + self.ttl if oldest is not None else float("inf")
+        if stale:
+            self.version += 1
+            if self.on_evict is not None:
+                self.on_evict(stale)
+        return stale
+
+
+# Shared live state for the API process
+live_state = LiveStateStore()
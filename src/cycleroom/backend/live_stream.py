@@ -0,0 +1,145 @@
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from backend.fast_json import dumps
+
+LIVE_STREAM_DEFAULT_HZ = float(os.getenv("LIVE_STREAM_DEFAULT_HZ", 4))
+LIVE_STREAM_MIN_HZ = 0.1
+LIVE_STREAM_MAX_HZ = float(os.getenv("LIVE_STREAM_MAX_HZ", 30))
+# Seconds without changes before an SSE comment keeps proxies from closing the stream
+LIVE_STREAM_KEEPALIVE = float(os.getenv("LIVE_STREAM_KEEPALIVE", 15))
+
+
+def encode_message(message: dict) -> str:
+    return dumps(message).decode()
+
+
+class LiveStreamHub:
+    """
+    Fan-out of live frames to push subscribers (WebSocket and SSE).
+
+    The ingest sink stamps every bike in a batch with a new sequence number
+    and moves it to the end of an ordered dict, so "bikes changed since seq
+    N" is a walk back from the end that stops at the first older entry. Ingest
+    cost does not depend on the number of subscribers, and a subscriber only
+    keeps the last seq it sent. Bikes dropped from the live state are
+    removed the same way, so deltas can name the bikes that are gone.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        # bike id -> (seq, newest frame), least recently changed first
+        self.changes: "OrderedDict[str, tuple]" = OrderedDict()
+        # bike id -> seq it was removed at, least recently removed first
+        self.removals: "OrderedDict[str, int]" = OrderedDict()
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+
+    def update(self, frames: list):
+        """Ingest sink: record the newest frame per bike and wake the subscribers."""
+        if not frames:
+            return
+        self.seq += 1
+        for frame in frames:
+            bike_id = frame["device_address"]
+            self.changes[bike_id] = (self.seq, frame)
+            self.changes.move_to_end(bike_id)
+            self.removals.pop(bike_id, None)
+        self._wake()
+
+    def remove(self, bike_ids: list):
+        """Forget bikes (e.g. evicted from the live state) and tell the subscribers."""
+        if not bike_ids:
+            return
+        self.seq += 1
+        for bike_id in bike_ids:
+            self.changes.pop(bike_id, None)
+            self.removals[bike_id] = self.seq
+            self.removals.move_to_end(bike_id)
+        self._wake()
+
+    def _wake(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def changed_since(self, seq: int) -> Dict[str, dict]:
+        """Newest frame of every bike that changed after `seq`."""
+        changed = {}
+        for bike_id in reversed(self.changes):
+            bike_seq, frame = self.changes[bike_id]
+            if bike_seq <= seq:
+                break
+            changed[bike_id] = frame
+        return changed
+
+    def removed_since(self, seq: int) -> List[str]:
+        """Ids of the bikes removed after `seq`."""
+        removed = []
+        for bike_id in reversed(self.removals):
+            if self.removals[bike_id] <= seq:
+                break
+            removed.append(bike_id)
+        return removed
+
+    async def wait(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Wait until something changes after `seq`. Returns False on timeout."""
+        if self.seq > seq:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def subscribe(self, max_hz: float = LIVE_STREAM_DEFAULT_HZ) -> "Subscription":
+        return Subscription(self, max_hz)
+
+
+class Subscription:
+    """
+    One client's view of the hub: a snapshot, then deltas at most `max_hz`
+    times per second.
+
+    Updates that arrive between two sends are coalesced into the next delta,
+    newest frame per bike, so a slow consumer falls behind by at most one
+    message instead of building a backlog. A delta lists the bikes removed
+    since the previous message under "removed" when there are any.
+    """
+
+    def __init__(self, hub: LiveStreamHub, max_hz: float = LIVE_STREAM_DEFAULT_HZ):
+        self.hub = hub
+        self.set_rate(max_hz)
+
+    def set_rate(self, max_hz: float):
+        self.max_hz = min(max(float(max_hz), LIVE_STREAM_MIN_HZ), LIVE_STREAM_MAX_HZ)
+
+    async def messages(self, snapshot: Dict[str, dict], keepalive: Optional[float] = None):
+        """Yield the snapshot message, then delta messages; None means nothing changed for `keepalive` seconds."""
+        hub = self.hub
+        hub.subscribers += 1
+        try:
+            seq = hub.seq
+            yield {"type": "snapshot", "seq": seq, "bikes": snapshot}
+            loop = asyncio.get_running_loop()
+            next_send = loop.time()
+            while True:
+                if not await hub.wait(seq, keepalive):
+                    yield None
+                    continue
+                delay = next_send - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                message = {"type": "delta", "seq": hub.seq, "bikes": hub.changed_since(seq)}
+                removed = hub.removed_since(seq)
+                if removed:
+                    message["removed"] = removed
+                seq = hub.seq
+                next_send = loop.time() + 1 / self.max_hz
+                yield message
+        finally:
+            hub.subscribers -= 1
+
+
+# Shared live stream hub for the API process
+live_stream = LiveStreamHub()
@@ -0,0 +1,29 @@
+-- Base tables. IF NOT EXISTS lets databases created by hand adopt the migrations.
+CREATE EXTENSION IF NOT EXISTS timescaledb;
+
+CREATE TABLE IF NOT EXISTS bike_data (
+    bike_id TEXT NOT NULL,
+    timestamp TIMESTAMPTZ NOT NULL,
+    cadence DOUBLE PRECISION,
+    heart_rate DOUBLE PRECISION,
+    power INTEGER,
+    trip_distance DOUBLE PRECISION,
+    gear INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS bike_selection (
+    id BIGSERIAL PRIMARY KEY,
+    bike_number TEXT NOT NULL,
+    device_address TEXT NOT NULL,
+    date TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS bike_mappings (
+    id BIGSERIAL PRIMARY KEY,
+    bike_number TEXT NOT NULL,
+    device_address TEXT NOT NULL,
+    mapped_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Serves the DISTINCT ON (bike_number) ... ORDER BY bike_number, date DESC lookup
+CREATE INDEX IF NOT EXISTS bike_selection_bike_number_date_idx ON bike_selection (bike_number, date DESC);
@@ -0,0 +1,13 @@
+-- bike_data as a hypertable. At 4 Hz a 40-bike room writes ~576k rows per
+-- class hour (~70 MB with indexes), so one-day chunks stay far below the
+-- "chunk + indexes under 25% of RAM" guideline while keeping range queries
+-- for a class or a week to a handful of chunks.
+SELECT create_hypertable('bike_data', 'timestamp',
+    chunk_time_interval => INTERVAL '{chunk_interval}',
+    if_not_exists => TRUE,
+    migrate_data => TRUE);
+SELECT set_chunk_time_interval('bike_data', INTERVAL '{chunk_interval}');
+
+-- Per-bike range scans, and the idempotency key for the COPY writer's
+-- ON CONFLICT (bike_id, timestamp) DO NOTHING
+CREATE UNIQUE INDEX IF NOT EXISTS bike_data_bike_id_timestamp_idx ON bike_data (bike_id, timestamp DESC);
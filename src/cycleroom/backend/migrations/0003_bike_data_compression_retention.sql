@@ -0,0 +1,11 @@
+-- Native compression, segmented per bike so a compressed chunk still answers
+-- per-bike range queries without decompressing other bikes.
+ALTER TABLE bike_data SET (
+    timescaledb.compress,
+    timescaledb.compress_segmentby = 'bike_id',
+    timescaledb.compress_orderby = 'timestamp DESC'
+);
+SELECT add_compression_policy('bike_data', INTERVAL '{compress_after}', if_not_exists => TRUE);
+
+-- Drop whole chunks once they age out
+SELECT add_retention_policy('bike_data', INTERVAL '{retention}', if_not_exists => TRUE);
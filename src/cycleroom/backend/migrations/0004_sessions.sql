@@ -0,0 +1,19 @@
+-- Workout sessions and a checkpoint of each rider's running aggregates,
+-- so session summaries survive an API restart without rescanning bike_data.
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    name TEXT,
+    started_at TIMESTAMPTZ NOT NULL,
+    ended_at TIMESTAMPTZ,
+    settings JSONB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS sessions_started_at_idx ON sessions (started_at DESC);
+
+CREATE TABLE IF NOT EXISTS session_riders (
+    session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,
+    bike_id TEXT NOT NULL,
+    state JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (session_id, bike_id)
+);
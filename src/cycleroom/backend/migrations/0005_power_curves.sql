@@ -0,0 +1,15 @@
+-- Mean-maximal power curves: one per rider per session, plus the all-time
+-- curve per rider (the elementwise max of its session curves).
+CREATE TABLE IF NOT EXISTS session_power_curves (
+    session_id TEXT NOT NULL,
+    bike_id TEXT NOT NULL,
+    curve JSONB NOT NULL,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (session_id, bike_id)
+);
+
+CREATE TABLE IF NOT EXISTS rider_power_curves (
+    bike_id TEXT PRIMARY KEY,
+    curve JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,3 @@
+-- Room (studio) of each frame. Nullable without a default, so it can be
+-- added to a compressed hypertable; rows written before rooms existed stay NULL.
+ALTER TABLE bike_data ADD COLUMN IF NOT EXISTS room TEXT;
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from backend.sessions import Session, SESSION_MAX_GAP
+from backend.utils.power_curve import (
+    CURVE_DURATIONS,
+    resample_1hz,
+    mean_max,
+    merge_curves,
+    curve_to_dict,
+    curve_from_dict,
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait after a session ends so the batched writers flush its last frames
+POWER_CURVE_SETTLE = float(os.getenv("POWER_CURVE_SETTLE", 5))
+POWER_CURVE_CHUNK_SIZE = int(os.getenv("POWER_CURVE_CHUNK_SIZE", 10000))
+
+
+class PowerCurveService:
+    """
+    Mean-maximal power curves per session and all-time per rider.
+
+    When a session ends, each rider's power for the session window is read
+    once, resampled to 1 Hz and reduced to a curve, which is saved with the
+    session. The rider's all-time curve is the elementwise max of the stored
+    all-time curve and the new one, so no request ever rescans more than the
+    running session.
+    """
+
+    def __init__(self, durations=CURVE_DURATIONS, settle: float = POWER_CURVE_SETTLE):
+        self.durations = durations
+        self.settle = settle
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.stats = {"sessions": 0, "curves": 0, "errors": 0, "last_compute_ms": 0.0}
+
+    def session_ended(self, session: Session):
+        """SessionManager end listener: queue the session's curves."""
+        self.queue.put_nowait((session.session_id, session.started_at, session.ended_at, list(session.riders)))
+
+    async def compute(self, storage, bike_id: str, start_time: datetime, end_time: Optional[datetime]) -> np.ndarray:
+        """Curve of one rider over a time range."""
+        timestamps, powers = [], []
+        async for rows in storage.stream_historical_data(bike_id, start_time, end_time, POWER_CURVE_CHUNK_SIZE):
+            timestamps.extend(row["timestamp"].timestamp() for row in rows)
+            powers.extend(row["power"] if row["power"] is not None else 0 for row in rows)
+        return mean_max(resample_1hz(timestamps, powers, SESSION_MAX_GAP), self.durations)
+
+    async def save_session(self, storage, session_id: str, started_at: datetime, ended_at: datetime,
+                           bike_ids: list) -> int:
+        """Store the curves of an ended session and merge them into the all-time curves."""
+        started = time.perf_counter()
+        for bike_id in bike_ids:
+            curve = await self.compute(storage, bike_id, started_at, ended_at)
+            await storage.save_power_curve(bike_id, curve_to_dict(curve, self.durations), session_id)
+            stored = await storage.get_power_curve(bike_id)
+            if stored is not None:
+                curve = merge_curves(curve, curve_from_dict(stored, self.durations))
+            await storage.save_power_curve(bike_id, curve_to_dict(curve, self.durations))
+        self.stats["sessions"] += 1
+        self.stats["curves"] += len(bike_ids)
+        self.stats["last_compute_ms"] = (time.perf_counter() - started) * 1000
+        return len(bike_ids)
+
+    async def run(self, storage):
+        """Compute the curves of ended sessions, one session at a time (keeps all-time merges serial)."""
+        while True:
+            session = await self.queue.get()
+            await asyncio.sleep(self.settle)
+            try:
+                await self.save_session(storage, *session)
+                logger.info(f"✅ Saved power curves for session {session[0]}")
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"❌ Power curves for session {session[0]} failed: {e}")
+
+    async def get_curve(self, storage, bike_id: str, session_id: Optional[str] = None,
+                        current: Optional[Session] = None) -> Optional[np.ndarray]:
+        """
+        Stored curve of a session, or the all-time curve when `session_id` is
+        None. The running session (`current`) has no stored curve yet, so its
+        part is computed from its own window only.
+        """
+        live = None
+        if current is not None and bike_id in current.riders and session_id in (None, current.session_id):
+            live = await self.compute(storage, bike_id, current.started_at, None)
+            if session_id is not None:
+                return live
+        stored = await storage.get_power_curve(bike_id, session_id)
+        if stored is None:
+            return live
+        curve = curve_from_dict(stored, self.durations)
+        return merge_curves(curve, live) if live is not None else curve
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "pending": self.queue.qsize()}
+
+
+# Shared power curve service for the API process
+power_curves = PowerCurveService()
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from backend.fast_json import SnapshotCache
+from backend.ingest import DEFAULT_ROOM, frames_dropped
+from backend.leaderboard import Leaderboard, leaderboard
+from backend.live_state import LiveStateStore, live_state
+from backend.live_stream import LiveStreamHub, live_stream
+from backend.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Room names are used in URLs and storage tags
+ROOM_PATTERN = "^[A-Za-z0-9_-]{1,64}$"
+# Rooms served by this process (comma-separated); empty serves any room
+SERVED_ROOMS = tuple(room.strip() for room in os.getenv("ROOMS", "").split(",") if room.strip())
+MAX_ROOMS = int(os.getenv("MAX_ROOMS", 64))
+# Batches a room may have waiting before the oldest are dropped
+ROOM_MAX_PENDING = int(os.getenv("ROOM_MAX_PENDING", 1000))
+
+
+class RoomShard:
+    """
+    The live views of one room: latest frame per bike, push stream and leaderboard.
+
+    Ingest only appends batches to the shard's pending queue. The shard's
+    own worker task applies them, everything that waited since its last
+    turn as one batch, then yields to the event loop. A burst in one room
+    therefore delays that room's views but not the other rooms'.
+    """
+
+    def __init__(self, name: str, state: Optional[LiveStateStore] = None, stream: Optional[LiveStreamHub] = None,
+                 board: Optional[Leaderboard] = None, max_pending: int = ROOM_MAX_PENDING):
+        self.name = name
+        self.live_state = state or LiveStateStore()
+        self.live_stream = stream or LiveStreamHub()
+        self.leaderboard = board or Leaderboard()
+        # Bikes leave the leaderboard and the stream when they leave the live state
+        self.live_state.on_evict = self._remove_bikes
+        # Serialized /api/bikes body for this room, rebuilt once per live state version
+        self.bikes_cache = SnapshotCache(f"bikes-{name}")
+        self.max_pending = max_pending
+        self.pending = deque()
+        self._batch_ready = asyncio.Event()
+        self.stats = {"batches": 0, "frames": 0, "batches_dropped": 0, "last_apply_ms": 0.0}
+
+    def submit(self, frames: list):
+        if len(self.pending) >= self.max_pending:
+            self.pending.popleft()
+            self.stats["batches_dropped"] += 1
+        self.pending.append(frames)
+        self._batch_ready.set()
+
+    def apply(self, frames: list):
+        started = time.perf_counter()
+        # Frames older than the live ones (e.g. a scanner's spool replay) only reach storage and sessions
+        current = self.live_state.update(frames)
+        self.live_state.expire()
+        self.leaderboard.update(current)
+        self.live_stream.update(current)
+        self.stats["batches"] += 1
+        self.stats["frames"] += len(frames)
+        self.stats["last_apply_ms"] = (time.perf_counter() - started) * 1000
+
+    def _remove_bikes(self, bike_ids: list):
+        for bike_id in bike_ids:
+            self.leaderboard.remove(bike_id)
+        self.live_stream.remove(bike_ids)
+
+    def drain(self) -> int:
+        """Apply everything pending as one batch. Returns the number of frames applied."""
+        frames = []
+        while self.pending:
+            frames.extend(self.pending.popleft())
+        if frames:
+            self.apply(frames)
+        return len(frames)
+
+    async def run(self):
+        """Worker task: apply pending batches until cancelled."""
+        while True:
+            await self._batch_ready.wait()
+            self._batch_ready.clear()
+            self.drain()
+            # Let the other rooms' workers and the routes run before the next batch
+            await asyncio.sleep(0)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "pending": len(self.pending),
+            "bikes": len(self.live_state.frames),
+            "subscribers": self.live_stream.subscribers,
+            "seq": self.live_stream.seq,
+        }
+
+
+class RoomRegistry:
+    """
+    Room shards of this process, created on first use.
+
+    `dispatch()` is the ingest sink: it splits each batch by the frames'
+    "room" key and hands each part to that room's shard. With ROOMS set, a
+    process only serves the listed rooms, so a proxy routing on the `room`
+    query parameter can spread rooms over several API processes. Until
+    `run()` starts the worker tasks, batches are applied inline.
+    """
+
+    def __init__(self, served=SERVED_ROOMS, max_rooms: int = MAX_ROOMS, default_shard: Optional[RoomShard] = None):
+        self.served = frozenset(served)
+        self.max_rooms = max_rooms
+        self.shards: Dict[str, RoomShard] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.running = False
+        self.frames_rejected = 0
+        if default_shard is not None and self.serves(default_shard.name):
+            self.shards[default_shard.name] = default_shard
+
+    def serves(self, room: str) -> bool:
+        return not self.served or room in self.served
+
+    def get(self, room: str) -> Optional[RoomShard]:
+        return self.shards.get(room)
+
+    def shard(self, room: str) -> RoomShard:
+        """The room's shard, created (and its worker started) on first use."""
+        shard = self.shards.get(room)
+        if shard is not None:
+            return shard
+        if not self.serves(room):
+            raise LookupError(f"Room {room!r} is not served by this process")
+        if not re.match(ROOM_PATTERN, room):
+            raise ValueError(f"Invalid room name {room!r}")
+        if len(self.shards) >= self.max_rooms:
+            raise LookupError(f"Room limit of {self.max_rooms} reached")
+        shard = self.shards[room] = RoomShard(room)
+        logger.info(f"🏠 Opened room {room}")
+        if self.running:
+            self._start(shard)
+        return shard
+
+    def dispatch(self, frames: list):
+        """Ingest sink: hand each room's part of the batch to its shard."""
+        by_room: Dict[str, list] = {}
+        for frame in frames:
+            by_room.setdefault(frame.get("room") or DEFAULT_ROOM, []).append(frame)
+        for room, room_frames in by_room.items():
+            try:
+                shard = self.shard(room)
+            except (LookupError, ValueError) as e:
+                self.frames_rejected += len(room_frames)
+                for frame in room_frames:
+                    frames_dropped.labels(frame.get("device_address"), "room").inc()
+                logger.warning(f"⚠️ Dropping {len(room_frames)} frames: {e}")
+                continue
+            if self.running:
+                shard.submit(room_frames)
+            else:
+                shard.apply(room_frames)
+
+    def load(self, frames: Dict[str, dict]):
+        """Seed the rooms' live state (e.g. from storage on a cold start)."""
+        by_room: Dict[str, dict] = {}
+        for bike_id, frame in frames.items():
+            by_room.setdefault(frame.get("room") or DEFAULT_ROOM, {})[bike_id] = frame
+        for room, room_frames in by_room.items():
+            try:
+                self.shard(room).live_state.load(room_frames)
+            except (LookupError, ValueError):
+                continue
+
+    def _start(self, shard: RoomShard):
+        self.tasks[shard.name] = asyncio.create_task(shard.run())
+
+    async def run(self):
+        """Run a worker task per room until cancelled."""
+        self.running = True
+        try:
+            for shard in list(self.shards.values()):
+                self._start(shard)
+            await asyncio.Event().wait()
+        finally:
+            self.running = False
+            tasks = list(self.tasks.values())
+            self.tasks.clear()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Nothing submitted before shutdown is lost
+            for shard in self.shards.values():
+                shard.drain()
+
+    def get_stats(self) -> dict:
+        return {
+            "served": sorted(self.served) or None,
+            "frames_rejected": self.frames_rejected,
+            "rooms": {name: shard.get_stats() for name, shard in self.shards.items()},
+        }
+
+
+# Rooms of the API process; the default room keeps the shared live state, stream and leaderboard
+rooms = RoomRegistry(default_shard=RoomShard(DEFAULT_ROOM, live_state, live_stream, leaderboard))
+metrics.gauge("cycleroom_room_pending_batches", "Ingest batches waiting for the room's worker", ("room",),
+              fn=lambda: {(name,): len(shard.pending) for name, shard in rooms.shards.items()})
+metrics.gauge("cycleroom_stream_subscribers", "Live stream subscribers", ("room",),
+              fn=lambda: {(name,): shard.live_stream.subscribers for name, shard in rooms.shards.items()})
@@ -1,8 +1,12 @@
 
-from fastapi import APIRouter, HTTPException
-from backend.utils.db_utils import get_latest_bike_data
+from fastapi import APIRouter, Depends, HTTPException, Request
+from backend.ingest import ingest_frames
+from backend.rooms import RoomShard
+from backend.routes.rooms import get_ingest_room, get_room
+from backend.utils.responses import FastJSONResponse, snapshot_response
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from datetime import datetime
 
 router = APIRouter()
 
@@ -11,15 +15,54 @@ class BikeDataResponse(BaseModel):
     bike_id: str
     distance: float
 
-@router.get("/api/bikes", tags=["Bike Data"], response_model=Dict[str, Any])
-async def get_bike_data():
+# Decoded Keiser M3 frame as sent by the BLE scanner
+class BikeFrame(BaseModel):
+    device_address: str
+    timestamp: datetime
+    build_major: Optional[int] = None
+    build_minor: Optional[int] = None
+    data_type: Optional[int] = None
+    ordinal_id: Optional[int] = None
+    interval: Optional[int] = None
+    real_time: Optional[bool] = None
+    cadence: Optional[float] = None
+    heart_rate: Optional[float] = None
+    power: Optional[int] = None
+    caloric_burn: Optional[int] = None
+    duration: Optional[int] = None
+    trip_distance: Optional[float] = None
+    gear: Optional[int] = None
+    room: Optional[str] = None
+
+class BulkIngestResponse(BaseModel):
+    accepted: int
+
+@router.get("/api/bikes", tags=["Bike Data"], response_model=Dict[str, Any], response_class=FastJSONResponse)
+async def get_bike_data(request: Request, room: RoomShard = Depends(get_room)):
     '''
-    Retrieve real-time bike data from InfluxDB.
+    Retrieve real-time bike data of one room from its in-memory live state.
 
     Returns:
-        A JSON object containing the latest distance data for each bike.
+        A JSON object containing the latest frame for each bike seen within
+        the staleness TTL. The body is serialized once per state version and
+        shared by every client. The ETag and X-State-Version headers change
+        whenever the state does; polls with a matching If-None-Match get a 304.
     '''
-    data = await get_latest_bike_data()
+    data = room.live_state.snapshot()
+    version = room.live_state.version
     if not data:
         raise HTTPException(status_code=404, detail="No bike data found")
-    return data
+    snapshot = room.bikes_cache.get(version, lambda: data)
+    return snapshot_response(request, snapshot, {"X-State-Version": str(version)})
+
+@router.post("/api/bikes/bulk", tags=["Bike Data"], response_model=BulkIngestResponse,
+             response_class=FastJSONResponse)
+async def ingest_bike_frames(frames: List[BikeFrame], room: RoomShard = Depends(get_ingest_room)):
+    '''
+    Bulk ingest of decoded frames from the BLE scanner of `room`.
+
+    Returns:
+        The number of frames accepted.
+    '''
+    accepted = ingest_frames([frame.model_dump() for frame in frames], room.name)
+    return {"accepted": accepted}
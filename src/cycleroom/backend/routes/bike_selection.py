@@ -1,18 +1,17 @@
-
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from backend.bike_mappings import bike_mappings
+from backend.fast_json import SnapshotCache
+from backend.utils.responses import FastJSONResponse, snapshot_response
+from backend.utils.db_utils import get_storage, load_bike_selections
+from backend.utils.storage import Storage
 from pydantic import BaseModel
 from typing import Dict, Optional
 from datetime import datetime
-import asyncpg
-import os
 
 router = APIRouter()
 
-# Database Connection Settings
-TIMESCALEDB_HOST = os.getenv("TIMESCALEDB_HOST", "timescaledb")
-TIMESCALEDB_USER = os.getenv("POSTGRES_USER", "timescale_user")
-TIMESCALEDB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "timescale_password")
-TIMESCALEDB_DB = os.getenv("POSTGRES_DB", "timescale_db")
+# Serialized selection mapping, rebuilt once per cache version
+selections_cache = SnapshotCache("bike-selection")
 
 # Pydantic Models
 class BikeSelection(BaseModel):
@@ -24,39 +23,26 @@ class BikeSelectionResponse(BaseModel):
     device_address: str
     date: datetime
 
-# Get TimescaleDB Connection
-async def get_timescale_connection():
-    conn = await asyncpg.connect(
-        user=TIMESCALEDB_USER,
-        password=TIMESCALEDB_PASSWORD,
-        database=TIMESCALEDB_DB,
-        host=TIMESCALEDB_HOST
-    )
-    return conn
-
 # Save Bike Selection
 @router.post("/api/bike-selection", tags=["Bike Selection"], response_model=BikeSelectionResponse)
-async def save_bike_selection(selection: BikeSelection):
-    conn = await get_timescale_connection()
-    query = '''
-        INSERT INTO bike_selection (bike_number, device_address, date)
-        VALUES ($1, $2, NOW())
-        RETURNING bike_number, device_address, date
-    '''
-    row = await conn.fetchrow(query, selection.bike_number, selection.device_address)
-    await conn.close()
+async def save_bike_selection(selection: BikeSelection, storage: Storage = Depends(get_storage)):
+    row = await storage.save_bike_selection(selection.bike_number, selection.device_address)
     if row:
-        return dict(row)
+        # Write-through: the cache only changes once the row is committed
+        bike_mappings.set(row["bike_number"], row["device_address"], row["date"])
+        return row
     else:
         raise HTTPException(status_code=500, detail="Failed to save bike selection.")
 
-# Get Bike Selection Mappings
-@router.get("/api/bike-selection", tags=["Bike Selection"], response_model=Dict[str, str])
-async def get_bike_selection():
-    conn = await get_timescale_connection()
-    query = '''
-        SELECT bike_number, device_address FROM bike_selection ORDER BY date DESC
-    '''
-    rows = await conn.fetch(query)
-    await conn.close()
-    return {row["bike_number"]: row["device_address"] for row in rows}
+# Get Bike Selection Mappings (latest selection per bike number)
+# Served from the version-keyed byte cache, with ETag / If-None-Match support
+@router.get("/api/bike-selection", tags=["Bike Selection"], response_model=Dict[str, str],
+            response_class=FastJSONResponse)
+async def get_bike_selection(request: Request, storage: Storage = Depends(get_storage)):
+    if not bike_mappings.loaded:
+        # Storage was down at startup; load on first use instead
+        await load_bike_selections(bike_mappings, storage)
+        if not bike_mappings.loaded:
+            raise HTTPException(status_code=503, detail="Bike selections are not available.")
+    snapshot = selections_cache.get(bike_mappings.version, bike_mappings.mappings)
+    return snapshot_response(request, snapshot)
@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from backend.leaderboard import LEADERBOARD_MAX_K
+from backend.rooms import RoomShard, ROOM_PATTERN
+from backend.routes.rooms import get_room, get_websocket_room
+from backend.live_stream import (
+    encode_message,
+    LIVE_STREAM_DEFAULT_HZ,
+    LIVE_STREAM_MIN_HZ,
+    LIVE_STREAM_MAX_HZ,
+    LIVE_STREAM_KEEPALIVE,
+)
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+async def stream_messages(room: RoomShard, subscription, k: int, keepalive=None):
+    '''
+    Live stream messages of a room with its leaderboard attached when `k` > 0:
+    the top `k` whenever the ranking changed since the previous message, and
+    the rank changes that happened in between.
+    '''
+    leaderboard = room.leaderboard
+    version = event_seq = None
+    async for message in subscription.messages(room.live_state.snapshot(), keepalive):
+        if message is not None and k:
+            if leaderboard.version != version:
+                version = leaderboard.version
+                message["leaderboard"] = leaderboard.top(k)
+            if event_seq is not None:
+                message["rank_changes"] = leaderboard.events_since(event_seq)
+            event_seq = leaderboard.seq
+        yield message
+
+@router.get("/api/bikes/stream", tags=["Bike Data"])
+async def stream_bike_data(
+    max_hz: float = Query(LIVE_STREAM_DEFAULT_HZ, ge=LIVE_STREAM_MIN_HZ, le=LIVE_STREAM_MAX_HZ,
+                          description="Maximum messages per second"),
+    leaderboard_size: int = Query(0, alias="leaderboard", ge=0, le=LEADERBOARD_MAX_K,
+                                  description="Attach the top N of the leaderboard and rank changes"),
+    room: RoomShard = Depends(get_room),
+):
+    '''
+    Server-Sent Events stream of live bike data of one room.
+
+    The first `snapshot` event holds every live bike, as GET /api/bikes
+    would return it. Each `delta` event then holds the newest frame of the
+    bikes that changed since the previous event, and a `removed` list of the
+    bikes that went stale, if any. Updates arriving faster than
+    `max_hz` are coalesced into the next event. With `leaderboard=N`, events
+    also carry the top N riders (when the ranking changed) and the rank
+    changes since the previous event.
+    '''
+    subscription = room.live_stream.subscribe(max_hz)
+
+    async def events():
+        async for message in stream_messages(room, subscription, leaderboard_size, keepalive=LIVE_STREAM_KEEPALIVE):
+            if message is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {message['type']}\nid: {message['seq']}\ndata: {encode_message(message)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.websocket("/api/bikes/stream")
+async def stream_bike_data_websocket(websocket: WebSocket, max_hz: float = LIVE_STREAM_DEFAULT_HZ,
+                                     leaderboard_size: int = Query(0, alias="leaderboard", ge=0,
+                                                                   le=LEADERBOARD_MAX_K),
+                                     room: Optional[str] = Query(None, pattern=ROOM_PATTERN)):
+    '''
+    WebSocket stream of live bike data, with the same snapshot and delta
+    messages as the SSE stream. Clients can change their rate at any time by
+    sending {"max_hz": n}.
+    '''
+    shard = await get_websocket_room(websocket, room)
+    if shard is None:
+        return
+    await websocket.accept()
+    subscription = shard.live_stream.subscribe(max_hz)
+
+    async def send_messages():
+        async for message in stream_messages(shard, subscription, leaderboard_size):
+            await websocket.send_text(encode_message(message))
+
+    async def receive_rates():
+        while True:
+            try:
+                request = await websocket.receive_json()
+                subscription.set_rate(request["max_hz"])
+            except (ValueError, TypeError, KeyError) as e:
+                logger.warning(f"⚠️ Ignoring malformed stream control message: {e}")
+
+    tasks = [asyncio.create_task(send_messages()), asyncio.create_task(receive_rates())]
+    try:
+        # Either side ending (usually a disconnect) closes the stream
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, Exception) and not isinstance(result, (WebSocketDisconnect, RuntimeError)):
+                logger.error(f"❌ Live stream failed: {result}")
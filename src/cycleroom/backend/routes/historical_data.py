@@ -1,30 +1,91 @@
-
-from fastapi import APIRouter, HTTPException, Query
-from backend.utils.db_utils import get_historical_data
-from typing import Optional, List
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from backend.utils.db_utils import get_storage
+from backend.utils.storage import Storage
+from backend.utils.downsample import auto_bucket_seconds, lttb_indices
+from backend.utils.historical_export import ENCODERS, MEDIA_TYPES, arrow_available
+from typing import Optional, List, Union
+from datetime import datetime, timedelta
 from pydantic import BaseModel
+from config.config import HISTORICAL_CHUNK_SIZE
 
 router = APIRouter()
 
+# Fixed bucket widths accepted by `resolution`
+RESOLUTIONS = {
+    "1s": timedelta(seconds=1),
+    "10s": timedelta(seconds=10),
+    "30s": timedelta(seconds=30),
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+}
+DEFAULT_MAX_POINTS = 1000
+
 # Response Model for Historical Data
 class HistoricalDataItem(BaseModel):
     bike_id: str
-    cadence: int
-    heart_rate: int
-    power: int
-    trip_distance: float
-    gear: int
+    cadence: Optional[float]
+    heart_rate: Optional[float]
+    power: Optional[int]
+    trip_distance: Optional[float]
+    gear: Optional[int]
+    timestamp: datetime
+
+# Response Model for Time-Bucketed Historical Data
+class HistoricalBucketItem(BaseModel):
+    bike_id: str
     timestamp: datetime
+    # NULL when every frame in the bucket lacked the metric
+    avg_power: Optional[float]
+    max_power: Optional[int]
+    avg_cadence: Optional[float]
+    avg_heart_rate: Optional[float]
+    trip_distance: Optional[float]
+    samples: int
+
+def downsample_rows(rows: list, max_points: int, value_key: str) -> list:
+    '''
+    Keep at most `max_points` rows, chosen by LTTB on `value_key` over time.
+    Rows without a value for `value_key` cannot be placed on the curve and are skipped.
+    '''
+    if len(rows) <= max_points:
+        return rows
+    rows = [row for row in rows if row[value_key] is not None]
+    if len(rows) <= max_points:
+        return rows
+    x = [row["timestamp"].timestamp() for row in rows]
+    y = [row[value_key] for row in rows]
+    return [rows[i] for i in lttb_indices(x, y, max_points)]
 
-@router.get("/api/historical", tags=["Historical Data"], response_model=List[HistoricalDataItem])
+@router.get("/api/historical", tags=["Historical Data"],
+            response_model=Union[List[HistoricalDataItem], List[HistoricalBucketItem]])
 async def get_historical(
     bike_id: str, 
     start_time: Optional[str] = Query(None, description="Start time in ISO format (e.g., 2023-01-01T00:00:00Z)"),
-    end_time: Optional[str] = Query(None, description="End time in ISO format (e.g., 2023-01-01T23:59:59Z)")
+    end_time: Optional[str] = Query(None, description="End time in ISO format (e.g., 2023-01-01T23:59:59Z)"),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson|csv|arrow)$", description="Response format"),
+    resolution: str = Query("raw", pattern="^(raw|auto|1s|10s|30s|1m|5m)$", description="Bucket width for aggregated data"),
+    max_points: Optional[int] = Query(None, ge=3, le=100_000, description="Upper bound on the number of points returned"),
+    storage: Storage = Depends(get_storage),
 ):
     '''
-    Retrieve historical bike data from TimescaleDB.
+    Retrieve historical bike data from the configured storage backend.
+
+    `format=json` (default) returns a validated JSON array. `ndjson`, `csv` and
+    `arrow` (Arrow IPC stream, needs pyarrow) stream the rows in chunks (a
+    server-side cursor on TimescaleDB), so memory stays bounded for any time range.
+    Streaming responses are empty rather than 404 when nothing matches.
+
+    `resolution` other than `raw` aggregates in the database (`time_bucket` on TimescaleDB)
+    (avg/max power, avg cadence and heart rate, last distance per bucket).
+    `auto` picks the bucket width that fits the range into `max_points`
+    (default 1000). With `max_points` set on `raw` or a fixed resolution, the
+    result is reduced with LTTB on power, which keeps peaks that plain
+    averaging would flatten.
+
+    LTTB runs in the API, so `raw` with `max_points` still loads every row of
+    the range first: its cost grows with the range, not with `max_points`.
+    For long ranges use `resolution=auto`, which aggregates in the database.
     '''
     # Validate time inputs
     try:
@@ -33,9 +94,34 @@ async def get_historical(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use ISO format (e.g., 2023-01-01T00:00:00Z)")
     
-    # Query historical data
-    data = await get_historical_data(bike_id, start, end)
+    # Stream large exports straight from a cursor
+    if output_format != "json":
+        if resolution != "raw" or max_points is not None:
+            raise HTTPException(status_code=400, detail="resolution and max_points are only supported with format=json.")
+        if output_format == "arrow" and not arrow_available():
+            raise HTTPException(status_code=400, detail="Arrow output requires pyarrow to be installed.")
+        chunks = storage.stream_historical_data(bike_id, start, end, HISTORICAL_CHUNK_SIZE)
+        return StreamingResponse(ENCODERS[output_format](chunks), media_type=MEDIA_TYPES[output_format])
+
+    # Aggregate in the database, sizing the buckets from the data range for `auto`
+    if resolution != "raw":
+        if resolution == "auto":
+            max_points = max_points or DEFAULT_MAX_POINTS
+            first, last = await storage.get_historical_span(bike_id, start, end)
+            if first is None:
+                raise HTTPException(status_code=404, detail="No historical data found for the given criteria.")
+            bucket = timedelta(seconds=auto_bucket_seconds((last - first).total_seconds(), max_points))
+        else:
+            bucket = RESOLUTIONS[resolution]
+        data = await storage.get_bucketed_historical_data(bike_id, start, end, bucket)
+        value_key = "avg_power"
+    else:
+        data = await storage.get_historical_data(bike_id, start, end)
+        value_key = "power"
+
     if not data:
         raise HTTPException(status_code=404, detail="No historical data found for the given criteria.")
-    
+
+    if max_points is not None:
+        data = downsample_rows(data, max_points, value_key)
     return data
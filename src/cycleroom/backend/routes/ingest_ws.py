@@ -0,0 +1,61 @@
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from backend.ingest import ingest_frames
+from backend.rooms import ROOM_PATTERN
+from backend.routes.rooms import get_websocket_ingest_room
+from backend.keiser_m3_ble_parser import decode_frame, monotonic_ns_from_wall_clock
+from backend.wire_format import decode_records
+from backend.utils.metrics import metrics, PARSE_BUCKETS
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+decode_seconds = metrics.histogram("cycleroom_ingest_decode_seconds", "Time to decode one binary ingest message",
+                                   buckets=PARSE_BUCKETS + (0.0025, 0.01, 0.05))
+malformed_messages = metrics.counter("cycleroom_ingest_malformed_messages_total",
+                                     "Binary ingest messages dropped as malformed")
+
+def decode_message(message: bytes) -> list:
+    '''Decode a binary ingest message into frame dicts for the ingest sinks.'''
+    frames = []
+    for address, received_ns, payload in decode_records(message):
+        frame = decode_frame(payload, monotonic_ns_from_wall_clock(received_ns))
+        frames.append({
+            "device_address": address,
+            "timestamp": datetime.fromtimestamp(received_ns / 1e9, tz=timezone.utc),
+            **frame.metrics(),
+        })
+    return frames
+
+@router.websocket("/ws/ingest")
+async def ingest_websocket(websocket: WebSocket, room: Optional[str] = Query(None, pattern=ROOM_PATTERN)):
+    '''
+    Streaming ingest of raw Keiser advertisements from the BLE scanner of `room`.
+
+    Each binary message holds one or more records in the format described in
+    backend.wire_format.
+    '''
+    shard = await get_websocket_ingest_room(websocket, room)
+    if shard is None:
+        return
+    await websocket.accept()
+    logger.info(f"🔌 Scanner connected for binary ingest into room {shard.name}: {websocket.client}")
+    try:
+        while True:
+            message = await websocket.receive_bytes()
+            try:
+                started = time.perf_counter()
+                frames = decode_message(message)
+                decode_seconds.observe(time.perf_counter() - started)
+            except ValueError as e:
+                malformed_messages.inc()
+                logger.warning(f"⚠️ Dropping malformed ingest message: {e}")
+                continue
+            ingest_frames(frames, shard.name)
+    except WebSocketDisconnect:
+        logger.info(f"🔌 Scanner disconnected: {websocket.client}")
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from backend.leaderboard import LEADERBOARD_MAX_K
+from backend.rooms import RoomShard
+from backend.routes.rooms import get_room
+from backend.utils.responses import FastJSONResponse
+from typing import Any, Dict
+
+router = APIRouter()
+
+@router.get("/api/leaderboard", tags=["Leaderboard"], response_model=Dict[str, Any], response_class=FastJSONResponse)
+async def get_leaderboard(
+    k: int = Query(10, ge=1, le=LEADERBOARD_MAX_K, description="Number of riders"),
+    start: int = Query(0, ge=0, description="Rank offset (0 = leader)"),
+    room: RoomShard = Depends(get_room),
+):
+    '''
+    Riders of a room ranked by trip distance, `k` at a time.
+
+    Each entry carries its rank, distance and the gap to the rider ahead.
+    The ranking is maintained as frames arrive, so this costs O(log n + k).
+    '''
+    leaderboard = room.leaderboard
+    return {
+        "room": room.name,
+        "version": leaderboard.version,
+        "seq": leaderboard.seq,
+        "riders": len(leaderboard),
+        "top": leaderboard.top(k, start),
+    }
+
+@router.get("/api/leaderboard/events", tags=["Leaderboard"], response_model=Dict[str, Any],
+            response_class=FastJSONResponse)
+async def get_rank_changes(since: int = Query(0, ge=0, description="Last event seq already seen"),
+                           room: RoomShard = Depends(get_room)):
+    '''
+    Rank change events after `since`. Pass the returned `seq` as the next
+    `since`; only the most recent LEADERBOARD_EVENT_HISTORY events are kept.
+    '''
+    return {"seq": room.leaderboard.seq, "events": room.leaderboard.events_since(since)}
+
+@router.get("/api/leaderboard/{bike_id}", tags=["Leaderboard"], response_model=Dict[str, Any],
+            response_class=FastJSONResponse)
+async def get_rider_position(bike_id: str, room: RoomShard = Depends(get_room)):
+    '''
+    A rider's rank, distance, gap to the rider ahead, and their neighbours.
+    '''
+    position = room.leaderboard.position(bike_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail="Bike is not on the leaderboard")
+    return position
+
+@router.post("/api/leaderboard/reset", tags=["Leaderboard"])
+async def reset_leaderboard(room: RoomShard = Depends(get_room)):
+    '''
+    Clear a room's leaderboard before a new race.
+    '''
+    room.leaderboard.reset()
+    return {"message": "Leaderboard reset"}
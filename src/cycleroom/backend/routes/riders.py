@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from backend.power_curves import power_curves
+from backend.sessions import session_manager
+from backend.utils.db_utils import get_storage
+from backend.utils.storage import Storage
+from backend.utils.power_curve import curve_to_dict, duration_label
+from backend.utils.responses import FastJSONResponse
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+router = APIRouter()
+
+# Durations reported under `best`
+HIGHLIGHT_DURATIONS = (5, 60, 300, 1200)
+
+# Response Model for a Mean-Maximal Power Curve
+class PowerCurveResponse(BaseModel):
+    bike_id: str
+    session_id: Optional[str] = None
+    durations: List[int]
+    watts: List[Optional[float]]
+    best: Dict[str, Optional[float]]
+
+@router.get("/api/riders/{bike_id}/power-curve", tags=["Riders"], response_model=PowerCurveResponse,
+            response_class=FastJSONResponse)
+async def get_power_curve(
+    bike_id: str,
+    session_id: Optional[str] = Query(None, description="Curve of one session instead of the all-time curve"),
+    storage: Storage = Depends(get_storage),
+):
+    '''
+    Best average power for every duration from 1 s to 2 h.
+
+    Without `session_id` this is the rider's all-time curve: the stored
+    elementwise max of their session curves, plus the running session.
+    `watts` is null for durations longer than the rider has ridden.
+    '''
+    curve = await power_curves.get_curve(storage, bike_id, session_id, session_manager.session_of(bike_id))
+    if curve is None:
+        raise HTTPException(status_code=404, detail="No power curve found")
+    body = curve_to_dict(curve, power_curves.durations)
+    by_duration = dict(zip(body["durations"], body["watts"]))
+    best = {duration_label(duration): by_duration.get(duration) for duration in HIGHLIGHT_DURATIONS}
+    return {"bike_id": bike_id, "session_id": session_id, **body, "best": best}
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, HTTPException, Query, WebSocket
+from backend.ingest import DEFAULT_ROOM
+from backend.rooms import rooms, RoomShard, ROOM_PATTERN
+from backend.utils.responses import FastJSONResponse
+from typing import Any, Dict, Optional
+
+router = APIRouter()
+
+ROOM_QUERY = Query(None, pattern=ROOM_PATTERN, description=f"Room (studio) name, {DEFAULT_ROOM!r} if omitted")
+
+# Find an Open Room's Shard Without Creating One
+def find_room(room: str) -> RoomShard:
+    if not rooms.serves(room):
+        raise LookupError(f"Room {room!r} is not served by this process")
+    shard = rooms.get(room)
+    if shard is None:
+        raise KeyError(f"Room {room!r} has no data yet")
+    return shard
+
+# FastAPI Dependency: Existing Shard of the `room` Query Parameter (read routes)
+def get_room(room: Optional[str] = ROOM_QUERY) -> RoomShard:
+    '''
+    The requested room's shard. Rooms nothing was ingested into get a 404,
+    so reads never open rooms; rooms this process does not serve (see
+    ROOMS) get a 421 so a misconfigured proxy is noticed.
+    '''
+    try:
+        return find_room(room or DEFAULT_ROOM)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except LookupError as e:
+        raise HTTPException(status_code=421, detail=str(e))
+
+# FastAPI Dependency: Shard of the `room` Query Parameter, Opened on First Use (ingest routes)
+def get_ingest_room(room: Optional[str] = ROOM_QUERY) -> RoomShard:
+    try:
+        return rooms.shard(room or DEFAULT_ROOM)
+    except LookupError as e:
+        raise HTTPException(status_code=421, detail=str(e))
+
+# Resolve the Existing Room of a WebSocket (dependencies cannot answer a WebSocket with an HTTP error)
+async def get_websocket_room(websocket: WebSocket, room: Optional[str]) -> Optional[RoomShard]:
+    try:
+        return find_room(room or DEFAULT_ROOM)
+    except LookupError as e:
+        await websocket.close(code=1008, reason=e.args[0])
+        return None
+
+# Resolve the Room of an Ingest WebSocket, Opened on First Use
+async def get_websocket_ingest_room(websocket: WebSocket, room: Optional[str]) -> Optional[RoomShard]:
+    try:
+        return rooms.shard(room or DEFAULT_ROOM)
+    except LookupError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return None
+
+@router.get("/api/rooms", tags=["Rooms"], response_model=Dict[str, Any], response_class=FastJSONResponse)
+async def list_rooms():
+    '''
+    Rooms open in this process, with per-room ingest and stream statistics.
+    '''
+    return rooms.get_stats()
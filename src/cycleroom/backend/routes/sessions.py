@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from backend.ingest import DEFAULT_ROOM, ingest_frames
+from backend.routes.bike_data import BikeFrame, BulkIngestResponse
+from backend.routes.rooms import ROOM_QUERY
+from backend.sessions import session_manager, Session
+from backend.utils.db_utils import get_storage
+from backend.utils.storage import Storage
+from backend.utils.responses import FastJSONResponse
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Frame posted by utils/import_json.py: a decoded frame plus the recording's MAC address
+class ReplayFrame(BikeFrame):
+    device_address: Optional[str] = None
+    bluetooth_mac: Optional[str] = None
+    equipment_id: Optional[str] = None
+
+class SessionStart(BaseModel):
+    name: Optional[str] = None
+    ftp: Optional[float] = None
+    max_hr: Optional[float] = None
+
+async def _load_session(session_id: str, storage: Storage) -> Session:
+    session = session_manager.get(session_id)
+    if session is not None:
+        return session
+    stored = await storage.get_session(session_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return Session.from_record(stored["session"], stored["riders"])
+
+@router.post("/sessions", tags=["Sessions"], response_model=BulkIngestResponse, response_class=FastJSONResponse)
+async def replay_frame(frame: ReplayFrame):
+    '''
+    Ingest one replayed frame (utils/import_json.py).
+
+    The frame goes through the normal ingest path, so it updates the live
+    state, the storage writers and the current session alike.
+    '''
+    device_address = frame.device_address or frame.bluetooth_mac
+    if not device_address:
+        raise HTTPException(status_code=422, detail="device_address or bluetooth_mac is required")
+    data = frame.model_dump(exclude={"bluetooth_mac", "equipment_id"})
+    data["device_address"] = device_address
+    return {"accepted": ingest_frames([data])}
+
+@router.post("/api/sessions", tags=["Sessions"], response_model=Dict[str, Any], response_class=FastJSONResponse)
+async def start_session(request: SessionStart, room: Optional[str] = ROOM_QUERY):
+    '''
+    Start a new session in a room, ending the one running there. FTP and max
+    HR set the power and heart rate zones (SESSION_FTP / SESSION_MAX_HR by
+    default).
+    '''
+    session = session_manager.start(request.name, request.ftp, request.max_hr, room or DEFAULT_ROOM)
+    return session.info()
+
+@router.post("/api/sessions/end", tags=["Sessions"], response_model=Dict[str, Any], response_class=FastJSONResponse)
+async def end_session(room: Optional[str] = ROOM_QUERY, storage: Storage = Depends(get_storage)):
+    '''
+    End a room's running session and return its summary once it is checkpointed.
+    '''
+    session = session_manager.end(room or DEFAULT_ROOM)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No session is running")
+    try:
+        await session_manager.checkpoint(storage)
+    except Exception as e:
+        # The periodic checkpoint retries; the summary is already in memory
+        logger.error(f"❌ Session checkpoint failed: {e}")
+    return session.summary()
+
+@router.get("/api/sessions", tags=["Sessions"], response_model=List[Dict[str, Any]],
+            response_class=FastJSONResponse)
+async def list_sessions(limit: int = Query(50, ge=1, le=1000), storage: Storage = Depends(get_storage)):
+    '''
+    Sessions newest first: the ones held in memory (with rider counts), then
+    older ones from storage.
+    '''
+    sessions = session_manager.list_sessions()[:limit]
+    seen = {session["session_id"] for session in sessions}
+    for record in await storage.list_sessions(limit):
+        if len(sessions) >= limit:
+            break
+        if record["session_id"] not in seen:
+            sessions.append({key: record[key] for key in ("session_id", "name", "started_at", "ended_at")})
+    return sessions
+
+@router.get("/api/sessions/current", tags=["Sessions"], response_model=Dict[str, Any],
+            response_class=FastJSONResponse)
+async def get_current_session(room: Optional[str] = ROOM_QUERY):
+    '''
+    Live summary of a room's running session.
+    '''
+    session = session_manager.current(room or DEFAULT_ROOM)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No session is running")
+    return session.summary()
+
+@router.get("/api/sessions/{session_id}", tags=["Sessions"], response_model=Dict[str, Any],
+            response_class=FastJSONResponse)
+async def get_session_summary(session_id: str, storage: Storage = Depends(get_storage)):
+    '''
+    Per-rider summary of a session: average, max and normalized power, kJ,
+    average cadence and heart rate, time in zones and distance.
+
+    Built from the running aggregates (or their last checkpoint), never
+    from a scan of bike_data.
+    '''
+    session = await _load_session(session_id, storage)
+    return session.summary()
+
+@router.get("/api/sessions/{session_id}/riders/{bike_id}", tags=["Sessions"], response_model=Dict[str, Any],
+            response_class=FastJSONResponse)
+async def get_rider_summary(session_id: str, bike_id: str, storage: Storage = Depends(get_storage)):
+    session = await _load_session(session_id, storage)
+    rider = session.riders.get(bike_id)
+    if rider is None:
+        raise HTTPException(status_code=404, detail="Bike not found in session")
+    return rider.summary()
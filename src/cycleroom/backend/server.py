@@ -1,7 +1,29 @@
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from contextlib import asynccontextmanager
 from backend.routes.bike_data import router as bike_data_router
+from backend.routes.bike_stream import router as bike_stream_router
+from backend.routes.bike_selection import router as bike_selection_router
 from backend.routes.historical_data import router as historical_data_router
+from backend.routes.ingest_ws import router as ingest_ws_router
+from backend.routes.sessions import router as sessions_router
+from backend.routes.riders import router as riders_router
+from backend.routes.leaderboard import router as leaderboard_router
+from backend.routes.rooms import router as rooms_router
+from backend.ingest import register_annotator, register_sink, unregister_sink
+from backend.rooms import rooms
+from backend.sessions import session_manager
+from backend.power_curves import power_curves
+from backend.bike_mappings import bike_mappings
+from backend.utils.metrics import metrics, CONTENT_TYPE
+from backend.utils.db_utils import (
+    open_storage,
+    close_storage,
+    load_live_state,
+    load_bike_selections,
+    get_pool_stats,
+)
+import asyncio
 import logging
 
 # Logger Configuration
@@ -11,17 +33,105 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# The ingest path tags frames with their bike number, hands each room's frames to that room's
+# shard (live state, leaderboard and stream subscribers) and folds them into the current session
+register_annotator(bike_mappings.annotate)
+register_sink(rooms.dispatch)
+register_sink(session_manager.update)
+# Ended sessions get their power curves computed once, in the background
+session_manager.add_end_listener(power_curves.session_ended)
+
+# Application Lifespan: shared resources for all routes
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    storage = await open_storage()
+    await load_bike_selections(bike_mappings)
+    # Storage is only queried once for the latest frames, to seed the live state after a restart
+    await load_live_state(rooms)
+    if storage.available:
+        try:
+            await session_manager.restore(storage)
+        except Exception as e:
+            logger.error(f"❌ Could not restore the running session: {e}")
+    tasks = [asyncio.create_task(task) for task in storage.background_tasks()]
+    tasks.append(asyncio.create_task(rooms.run()))
+    tasks.append(asyncio.create_task(session_manager.run(storage)))
+    tasks.append(asyncio.create_task(power_curves.run(storage)))
+    writers = storage.create_writers()
+    for writer in writers.values():
+        register_sink(writer.enqueue)
+        tasks.append(asyncio.create_task(writer.run()))
+    app.state.storage = storage
+    app.state.writers = writers
+    metrics.gauge("cycleroom_writer_pending_frames", "Frames buffered for the next batch write", ("store",),
+                  fn=lambda: {(writer.store,): len(writer.pending) for writer in writers.values()})
+    yield
+    for writer in writers.values():
+        unregister_sink(writer.enqueue)
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await close_storage()
+
 # FastAPI App Initialization
 app = FastAPI(
     title="CycleRoom API",
     description="API for real-time and historical bike race data",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Register Modular Routers
 app.include_router(bike_data_router)
+app.include_router(bike_stream_router)
+app.include_router(bike_selection_router)
 app.include_router(historical_data_router)
+app.include_router(ingest_ws_router)
+app.include_router(sessions_router)
+app.include_router(riders_router)
+app.include_router(leaderboard_router)
+app.include_router(rooms_router)
 
 @app.get("/", tags=["Root"])
 async def root():
     return {"message": "CycleRoom API is running!"}
+
+@app.get("/metrics", tags=["Root"], response_class=Response)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+@app.get("/api/bikes/stream/stats", tags=["Root"])
+async def live_stream_stats():
+    return {name: {"subscribers": shard.live_stream.subscribers, "seq": shard.live_stream.seq}
+            for name, shard in rooms.shards.items()}
+
+@app.get("/api/riders/power-curves/stats", tags=["Root"])
+async def power_curve_stats():
+    return power_curves.get_stats()
+
+@app.get("/api/db/storage", tags=["Root"])
+async def storage_stats():
+    return app.state.storage.get_stats()
+
+@app.get("/api/db/pool", tags=["Root"])
+async def pool_stats():
+    return get_pool_stats()
+
+@app.get("/api/db/influx-writer", tags=["Root"])
+async def influx_writer_stats():
+    writer = app.state.writers.get("influx")
+    return writer.get_stats() if writer else {"enabled": False}
+
+@app.get("/api/db/timescale-writer", tags=["Root"])
+async def timescale_writer_stats():
+    writer = app.state.writers.get("timescale")
+    return writer.get_stats() if writer else {"enabled": False}
+
+@app.get("/api/db/sqlite-writer", tags=["Root"])
+async def sqlite_writer_stats():
+    writer = app.state.writers.get("sqlite")
+    return writer.get_stats() if writer else {"enabled": False}
@@ -0,0 +1,411 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from backend.ingest import DEFAULT_ROOM, epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+SESSION_FTP = float(os.getenv("SESSION_FTP", 200))
+SESSION_MAX_HR = float(os.getenv("SESSION_MAX_HR", 190))
+SESSION_AUTO_START = os.getenv("SESSION_AUTO_START", "true").lower() == "true"
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", 600))
+SESSION_CHECKPOINT_INTERVAL = float(os.getenv("SESSION_CHECKPOINT_INTERVAL", 30))
+# Longer gaps between two frames of a rider count as a pause, not as riding time
+SESSION_MAX_GAP = float(os.getenv("SESSION_MAX_GAP", 5))
+# Ended sessions kept in memory for instant summaries
+SESSION_HISTORY = int(os.getenv("SESSION_HISTORY", 20))
+
+# Normalized power: 30 s rolling average of 1 s power samples
+NP_WINDOW = 30
+# Upper bounds of power zones 1-6 as a fraction of FTP (Coggan); zone 7 is everything above
+POWER_ZONE_BOUNDS = (0.55, 0.75, 0.90, 1.05, 1.20, 1.50)
+# Upper bounds of heart rate zones 1-4 as a fraction of max HR; zone 5 is everything above
+HR_ZONE_BOUNDS = (0.60, 0.70, 0.80, 0.90)
+
+# RiderAggregate attributes saved in a checkpoint
+STATE_FIELDS = (
+    "bike_number", "frames", "first_ts", "last_ts", "last_power", "last_cadence", "last_heart_rate",
+    "moving_time", "energy_j", "max_power", "cadence_time", "cadence_sum", "max_cadence",
+    "heart_rate_time", "heart_rate_sum", "max_heart_rate", "power_zones", "heart_rate_zones",
+    "first_distance", "last_distance", "distance_offset", "next_second", "window_sum", "np_sum", "np_count",
+)
+
+
+def _round(value: Optional[float], digits: int = 1) -> Optional[float]:
+    return round(value, digits) if value is not None else None
+
+
+class RiderAggregate:
+    """
+    Running workout totals for one rider in one session, O(1) per frame.
+
+    Metrics hold their value until the next frame (zero-order hold), so
+    averages are time-weighted and not skewed by the scanner dropping
+    repeated advertisements. Gaps longer than SESSION_MAX_GAP are pauses.
+    Normalized power resamples power to 1 s and keeps a 30-sample ring with
+    a running sum, so each frame adds at most SESSION_MAX_GAP samples.
+    """
+
+    def __init__(self, bike_id: str, ftp: float = SESSION_FTP, max_hr: float = SESSION_MAX_HR):
+        self.bike_id = bike_id
+        self.power_bounds = [bound * ftp for bound in POWER_ZONE_BOUNDS]
+        self.heart_rate_bounds = [bound * max_hr for bound in HR_ZONE_BOUNDS]
+        self.bike_number = None
+        self.frames = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.last_power = 0
+        self.last_cadence = 0.0
+        self.last_heart_rate = 0.0
+        self.moving_time = 0.0
+        self.energy_j = 0.0
+        self.max_power = 0
+        self.cadence_time = 0.0
+        self.cadence_sum = 0.0
+        self.max_cadence = 0.0
+        self.heart_rate_time = 0.0
+        self.heart_rate_sum = 0.0
+        self.max_heart_rate = 0.0
+        self.power_zones = [0.0] * (len(POWER_ZONE_BOUNDS) + 1)
+        self.heart_rate_zones = [0.0] * (len(HR_ZONE_BOUNDS) + 1)
+        self.first_distance = None
+        self.last_distance = None
+        self.distance_offset = 0.0
+        self.next_second = None
+        self.window = deque(maxlen=NP_WINDOW)
+        self.window_sum = 0.0
+        self.np_sum = 0.0
+        self.np_count = 0
+
+    def add(self, timestamp: float, power=None, cadence=None, heart_rate=None, distance=None):
+        """Fold one frame in. Frames older than the last one are ignored."""
+        if self.last_ts is None:
+            self.first_ts = timestamp
+            self.next_second = timestamp
+        else:
+            if timestamp <= self.last_ts:
+                return
+            dt = min(timestamp - self.last_ts, SESSION_MAX_GAP)
+            self._hold(dt)
+            self._resample(self.last_ts + dt)
+            if timestamp - self.last_ts > SESSION_MAX_GAP:
+                self.next_second = timestamp
+        self.last_ts = timestamp
+        self.frames += 1
+        self.last_power = power or 0
+        self.last_cadence = cadence or 0.0
+        self.last_heart_rate = heart_rate or 0.0
+        self.max_power = max(self.max_power, self.last_power)
+        self.max_cadence = max(self.max_cadence, self.last_cadence)
+        self.max_heart_rate = max(self.max_heart_rate, self.last_heart_rate)
+        if distance is not None:
+            if self.first_distance is None:
+                self.first_distance = distance
+            elif distance < self.last_distance:
+                # The bike's trip counter was reset mid-session
+                self.distance_offset += self.last_distance
+            self.last_distance = distance
+
+    def _hold(self, dt: float):
+        """Credit `dt` seconds at the previous frame's values."""
+        self.moving_time += dt
+        self.energy_j += self.last_power * dt
+        self.power_zones[bisect_left(self.power_bounds, self.last_power)] += dt
+        if self.last_cadence > 0:
+            self.cadence_time += dt
+            self.cadence_sum += self.last_cadence * dt
+        if self.last_heart_rate > 0:
+            self.heart_rate_time += dt
+            self.heart_rate_sum += self.last_heart_rate * dt
+            self.heart_rate_zones[bisect_left(self.heart_rate_bounds, self.last_heart_rate)] += dt
+
+    def _resample(self, until: float):
+        """Push the 1 s power samples before `until` into the normalized power window."""
+        while self.next_second < until:
+            if len(self.window) == NP_WINDOW:
+                self.window_sum -= self.window[0]
+            self.window.append(self.last_power)
+            self.window_sum += self.last_power
+            if len(self.window) == NP_WINDOW:
+                self.np_sum += (self.window_sum / NP_WINDOW) ** 4
+                self.np_count += 1
+            self.next_second += 1
+
+    @property
+    def normalized_power(self) -> Optional[float]:
+        return (self.np_sum / self.np_count) ** 0.25 if self.np_count else None
+
+    @property
+    def distance(self) -> float:
+        if self.first_distance is None:
+            return 0.0
+        return self.distance_offset + self.last_distance - self.first_distance
+
+    def summary(self) -> dict:
+        return {
+            "bike_id": self.bike_id,
+            "bike_number": self.bike_number,
+            "frames": self.frames,
+            "duration_s": _round(self.moving_time),
+            "avg_power": _round(self.energy_j / self.moving_time) if self.moving_time else None,
+            "max_power": self.max_power,
+            "normalized_power": _round(self.normalized_power),
+            "kj": _round(self.energy_j / 1000, 2),
+            "avg_cadence": _round(self.cadence_sum / self.cadence_time) if self.cadence_time else None,
+            "max_cadence": self.max_cadence,
+            "avg_heart_rate": _round(self.heart_rate_sum / self.heart_rate_time) if self.heart_rate_time else None,
+            "max_heart_rate": self.max_heart_rate,
+            "distance": _round(self.distance, 3),
+            "power_zones_s": [_round(seconds) for seconds in self.power_zones],
+            "heart_rate_zones_s": [_round(seconds) for seconds in self.heart_rate_zones],
+        }
+
+    def to_state(self) -> dict:
+        return {**{field: getattr(self, field) for field in STATE_FIELDS}, "window": list(self.window)}
+
+    @classmethod
+    def from_state(cls, bike_id: str, state: dict, ftp: float = SESSION_FTP, max_hr: float = SESSION_MAX_HR):
+        rider = cls(bike_id, ftp, max_hr)
+        for field in STATE_FIELDS:
+            if field in state:
+                setattr(rider, field, state[field])
+        rider.window.extend(state.get("window", ()))
+        return rider
+
+
+class Session:
+    """One class in one room: start/end times, zone settings and a RiderAggregate per bike."""
+
+    def __init__(self, session_id: Optional[str] = None, name: Optional[str] = None,
+                 ftp: Optional[float] = None, max_hr: Optional[float] = None,
+                 started_at: Optional[datetime] = None, ended_at: Optional[datetime] = None,
+                 room: str = DEFAULT_ROOM):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.name = name
+        self.room = room
+        self.ftp = ftp or SESSION_FTP
+        self.max_hr = max_hr or SESSION_MAX_HR
+        self.started_at = started_at or datetime.now(timezone.utc)
+        self.ended_at = ended_at
+        self.riders: Dict[str, RiderAggregate] = {}
+        self.last_frame_at = time.monotonic()
+        # Riders (and the session row itself) changed since the last checkpoint
+        self.dirty_riders = set()
+        self.dirty = True
+
+    def add_frames(self, frames: list):
+        for frame in frames:
+            bike_id = frame["device_address"]
+            rider = self.riders.get(bike_id)
+            if rider is None:
+                rider = self.riders[bike_id] = RiderAggregate(bike_id, self.ftp, self.max_hr)
+            rider.bike_number = frame.get("bike_number") or rider.bike_number
+            rider.add(epoch_seconds(frame["timestamp"]), frame.get("power"), frame.get("cadence"),
+                      frame.get("heart_rate"), frame.get("trip_distance"))
+            self.dirty_riders.add(bike_id)
+        self.last_frame_at = time.monotonic()
+
+    def end(self):
+        if self.ended_at is None:
+            self.ended_at = datetime.now(timezone.utc)
+            self.dirty = True
+
+    def info(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "name": self.name,
+            "room": self.room,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "riders": len(self.riders),
+        }
+
+    def summary(self) -> dict:
+        return {**self.info(), "ftp": self.ftp, "max_hr": self.max_hr,
+                "riders": {bike_id: rider.summary() for bike_id, rider in self.riders.items()}}
+
+    def to_record(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            # The room lives in settings, so the session tables need no extra column
+            "settings": {"ftp": self.ftp, "max_hr": self.max_hr, "room": self.room},
+        }
+
+    def take_dirty(self) -> Dict[str, dict]:
+        """Checkpoint states of the riders changed since the last call."""
+        states = {bike_id: self.riders[bike_id].to_state() for bike_id in self.dirty_riders}
+        self.dirty_riders = set()
+        self.dirty = False
+        return states
+
+    @classmethod
+    def from_record(cls, record: dict, riders: Dict[str, dict]) -> "Session":
+        settings = record.get("settings") or {}
+        session = cls(record["session_id"], record.get("name"), settings.get("ftp"), settings.get("max_hr"),
+                      record["started_at"], record.get("ended_at"), settings.get("room") or DEFAULT_ROOM)
+        for bike_id, state in riders.items():
+            session.riders[bike_id] = RiderAggregate.from_state(bike_id, state, session.ftp, session.max_hr)
+        session.dirty = False
+        return session
+
+
+class SessionManager:
+    """
+    Tracks the running session of each room and feeds it from the ingest path.
+
+    `update()` is registered as an ingest sink and hands each frame to the
+    session of its "room", so studios running classes at the same time get
+    separate sessions. With auto start, the first frame of a room opens a
+    session when none is running there, and a session with no frames for
+    `idle_timeout` seconds is ended. `run()` checkpoints changed riders
+    to storage every `interval` seconds, so summaries survive a restart
+    without rescanning bike_data.
+    """
+
+    def __init__(self, auto_start: bool = SESSION_AUTO_START, idle_timeout: float = SESSION_IDLE_TIMEOUT,
+                 history: int = SESSION_HISTORY):
+        self.auto_start = auto_start
+        self.idle_timeout = idle_timeout
+        self.history = history
+        # Running session by room
+        self.running: Dict[str, Session] = {}
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.end_listeners: List[Callable[[Session], None]] = []
+
+    def add_end_listener(self, listener: Callable[[Session], None]):
+        """Call `listener(session)` whenever a session ends."""
+        self.end_listeners.append(listener)
+
+    def current(self, room: str = DEFAULT_ROOM) -> Optional[Session]:
+        """The running session of a room."""
+        return self.running.get(room)
+
+    def session_of(self, bike_id: str) -> Optional[Session]:
+        """The running session a bike is riding in, in any room."""
+        for session in self.running.values():
+            if bike_id in session.riders:
+                return session
+        return None
+
+    def start(self, name: Optional[str] = None, ftp: Optional[float] = None,
+              max_hr: Optional[float] = None, room: str = DEFAULT_ROOM) -> Session:
+        """End the room's running session (if any) and open a new one."""
+        self.end(room)
+        session = Session(name=name, ftp=ftp, max_hr=max_hr, room=room)
+        self._remember(session)
+        self.running[room] = session
+        logger.info(f"🏁 Session {session.session_id} started in room {room}")
+        return session
+
+    def end(self, room: str = DEFAULT_ROOM) -> Optional[Session]:
+        session = self.running.pop(room, None)
+        if session is not None:
+            session.end()
+            logger.info(f"🏁 Session {session.session_id} ended with {len(session.riders)} riders")
+            for listener in self.end_listeners:
+                listener(session)
+        return session
+
+    def resume(self, session: Session):
+        """Adopt a session restored from storage (still running when the API stopped)."""
+        self._remember(session)
+        if session.ended_at is None:
+            self.running[session.room] = session
+
+    def _remember(self, session: Session):
+        self.sessions[session.session_id] = session
+        while len(self.sessions) > self.history:
+            oldest_id, oldest = next(iter(self.sessions.items()))
+            if self.running.get(oldest.room) is oldest or oldest.dirty or oldest.dirty_riders:
+                break
+            del self.sessions[oldest_id]
+
+    def get(self, session_id: str) -> Optional[Session]:
+        return self.sessions.get(session_id)
+
+    def update(self, frames: list):
+        """Ingest sink: fold each room's part of the batch into that room's session."""
+        by_room: Dict[str, list] = {}
+        for frame in frames:
+            by_room.setdefault(frame.get("room") or DEFAULT_ROOM, []).append(frame)
+        for room, room_frames in by_room.items():
+            session = self.running.get(room)
+            if session is None:
+                if not self.auto_start:
+                    continue
+                session = self.start(room=room)
+            session.add_frames(room_frames)
+
+    def end_if_idle(self):
+        now = time.monotonic()
+        for room, session in list(self.running.items()):
+            if now - session.last_frame_at > self.idle_timeout:
+                self.end(room)
+
+    async def checkpoint(self, storage) -> int:
+        """Write every changed session to storage. Returns the number of rider states written."""
+        written = 0
+        for session in list(self.sessions.values()):
+            if not session.dirty and not session.dirty_riders:
+                continue
+            states = session.take_dirty()
+            try:
+                await storage.checkpoint_session(session.to_record(), states)
+            except Exception:
+                # Keep them dirty for the next attempt
+                session.dirty = True
+                session.dirty_riders.update(states)
+                raise
+            written += len(states)
+        return written
+
+    async def restore(self, storage) -> List[Session]:
+        """Resume the newest session of each room from storage if it never ended."""
+        resumed = []
+        seen_rooms = set()
+        for record in await storage.list_sessions(limit=self.history):
+            room = (record.get("settings") or {}).get("room") or DEFAULT_ROOM
+            if room in seen_rooms:
+                continue
+            seen_rooms.add(room)
+            if record.get("ended_at") is None:
+                stored = await storage.get_session(record["session_id"])
+                session = Session.from_record(stored["session"], stored["riders"])
+                self.resume(session)
+                resumed.append(session)
+                logger.info(f"✅ Resumed session {session.session_id} in room {room} "
+                            f"with {len(session.riders)} riders")
+        return resumed
+
+    async def run(self, storage, interval: float = SESSION_CHECKPOINT_INTERVAL):
+        """End idle sessions and checkpoint until cancelled, then checkpoint once more."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                self.end_if_idle()
+                try:
+                    await self.checkpoint(storage)
+                except Exception as e:
+                    logger.error(f"❌ Session checkpoint failed: {e}")
+        finally:
+            try:
+                await self.checkpoint(storage)
+            except Exception as e:
+                logger.error(f"❌ Final session checkpoint failed: {e}")
+
+    def list_sessions(self) -> List[dict]:
+        return [session.info() for session in reversed(self.sessions.values())]
+
+
+# Shared session tracker for the API process
+session_manager = SessionManager()
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import zlib
+from collections import deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+SPOOL_ENABLED = os.getenv("SPOOL_ENABLED", "true").lower() == "true"
+SPOOL_DIR = os.getenv("SPOOL_DIR", "spool")
+SPOOL_SEGMENT_BYTES = int(os.getenv("SPOOL_SEGMENT_BYTES", 4 * 1024 * 1024))
+SPOOL_MAX_BYTES = int(os.getenv("SPOOL_MAX_BYTES", 256 * 1024 * 1024))
+# Spooled records combined into one replayed request/message
+SPOOL_DRAIN_RECORDS = int(os.getenv("SPOOL_DRAIN_RECORDS", 20))
+
+# Record header: data length, CRC32 of the data, state. Segments are
+# preallocated with zeros, so a zero length marks the end of the written part.
+RECORD_HEADER = struct.Struct("<IIB")
+PENDING = 1
+DELIVERED = 2
+SEGMENT_SUFFIX = ".seg"
+
+
+class Segment:
+    """One preallocated, memory-mapped spool file."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        create = not os.path.exists(path)
+        self.file = open(path, "w+b" if create else "r+b")
+        if create:
+            self.file.truncate(size)
+        self.size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), self.size)
+        self.write_offset = 0
+        # (offset, length) of records not yet delivered, oldest first
+        self.pending = deque()
+        self.pending_bytes = 0
+
+    def recover(self) -> int:
+        """Rebuild the pending list from disk. Returns the number of corrupt records found."""
+        offset = 0
+        while offset + RECORD_HEADER.size <= self.size:
+            length, crc, state = RECORD_HEADER.unpack_from(self.map, offset)
+            if length == 0:
+                break
+            start = offset + RECORD_HEADER.size
+            # A torn or corrupt record ends the segment: nothing after it can be trusted
+            if start + length > self.size or zlib.crc32(self.map[start:start + length]) != crc:
+                self.write_offset = self.size
+                return 1
+            if state == PENDING:
+                self.pending.append((offset, length))
+                self.pending_bytes += length
+            offset = start + length
+        self.write_offset = offset
+        return 0
+
+    def fits(self, length: int) -> bool:
+        return self.write_offset + RECORD_HEADER.size + length <= self.size
+
+    def append(self, data: bytes):
+        offset = self.write_offset
+        start = offset + RECORD_HEADER.size
+        self.map[start:start + len(data)] = data
+        # Header last, so a crash mid-write leaves a zero length (end of segment)
+        RECORD_HEADER.pack_into(self.map, offset, len(data), zlib.crc32(data), PENDING)
+        self.write_offset = start + len(data)
+        self.pending.append((offset, len(data)))
+        self.pending_bytes += len(data)
+
+    def read(self, offset: int, length: int) -> bytes:
+        start = offset + RECORD_HEADER.size
+        return self.map[start:start + length]
+
+    def mark_delivered(self, offset: int):
+        self.map[offset + RECORD_HEADER.size - 1] = DELIVERED
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.file.close()
+
+
+class Spool:
+    """
+    Append-only, segmented on-disk spool for data the scanner could not deliver.
+
+    Each record is an opaque blob (a JSON bulk payload or an encoded binary
+    ingest message) stored with its CRC32 in a memory-mapped segment file.
+    Delivery is acknowledged by flipping the record's state byte in place, so
+    a restart resumes exactly where replay stopped; corrupt or torn records
+    are skipped on recovery. Fully delivered segments are deleted, and once
+    the spool would exceed `max_bytes` the oldest segments are evicted.
+    """
+
+    def __init__(self, directory: str = SPOOL_DIR, segment_bytes: int = SPOOL_SEGMENT_BYTES,
+                 max_bytes: int = SPOOL_MAX_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.segments = deque()
+        self.next_sequence = 0
+        self.stats = {
+            "appended_records": 0,
+            "appended_bytes": 0,
+            "replayed_records": 0,
+            "evicted_records": 0,
+            "evicted_bytes": 0,
+            "corrupt_records": 0,
+        }
+        self.has_backlog = asyncio.Event()
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    def _recover(self):
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(SEGMENT_SUFFIX))
+        for name in names:
+            segment = Segment(os.path.join(self.directory, name), self.segment_bytes)
+            self.stats["corrupt_records"] += segment.recover()
+            self.segments.append(segment)
+            self.next_sequence = int(name[:-len(SEGMENT_SUFFIX)]) + 1
+        # Keep the newest segment open for appends; drop the rest once delivered
+        for segment in list(self.segments)[:-1]:
+            if not segment.pending:
+                self._remove(segment)
+        if self.backlog_records:
+            self.has_backlog.set()
+            logger.info(f"📼 Recovered spool backlog: {self.backlog_records} records in {len(self.segments)} segments")
+
+    @property
+    def backlog_records(self) -> int:
+        return sum(len(segment.pending) for segment in self.segments)
+
+    @property
+    def backlog_bytes(self) -> int:
+        return sum(segment.pending_bytes for segment in self.segments)
+
+    @property
+    def disk_bytes(self) -> int:
+        return sum(segment.size for segment in self.segments)
+
+    def _remove(self, segment: Segment):
+        segment.close()
+        os.remove(segment.path)
+        self.segments.remove(segment)
+
+    def _new_segment(self, length: int) -> Segment:
+        size = max(self.segment_bytes, RECORD_HEADER.size + length)
+        # Oldest-segment eviction keeps the spool under max_bytes
+        while self.segments and self.disk_bytes + size > self.max_bytes:
+            oldest = self.segments[0]
+            self.stats["evicted_records"] += len(oldest.pending)
+            self.stats["evicted_bytes"] += oldest.pending_bytes
+            logger.warning(f"⚠️ Spool full; evicting {len(oldest.pending)} undelivered records")
+            self._remove(oldest)
+        path = os.path.join(self.directory, f"{self.next_sequence:012d}{SEGMENT_SUFFIX}")
+        self.next_sequence += 1
+        segment = Segment(path, size)
+        self.segments.append(segment)
+        return segment
+
+    def append(self, data: bytes):
+        """Store one undelivered record."""
+        if not data:
+            return
+        active = self.segments[-1] if self.segments else None
+        if active is None or not active.fits(len(data)):
+            if active is not None:
+                active.map.flush()
+                if not active.pending:
+                    self._remove(active)
+            active = self._new_segment(len(data))
+        active.append(data)
+        self.stats["appended_records"] += 1
+        self.stats["appended_bytes"] += len(data)
+        self.has_backlog.set()
+
+    def peek(self, max_records: int = SPOOL_DRAIN_RECORDS) -> list:
+        """The oldest undelivered records as (segment, offset, data) tuples, without removing them."""
+        records = []
+        for segment in self.segments:
+            for offset, length in segment.pending:
+                if len(records) == max_records:
+                    return records
+                records.append((segment, offset, segment.read(offset, length)))
+        return records
+
+    def ack(self, records: list):
+        """Mark records returned by `peek()` as delivered, in the order they were returned."""
+        for segment, offset, data in records:
+            if segment not in self.segments or not segment.pending or segment.pending[0][0] != offset:
+                continue  # Evicted while the replay was in flight
+            segment.mark_delivered(offset)
+            segment.pending.popleft()
+            segment.pending_bytes -= len(data)
+            self.stats["replayed_records"] += 1
+            if not segment.pending and segment is not self.segments[-1]:
+                self._remove(segment)
+        if not self.backlog_records:
+            self.has_backlog.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "backlog_records": self.backlog_records,
+            "backlog_bytes": self.backlog_bytes,
+            "segments": len(self.segments),
+            "disk_bytes": self.disk_bytes,
+        }
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments.clear()
+
+
+def create_spool() -> Optional[Spool]:
+    """The scanner's spool, or None when SPOOL_ENABLED is false."""
+    return Spool() if SPOOL_ENABLED else None
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+from backend.utils.storage import write_failures, write_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter(ABC):
+    """
+    Buffering shared by the batched storage writers.
+
+    `enqueue()` is registered as an ingest sink and only appends to a bounded
+    in-memory buffer (oldest frames are dropped past `max_pending` unless
+    `_overflow()` is overridden). A background task flushes the buffer every
+    `flush_interval` seconds or as soon as `batch_size` frames are waiting;
+    a failed batch is put back at the front of the buffer for the next flush.
+
+    Subclasses only implement `_write_batch()`, which writes one batch to the
+    store and returns the number of frames it stored.
+    """
+
+    # Label of the writer's metrics and name used in log messages
+    store = "abstract"
+    display_name = "storage"
+    # Stats key counting the stored frames
+    written_stat = "written"
+
+    def __init__(self, batch_size: int = 5000, flush_interval: float = 1.0, max_pending: int = 100_000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = deque()
+        self._batch_ready = asyncio.Event()
+        self._write_seconds = write_seconds.labels(self.store)
+        self._write_failures = write_failures.labels(self.store)
+        self.stats = {
+            "batches": 0,
+            self.written_stat: 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "errors": 0,
+            "last_error": None,
+            "dropped": 0,
+        }
+
+    def _overflow(self, frames: list, overflow: int) -> list:
+        """Make room for `overflow` frames past max_pending. Returns the frames still to buffer."""
+        from_pending = min(overflow, len(self.pending))
+        for _ in range(from_pending):
+            self.pending.popleft()
+        self.stats["dropped"] += overflow
+        return frames[overflow - from_pending:]
+
+    def enqueue(self, frames: list):
+        """Ingest sink: buffer frames for the next flush without blocking."""
+        overflow = len(self.pending) + len(frames) - self.max_pending
+        if overflow > 0:
+            frames = self._overflow(frames, overflow)
+        self.pending.extend(frames)
+        if len(self.pending) >= self.batch_size:
+            self._batch_ready.set()
+
+    @abstractmethod
+    async def _write_batch(self, batch: list) -> int:
+        """Write one batch of frames. Returns the number of frames stored."""
+
+    async def flush(self) -> int:
+        """Write up to one batch. Returns the number of frames taken from the buffer."""
+        if not self.pending:
+            return 0
+        batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+        started = time.perf_counter()
+        try:
+            written = await self._write_batch(batch)
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.stats["last_error"] = str(e)
+            self._write_failures.inc()
+            logger.error(f"❌ {self.display_name} batch write of {len(batch)} frames failed: {e}")
+            room = self.max_pending - len(self.pending)
+            self.stats["dropped"] += max(0, len(batch) - room)
+            self.pending.extendleft(reversed(batch[:max(0, room)]))
+            return 0
+        elapsed = time.perf_counter() - started
+        elapsed_ms = elapsed * 1000
+        self._write_seconds.observe(elapsed)
+        self.stats["batches"] += 1
+        self.stats[self.written_stat] += written
+        self.stats["last_batch_size"] = len(batch)
+        self.stats["last_flush_ms"] = elapsed_ms
+        self.stats["max_flush_ms"] = max(self.stats["max_flush_ms"], elapsed_ms)
+        return len(batch)
+
+    async def run(self):
+        """Flush on size or interval until cancelled, then drain what is left."""
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._batch_ready.clear()
+                written = await self.flush()
+                # Keep flushing back to back while full batches are waiting
+                while written and len(self.pending) >= self.batch_size:
+                    written = await self.flush()
+        finally:
+            while self.pending and await self.flush():
+                pass
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "pending": len(self.pending)}
@@ -3,37 +3,252 @@ from influxdb_client.client.query_api import QueryApi
 from influxdb_client.client.write_api import SYNCHRONOUS
 from influxdb_client.client.exceptions import InfluxDBError
 from config.config import INFLUXDB_URL, INFLUXDB_TOKEN, INFLUXDB_ORG, INFLUXDB_BUCKET
+from config.config import (
+    INFLUX_BATCH_SIZE,
+    INFLUX_FLUSH_INTERVAL,
+    INFLUX_MAX_PENDING,
+    INFLUX_OVERFLOW_POLICY,
+    INFLUX_SPILL_PATH,
+    INFLUX_SPILL_MAX_BYTES,
+)
+from config.config import (
+    TIMESCALEDB_HOST,
+    TIMESCALEDB_PORT,
+    TIMESCALEDB_USER,
+    TIMESCALEDB_PASSWORD,
+    TIMESCALEDB_DB,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_POOL_MAX_INACTIVE_LIFETIME,
+    DB_HEALTH_CHECK_INTERVAL,
+    HISTORICAL_CHUNK_SIZE,
+    TIMESCALE_BATCH_SIZE,
+    TIMESCALE_FLUSH_INTERVAL,
+    TIMESCALE_MAX_PENDING,
+    TIMESCALE_MAX_RETRIES,
+    RUN_MIGRATIONS,
+    BIKE_DATA_CHUNK_INTERVAL,
+    BIKE_DATA_COMPRESS_AFTER,
+    BIKE_DATA_RETENTION,
+)
+from config.config import (
+    STORAGE_BACKEND,
+    INFLUX_WRITE_ENABLED,
+    TIMESCALE_WRITE_ENABLED,
+    SQLITE_PATH,
+    SQLITE_RETENTION_DAYS,
+    SQLITE_BATCH_SIZE,
+    SQLITE_FLUSH_INTERVAL,
+)
+from backend.utils.influx_writer import InfluxBatchWriter
+from backend.utils.timescale_writer import TimescaleBatchWriter
+from backend.utils.historical_export import HISTORICAL_COLUMNS
+from backend.utils.metrics import metrics
+from backend.utils.migrations import run_migrations
+from backend.utils.storage import Storage, STORAGE_BACKENDS, timed_query
+from backend.utils.sqlite_storage import SQLiteStorage
+from fastapi import HTTPException
+from typing import Optional
+import asyncio
+import json
 import logging
+import time
 import asyncpg
-from datetime import datetime
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
-# Initialize InfluxDB Client
-client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
-query_api = client.query_api()
-write_api = client.write_api(write_options=SYNCHRONOUS)
-
-# Asynchronous TimescaleDB Connection
-async def get_timescale_connection():
-    conn = await asyncpg.connect(
-        user='timescale_user', 
-        password='timescale_password',
-        database='timescale_db',
-        host='timescaledb_host'
+# InfluxDB Client, created on first use so the sqlite backend never opens it
+client: Optional[InfluxDBClient] = None
+query_api = None
+write_api = None
+
+def init_influx_client():
+    global client, query_api, write_api
+    if client is None:
+        client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    if query_api is None:
+        query_api = client.query_api()
+    if write_api is None:
+        write_api = client.write_api(write_options=SYNCHRONOUS)
+
+# Create the Batched InfluxDB Writer for Ingested Frames
+def create_influx_writer() -> InfluxBatchWriter:
+    init_influx_client()
+    # The SYNCHRONOUS write_api is only ever called from the writer's worker thread
+    return InfluxBatchWriter(
+        write_api,
+        bucket=INFLUXDB_BUCKET,
+        org=INFLUXDB_ORG,
+        batch_size=INFLUX_BATCH_SIZE,
+        flush_interval=INFLUX_FLUSH_INTERVAL,
+        max_pending=INFLUX_MAX_PENDING,
+        overflow_policy=INFLUX_OVERFLOW_POLICY,
+        spill_path=INFLUX_SPILL_PATH,
+        spill_max_bytes=INFLUX_SPILL_MAX_BYTES,
+    )
+
+# Shared TimescaleDB connection pool, created and closed by the FastAPI lifespan
+timescale_pool: Optional[asyncpg.Pool] = None
+pool_health = {"healthy": False, "last_check": None, "last_error": None, "check_latency_ms": None}
+# Whether bike_data has the unique (bike_id, timestamp) index; None until checked
+bike_data_unique_index: Optional[bool] = None
+
+# A non-partial unique index on exactly (bike_id, timestamp), as ON CONFLICT (bike_id, timestamp) infers it
+BIKE_DATA_UNIQUE_INDEX_QUERY = '''
+    SELECT EXISTS (
+        SELECT 1 FROM pg_index i
+        WHERE i.indrelid = to_regclass('bike_data') AND i.indisunique AND i.indpred IS NULL
+          AND i.indnkeyatts = 2
+          AND ARRAY(SELECT a.attname::text FROM pg_attribute a
+                    WHERE a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+                    ORDER BY a.attname) = ARRAY['bike_id', 'timestamp']
+    )
+'''
+
+# Create the TimescaleDB Connection Pool
+async def create_timescale_pool() -> Optional[asyncpg.Pool]:
+    global timescale_pool
+    try:
+        timescale_pool = await asyncpg.create_pool(
+            user=TIMESCALEDB_USER,
+            password=TIMESCALEDB_PASSWORD,
+            database=TIMESCALEDB_DB,
+            host=TIMESCALEDB_HOST,
+            port=TIMESCALEDB_PORT,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+            statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+            max_inactive_connection_lifetime=DB_POOL_MAX_INACTIVE_LIFETIME,
+            timeout=10,
+        )
+        pool_health.update(healthy=True, last_error=None)
+        logger.info(f"✅ TimescaleDB pool ready ({DB_POOL_MIN_SIZE}-{DB_POOL_MAX_SIZE} connections)")
+    except (OSError, asyncpg.PostgresError, asyncio.TimeoutError) as e:
+        timescale_pool = None
+        pool_health.update(healthy=False, last_error=str(e))
+        logger.error(f"❌ Could not create TimescaleDB pool: {e}")
+    return timescale_pool
+
+# Check for the Unique Index the Writer's ON CONFLICT Needs (when migrations are off)
+async def check_bike_data_index() -> Optional[bool]:
+    global bike_data_unique_index
+    if timescale_pool is None:
+        return None
+    try:
+        async with timescale_pool.acquire() as conn:
+            bike_data_unique_index = await conn.fetchval(BIKE_DATA_UNIQUE_INDEX_QUERY)
+    except (OSError, asyncpg.PostgresError, asyncio.TimeoutError) as e:
+        logger.warning(f"⚠️ Could not check the bike_data indexes: {e}")
+        return None
+    if not bike_data_unique_index:
+        logger.error("❌ bike_data has no unique (bike_id, timestamp) index and RUN_MIGRATIONS is off. "
+                     "Apply migration 0002; until then replayed batches are written with plain INSERTs "
+                     "and may duplicate rows.")
+    return bike_data_unique_index
+
+# Prepare the Schema After the Pool Was Created
+async def prepare_timescale_schema():
+    if RUN_MIGRATIONS:
+        await migrate_timescale()
+    else:
+        await check_bike_data_index()
+
+# Apply Pending Schema Migrations
+async def migrate_timescale() -> list:
+    if timescale_pool is None:
+        return []
+    try:
+        return await run_migrations(timescale_pool, {
+            "chunk_interval": BIKE_DATA_CHUNK_INTERVAL,
+            "compress_after": BIKE_DATA_COMPRESS_AFTER,
+            "retention": BIKE_DATA_RETENTION,
+        })
+    except Exception as e:
+        logger.error(f"❌ Schema migration failed: {e}")
+        return []
+
+# Close the TimescaleDB Connection Pool
+async def close_timescale_pool():
+    global timescale_pool
+    if timescale_pool is not None:
+        await timescale_pool.close()
+        timescale_pool = None
+        logger.info("🛑 TimescaleDB pool closed.")
+
+# Periodically check the pool (and create it if startup failed)
+async def monitor_timescale_pool(interval: float = DB_HEALTH_CHECK_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        if timescale_pool is None:
+            if await create_timescale_pool() is not None:
+                await prepare_timescale_schema()
+            continue
+        started = time.perf_counter()
+        try:
+            async with timescale_pool.acquire() as conn:
+                await conn.fetchval("SELECT 1")
+            pool_health.update(healthy=True, last_error=None)
+        except (OSError, asyncpg.PostgresError, asyncio.TimeoutError) as e:
+            pool_health.update(healthy=False, last_error=str(e))
+            logger.warning(f"⚠️ TimescaleDB health check failed: {e}")
+        pool_health["last_check"] = datetime.utcnow().isoformat()
+        pool_health["check_latency_ms"] = (time.perf_counter() - started) * 1000
+
+# Create the Batched TimescaleDB Writer for Ingested Frames
+def create_timescale_writer() -> TimescaleBatchWriter:
+    # Looks the pool up on every flush, so it follows pool re-creation by the monitor
+    return TimescaleBatchWriter(
+        lambda: timescale_pool,
+        batch_size=TIMESCALE_BATCH_SIZE,
+        flush_interval=TIMESCALE_FLUSH_INTERVAL,
+        max_pending=TIMESCALE_MAX_PENDING,
+        max_retries=TIMESCALE_MAX_RETRIES,
+        # Unknown until checked: assume migration 0002 was applied
+        has_unique_index=lambda: bike_data_unique_index is not False,
     )
-    return conn
+
+# FastAPI Dependency: Shared TimescaleDB Pool
+async def get_db_pool() -> asyncpg.Pool:
+    if timescale_pool is None:
+        raise HTTPException(status_code=503, detail="TimescaleDB is not available.")
+    return timescale_pool
+
+# TimescaleDB Pool Statistics
+def get_pool_stats() -> dict:
+    stats = {"available": timescale_pool is not None, **pool_health}
+    if timescale_pool is not None:
+        size = timescale_pool.get_size()
+        idle = timescale_pool.get_idle_size()
+        stats.update(
+            size=size,
+            idle=idle,
+            in_use=size - idle,
+            min_size=timescale_pool.get_min_size(),
+            max_size=timescale_pool.get_max_size(),
+        )
+    return stats
+
+# Pool Usage for /metrics, read at scrape time
+def get_pool_connections() -> dict:
+    stats = get_pool_stats()
+    if not stats["available"]:
+        return {}
+    return {("in_use",): stats["in_use"], ("idle",): stats["idle"], ("max",): stats["max_size"]}
+
+metrics.gauge("cycleroom_db_pool_connections", "TimescaleDB pool connections by state", ("state",),
+              fn=get_pool_connections)
 
 # Save Bike Number and Device Address Mapping
-async def save_bike_mapping(bike_number: str, device_address: str) -> bool:
+async def save_bike_mapping(pool: asyncpg.Pool, bike_number: str, device_address: str) -> bool:
     try:
-        conn = await get_timescale_connection()
         query = '''
             INSERT INTO bike_mappings (bike_number, device_address, mapped_at)
             VALUES ($1, $2, NOW())
         '''
-        await conn.execute(query, bike_number, device_address)
-        await conn.close()
+        async with pool.acquire() as conn:
+            await conn.execute(query, bike_number, device_address)
         logger.info(f"✅ Successfully saved bike mapping: {bike_number} -> {device_address}")
         return True
     except Exception as e:
@@ -41,21 +256,46 @@ async def save_bike_mapping(bike_number: str, device_address: str) -> bool:
         return False
 
 # Get All Bike Mappings
-async def get_bike_mappings() -> list:
+async def get_bike_mappings(pool: asyncpg.Pool) -> list:
     try:
-        conn = await get_timescale_connection()
         query = '''
             SELECT bike_number, device_address FROM bike_mappings
         '''
-        rows = await conn.fetch(query)
-        await conn.close()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query)
         return [dict(row) for row in rows]
     except Exception as e:
         logger.error(f"❌ Error retrieving bike mappings: {e}")
         return []
 
+# Get the Latest Bike Selection per Bike Number
+async def get_latest_bike_selections(pool: asyncpg.Pool) -> list:
+    query = '''
+        SELECT DISTINCT ON (bike_number) bike_number, device_address, date
+        FROM bike_selection
+        ORDER BY bike_number, date DESC
+    '''
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query)
+    return [dict(row) for row in rows]
+
+# Load the Bike Selection Cache from Storage
+async def load_bike_selections(cache, backend: Optional[Storage] = None) -> int:
+    backend = backend or storage
+    if backend is None or not backend.available:
+        return 0
+    try:
+        rows = await backend.get_latest_bike_selections()
+    except Exception as e:
+        logger.error(f"❌ Error loading bike selections: {e}")
+        return 0
+    cache.load(rows)
+    logger.info(f"✅ Loaded {len(rows)} bike selections.")
+    return len(rows)
+
 # Get Latest Bike Data from InfluxDB
 def get_latest_bike_data():
+    init_influx_client()
     try:
         query = f'''
             from(bucket: "{INFLUXDB_BUCKET}")
@@ -68,29 +308,309 @@ def get_latest_bike_data():
         for table in result:
             for record in table.records:
                 bike_id = record.values["bike_id"]
-                latest_data[bike_id] = {
-                    "distance": record.get_value()
-                }
+                frame = latest_data.setdefault(bike_id, {"device_address": bike_id, "timestamp": record.get_time(),
+                                                         "room": record.values.get("room")})
+                frame[record.get_field()] = record.get_value()
         logger.info("✅ Successfully fetched latest bike data from InfluxDB.")
         return latest_data
     except InfluxDBError as e:
         logger.error(f"❌ Error fetching latest bike data: {e}")
         return {}
 
+# Seed the Live State from Storage on a Cold Start
+async def load_live_state(store, backend: Optional[Storage] = None) -> int:
+    backend = backend or storage
+    try:
+        latest_data = await backend.get_latest_bike_data()
+    except Exception as e:
+        logger.error(f"❌ Could not seed live state from {backend.name} storage: {e}")
+        return 0
+    store.load(latest_data)
+    logger.info(f"✅ Seeded live state with {len(latest_data)} bikes from {backend.name} storage.")
+    return len(latest_data)
+
 # Get Historical Bike Data from TimescaleDB
-async def get_historical_data(bike_id: str, start_time: datetime, end_time: datetime) -> list:
+async def get_historical_data(pool: asyncpg.Pool, bike_id: str, start_time: datetime, end_time: datetime) -> list:
     try:
-        conn = await get_timescale_connection()
         query = '''
             SELECT * FROM bike_data
             WHERE bike_id = $1
-            AND timestamp >= $2
-            AND timestamp <= $3
+            AND ($2::timestamptz IS NULL OR timestamp >= $2)
+            AND ($3::timestamptz IS NULL OR timestamp <= $3)
             ORDER BY timestamp ASC
         '''
-        rows = await conn.fetch(query, bike_id, start_time, end_time)
-        await conn.close()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query, bike_id, start_time, end_time)
         return [dict(row) for row in rows]
     except Exception as e:
         logger.error(f"❌ Error fetching historical bike data: {e}")
         return []
+
+# Stream Historical Bike Data from TimescaleDB in Chunks (server-side cursor)
+async def stream_historical_data(pool: asyncpg.Pool, bike_id: str, start_time: datetime, end_time: datetime,
+                                 chunk_size: int = HISTORICAL_CHUNK_SIZE):
+    query = f'''
+        SELECT {", ".join(HISTORICAL_COLUMNS)} FROM bike_data
+        WHERE bike_id = $1
+        AND ($2::timestamptz IS NULL OR timestamp >= $2)
+        AND ($3::timestamptz IS NULL OR timestamp <= $3)
+        ORDER BY timestamp ASC
+    '''
+    async with pool.acquire() as conn:
+        # Cursors only live inside a transaction
+        async with conn.transaction():
+            cursor = await conn.cursor(query, bike_id, start_time, end_time)
+            while True:
+                rows = await cursor.fetch(chunk_size)
+                if not rows:
+                    break
+                yield rows
+
+# Get Time-Bucketed Historical Aggregates from TimescaleDB
+async def get_bucketed_historical_data(pool: asyncpg.Pool, bike_id: str, start_time: datetime, end_time: datetime,
+                                       bucket: timedelta) -> list:
+    try:
+        query = '''
+            SELECT time_bucket($4::interval, timestamp) AS timestamp,
+                   avg(power) AS avg_power,
+                   max(power) AS max_power,
+                   avg(cadence) AS avg_cadence,
+                   avg(heart_rate) AS avg_heart_rate,
+                   last(trip_distance, timestamp) AS trip_distance,
+                   count(*) AS samples
+            FROM bike_data
+            WHERE bike_id = $1
+            AND ($2::timestamptz IS NULL OR timestamp >= $2)
+            AND ($3::timestamptz IS NULL OR timestamp <= $3)
+            GROUP BY 1
+            ORDER BY 1 ASC
+        '''
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query, bike_id, start_time, end_time, bucket)
+        return [dict(row, bike_id=bike_id) for row in rows]
+    except Exception as e:
+        logger.error(f"❌ Error fetching bucketed historical bike data: {e}")
+        return []
+
+# Get the First/Last Timestamp of a Historical Range (used to size automatic buckets)
+async def get_historical_span(pool: asyncpg.Pool, bike_id: str, start_time: datetime, end_time: datetime):
+    query = '''
+        SELECT min(timestamp) AS first, max(timestamp) AS last FROM bike_data
+        WHERE bike_id = $1
+        AND ($2::timestamptz IS NULL OR timestamp >= $2)
+        AND ($3::timestamptz IS NULL OR timestamp <= $3)
+    '''
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow(query, bike_id, start_time, end_time)
+    if row is None or row["first"] is None:
+        return None, None
+    return row["first"], row["last"]
+
+# Upsert a Workout Session and its Rider Checkpoints
+async def checkpoint_session(pool: asyncpg.Pool, session: dict, riders: dict):
+    session_query = '''
+        INSERT INTO sessions (session_id, name, started_at, ended_at, settings)
+        VALUES ($1, $2, $3, $4, $5::jsonb)
+        ON CONFLICT (session_id) DO UPDATE
+        SET name = EXCLUDED.name, ended_at = EXCLUDED.ended_at, settings = EXCLUDED.settings
+    '''
+    rider_query = '''
+        INSERT INTO session_riders (session_id, bike_id, state, updated_at)
+        VALUES ($1, $2, $3::jsonb, NOW())
+        ON CONFLICT (session_id, bike_id) DO UPDATE
+        SET state = EXCLUDED.state, updated_at = EXCLUDED.updated_at
+    '''
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute(session_query, session["session_id"], session["name"], session["started_at"],
+                               session["ended_at"], json.dumps(session["settings"]))
+            if riders:
+                await conn.executemany(rider_query, [
+                    (session["session_id"], bike_id, json.dumps(state)) for bike_id, state in riders.items()
+                ])
+
+# Get a Workout Session with its Rider Checkpoints
+async def get_session(pool: asyncpg.Pool, session_id: str) -> Optional[dict]:
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow('''
+            SELECT session_id, name, started_at, ended_at, settings FROM sessions WHERE session_id = $1
+        ''', session_id)
+        if row is None:
+            return None
+        riders = await conn.fetch('''
+            SELECT bike_id, state FROM session_riders WHERE session_id = $1
+        ''', session_id)
+    return {
+        "session": dict(row, settings=json.loads(row["settings"])),
+        "riders": {rider["bike_id"]: json.loads(rider["state"]) for rider in riders},
+    }
+
+# List Workout Sessions, Newest First
+async def list_sessions(pool: asyncpg.Pool, limit: int = 50) -> list:
+    query = '''
+        SELECT session_id, name, started_at, ended_at, settings FROM sessions
+        ORDER BY started_at DESC
+        LIMIT $1
+    '''
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(query, limit)
+    return [dict(row, settings=json.loads(row["settings"])) for row in rows]
+
+# Save a Session or All-Time Power Curve
+async def save_power_curve(pool: asyncpg.Pool, bike_id: str, curve: dict, session_id: Optional[str] = None):
+    async with pool.acquire() as conn:
+        if session_id is None:
+            await conn.execute('''
+                INSERT INTO rider_power_curves (bike_id, curve, updated_at) VALUES ($1, $2::jsonb, NOW())
+                ON CONFLICT (bike_id) DO UPDATE SET curve = EXCLUDED.curve, updated_at = EXCLUDED.updated_at
+            ''', bike_id, json.dumps(curve))
+        else:
+            await conn.execute('''
+                INSERT INTO session_power_curves (session_id, bike_id, curve, computed_at) VALUES ($1, $2, $3::jsonb, NOW())
+                ON CONFLICT (session_id, bike_id) DO UPDATE SET curve = EXCLUDED.curve, computed_at = EXCLUDED.computed_at
+            ''', session_id, bike_id, json.dumps(curve))
+
+# Get a Session or All-Time Power Curve
+async def get_power_curve(pool: asyncpg.Pool, bike_id: str, session_id: Optional[str] = None) -> Optional[dict]:
+    async with pool.acquire() as conn:
+        if session_id is None:
+            curve = await conn.fetchval("SELECT curve FROM rider_power_curves WHERE bike_id = $1", bike_id)
+        else:
+            curve = await conn.fetchval(
+                "SELECT curve FROM session_power_curves WHERE session_id = $1 AND bike_id = $2", session_id, bike_id
+            )
+    return json.loads(curve) if curve is not None else None
+
+class ServerStorage(Storage):
+    """
+    InfluxDB for the latest state, TimescaleDB for history and bike selections.
+
+    Wraps the pool functions above; the pool itself stays module-level so the
+    health monitor can re-create it and the writers follow it.
+    """
+
+    name = "server"
+
+    @property
+    def available(self) -> bool:
+        return timescale_pool is not None
+
+    async def start(self):
+        if await create_timescale_pool() is not None:
+            await prepare_timescale_schema()
+
+    async def close(self):
+        await close_timescale_pool()
+
+    def background_tasks(self) -> list:
+        return [monitor_timescale_pool()]
+
+    def create_writers(self) -> dict:
+        writers = {}
+        if INFLUX_WRITE_ENABLED:
+            writers["influx"] = create_influx_writer()
+        if TIMESCALE_WRITE_ENABLED:
+            writers["timescale"] = create_timescale_writer()
+        return writers
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), "pool": get_pool_stats()}
+
+    def _pool(self) -> asyncpg.Pool:
+        if timescale_pool is None:
+            raise ConnectionError("TimescaleDB pool is not available")
+        return timescale_pool
+
+    @timed_query
+    async def get_latest_bike_data(self) -> dict:
+        return await asyncio.to_thread(get_latest_bike_data)
+
+    async def save_bike_selection(self, bike_number: str, device_address: str) -> Optional[dict]:
+        query = '''
+            INSERT INTO bike_selection (bike_number, device_address, date)
+            VALUES ($1, $2, NOW())
+            RETURNING bike_number, device_address, date
+        '''
+        async with self._pool().acquire() as conn:
+            row = await conn.fetchrow(query, bike_number, device_address)
+        return dict(row) if row else None
+
+    @timed_query
+    async def get_latest_bike_selections(self) -> list:
+        return await get_latest_bike_selections(self._pool())
+
+    async def save_bike_mapping(self, bike_number: str, device_address: str) -> bool:
+        return await save_bike_mapping(self._pool(), bike_number, device_address)
+
+    @timed_query
+    async def get_bike_mappings(self) -> list:
+        return await get_bike_mappings(self._pool())
+
+    @timed_query
+    async def get_historical_data(self, bike_id, start_time, end_time) -> list:
+        return await get_historical_data(self._pool(), bike_id, start_time, end_time)
+
+    def stream_historical_data(self, bike_id, start_time, end_time, chunk_size: int = HISTORICAL_CHUNK_SIZE):
+        return stream_historical_data(self._pool(), bike_id, start_time, end_time, chunk_size)
+
+    @timed_query
+    async def get_bucketed_historical_data(self, bike_id, start_time, end_time, bucket: timedelta) -> list:
+        return await get_bucketed_historical_data(self._pool(), bike_id, start_time, end_time, bucket)
+
+    @timed_query
+    async def get_historical_span(self, bike_id, start_time, end_time):
+        return await get_historical_span(self._pool(), bike_id, start_time, end_time)
+
+    async def checkpoint_session(self, session: dict, riders: dict):
+        await checkpoint_session(self._pool(), session, riders)
+
+    @timed_query
+    async def get_session(self, session_id: str) -> Optional[dict]:
+        return await get_session(self._pool(), session_id)
+
+    @timed_query
+    async def list_sessions(self, limit: int = 50) -> list:
+        return await list_sessions(self._pool(), limit)
+
+    async def save_power_curve(self, bike_id: str, curve: dict, session_id: Optional[str] = None):
+        await save_power_curve(self._pool(), bike_id, curve, session_id)
+
+    @timed_query
+    async def get_power_curve(self, bike_id: str, session_id: Optional[str] = None) -> Optional[dict]:
+        return await get_power_curve(self._pool(), bike_id, session_id)
+
+# Active storage backend, created and closed by the FastAPI lifespan
+storage: Optional[Storage] = None
+
+# Create the Storage Backend Selected by STORAGE_BACKEND
+def create_storage(backend: str = STORAGE_BACKEND) -> Storage:
+    if backend == "server":
+        return ServerStorage()
+    if backend == "sqlite":
+        return SQLiteStorage(
+            SQLITE_PATH,
+            retention_days=SQLITE_RETENTION_DAYS,
+            batch_size=SQLITE_BATCH_SIZE,
+            flush_interval=SQLITE_FLUSH_INTERVAL,
+        )
+    raise ValueError(f"Unknown storage backend {backend!r}, expected one of {STORAGE_BACKENDS}")
+
+# Open the Storage Backend
+async def open_storage(backend: str = STORAGE_BACKEND) -> Storage:
+    global storage
+    storage = create_storage(backend)
+    await storage.start()
+    return storage
+
+# Close the Storage Backend
+async def close_storage():
+    global storage
+    if storage is not None:
+        await storage.close()
+        storage = None
+
+# FastAPI Dependency: Active Storage Backend
+async def get_storage() -> Storage:
+    if storage is None or not storage.available:
+        raise HTTPException(status_code=503, detail="Storage is not available.")
+    return storage
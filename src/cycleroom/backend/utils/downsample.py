@@ -0,0 +1,44 @@
+import numpy as np
+
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of at most `threshold` points of (x, y) that preserve
+    the visual shape of the series. The first and last points are always kept.
+    `x` must be sorted ascending.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    length = len(x)
+    if threshold >= length:
+        return np.arange(length)
+    if threshold < 3:
+        raise ValueError("LTTB needs a threshold of at least 3 points")
+
+    # Interior points are split into threshold - 2 buckets of (roughly) equal size
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = length - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (or the last point for the final bucket)
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        px, py = x[previous], y[previous]
+        areas = np.abs((px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def auto_bucket_seconds(span_seconds: float, max_points: int) -> int:
+    """Smallest whole-second bucket width that keeps `span_seconds` within `max_points` buckets."""
+    return max(1, int(np.ceil(span_seconds / max(max_points, 1))))
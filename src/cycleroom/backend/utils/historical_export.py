@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+
+# Columns streamed by /api/historical (and selected by the streaming query)
+HISTORICAL_COLUMNS = ("bike_id", "timestamp", "cadence", "heart_rate", "power", "trip_distance", "gear")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow output is optional
+    pa = None
+
+
+def _row_dict(row) -> dict:
+    item = {column: row[column] for column in HISTORICAL_COLUMNS}
+    item["timestamp"] = item["timestamp"].isoformat()
+    return item
+
+
+async def ndjson_chunks(chunks):
+    """Encode chunks of rows as newline-delimited JSON, one chunk at a time."""
+    async for rows in chunks:
+        yield "".join(json.dumps(_row_dict(row)) + "\n" for row in rows).encode()
+
+
+async def csv_chunks(chunks):
+    """Encode chunks of rows as CSV with a header line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HISTORICAL_COLUMNS)
+    async for rows in chunks:
+        for row in rows:
+            item = _row_dict(row)
+            writer.writerow([item[column] for column in HISTORICAL_COLUMNS])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+async def arrow_chunks(chunks):
+    """Encode chunks of rows as an Arrow IPC stream, one record batch per chunk."""
+    schema = pa.schema([
+        ("bike_id", pa.string()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("cadence", pa.float64()),
+        ("heart_rate", pa.float64()),
+        ("power", pa.int32()),
+        ("trip_distance", pa.float64()),
+        ("gear", pa.int32()),
+    ])
+    buffer = io.BytesIO()
+    writer = pa.ipc.new_stream(buffer, schema)
+    async for rows in chunks:
+        columns = [[row[column] for row in rows] for column in HISTORICAL_COLUMNS]
+        writer.write_batch(pa.record_batch(columns, schema=schema))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    writer.close()
+    yield buffer.getvalue()
+
+
+ENCODERS = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+    "arrow": arrow_chunks,
+}
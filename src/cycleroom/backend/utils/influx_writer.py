@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+from backend.utils.batch_writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+MEASUREMENT = "bike_data"
+INT_FIELDS = ("power", "caloric_burn", "duration", "gear")
+FLOAT_FIELDS = ("cadence", "heart_rate", "trip_distance")
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "spill")
+
+
+def _escape_tag(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def _timestamp_ns(timestamp) -> int:
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp() * 1_000_000) * 1000
+    return int(datetime.fromisoformat(timestamp).timestamp() * 1_000_000) * 1000
+
+
+def frame_to_line_protocol(frame: dict) -> Optional[str]:
+    """
+    Convert one decoded frame dict into an InfluxDB line protocol point.
+
+    Returns None for frames without any metric: a point needs at least one
+    field, and InfluxDB rejects the whole batch otherwise.
+    """
+    fields = []
+    for name in INT_FIELDS:
+        value = frame.get(name)
+        if value is not None:
+            fields.append(f"{name}={int(value)}i")
+    for name in FLOAT_FIELDS:
+        value = frame.get(name)
+        if value is not None:
+            fields.append(f"{name}={float(value)}")
+    if not fields:
+        return None
+    tags = f"bike_id={_escape_tag(frame['device_address'])}"
+    if frame.get("room"):
+        tags += f",room={_escape_tag(frame['room'])}"
+    return f"{MEASUREMENT},{tags} {','.join(fields)} {_timestamp_ns(frame['timestamp'])}"
+
+
+class InfluxBatchWriter(BatchWriter):
+    """
+    Batched, non-blocking InfluxDB writer for decoded frames.
+
+    Buffering and flushing come from BatchWriter; line protocol conversion
+    and the blocking write run in a worker thread. When InfluxDB falls
+    behind and more than `max_pending` frames are buffered, the overflow
+    policy applies: drop the oldest frames, drop the incoming ones, or
+    spill them as line protocol to `spill_path`.
+
+    Spilled frames are only set aside by `enqueue()`; the worker task appends
+    them to the file in a thread, up to `spill_max_bytes` (anything beyond
+    is dropped). Once InfluxDB accepts writes again and the live buffer is
+    empty, the file is replayed `batch_size` lines at a time and removed.
+    """
+
+    store = "influx"
+    display_name = "InfluxDB"
+    written_stat = "points_written"
+
+    def __init__(self, write_api, bucket: str, org: str, batch_size: int = 5000,
+                 flush_interval: float = 1.0, max_pending: int = 100_000,
+                 overflow_policy: str = "drop_oldest", spill_path: str = None,
+                 spill_max_bytes: int = 100_000_000):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        if overflow_policy == "spill" and not spill_path:
+            raise ValueError("The spill overflow policy needs a spill_path")
+        super().__init__(batch_size, flush_interval, max_pending)
+        self.write_api = write_api
+        self.bucket = bucket
+        self.org = org
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path
+        self.spill_max_bytes = spill_max_bytes
+        self.overflow = []
+        # Whether the last write succeeded, i.e. whether spilled points may be replayed
+        self._writable = True
+        self.stats.update(spilled=0, replayed=0)
+
+    def _overflow(self, frames: list, overflow: int) -> list:
+        if self.overflow_policy == "drop_newest":
+            self.stats["dropped"] += overflow
+            return frames[:max(0, len(frames) - overflow)]
+        if self.overflow_policy == "drop_oldest":
+            return super()._overflow(frames, overflow)
+        # Written to disk by the worker task, never on the ingest path
+        self.overflow.extend(frames[:overflow])
+        self._batch_ready.set()
+        return frames[overflow:]
+
+    def _spill(self, frames: list) -> int:
+        """Append frames to the spill file up to spill_max_bytes. Returns the number spilled."""
+        size = os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+        lines = []
+        for frame in frames:
+            line = frame_to_line_protocol(frame)
+            if line is None:
+                continue
+            size += len(line.encode()) + 1
+            if size > self.spill_max_bytes:
+                break
+            lines.append(line + "\n")
+        if lines:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+        return len(lines)
+
+    async def spill_overflow(self):
+        """Move the frames set aside by enqueue() into the spill file."""
+        if not self.overflow:
+            return
+        frames, self.overflow = self.overflow, []
+        try:
+            spilled = await asyncio.to_thread(self._spill, frames)
+        except OSError as e:
+            spilled = 0
+            logger.error(f"❌ Could not spill {len(frames)} points to {self.spill_path}: {e}")
+        self.stats["spilled"] += spilled
+        self.stats["dropped"] += len(frames) - spilled
+
+    def _replay_spill(self) -> int:
+        """Write the spill file to InfluxDB, keeping whatever was not written. Returns the points written."""
+        with open(self.spill_path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        written = 0
+        try:
+            for start in range(0, len(lines), self.batch_size):
+                chunk = lines[start:start + self.batch_size]
+                self.write_api.write(bucket=self.bucket, org=self.org, record=chunk, write_precision="ns")
+                written += len(chunk)
+        finally:
+            if written < len(lines):
+                with open(self.spill_path, "w", encoding="utf-8") as f:
+                    f.write("".join(line + "\n" for line in lines[written:]))
+            else:
+                os.remove(self.spill_path)
+        return written
+
+    async def replay_spill(self) -> int:
+        """Replay spilled points while InfluxDB is writable and no live frames are waiting."""
+        if not (self.spill_path and self._writable and not self.pending and os.path.exists(self.spill_path)):
+            return 0
+        try:
+            replayed = await asyncio.to_thread(self._replay_spill)
+        except Exception as e:
+            self._writable = False
+            self.stats["last_error"] = str(e)
+            logger.error(f"❌ Replaying spilled points from {self.spill_path} failed: {e}")
+            return 0
+        self.stats["replayed"] += replayed
+        logger.info(f"✅ Replayed {replayed} spilled points from {self.spill_path}")
+        return replayed
+
+    def _write(self, frames: list):
+        lines = [line for line in map(frame_to_line_protocol, frames) if line is not None]
+        if lines:
+            self.write_api.write(bucket=self.bucket, org=self.org, record=lines, write_precision="ns")
+
+    async def _write_batch(self, batch: list) -> int:
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception:
+            self._writable = False
+            raise
+        self._writable = True
+        return len(batch)
+
+    async def flush(self) -> int:
+        """Spill set-aside frames, then write up to one batch or replay the spill file when idle."""
+        await self.spill_overflow()
+        if not self.pending:
+            await self.replay_spill()
+            return 0
+        return await super().flush()
+
+    async def run(self):
+        try:
+            await super().run()
+        finally:
+            await self.spill_overflow()
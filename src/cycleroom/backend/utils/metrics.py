@@ -0,0 +1,289 @@
+import asyncio
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PARSE_BUCKETS = (1e-06, 2.5e-06, 5e-06, 1e-05, 2.5e-05, 5e-05, 0.0001, 0.00025, 0.001)
+FRAME_BUCKETS = (0.004, 0.008, 0.0167, 0.0333, 0.05, 0.1, 0.25)
+
+
+def _format_value(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class GaugeValue(CounterValue):
+    __slots__ = ()
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+
+class HistogramValue:
+    """Per-bucket counts (not cumulative until rendered), sum and count of one label set."""
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        # The last slot counts observations above the largest bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def time(self) -> "Timer":
+        return Timer(self)
+
+
+class Timer:
+    """Context manager observing the seconds spent inside it."""
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: HistogramValue):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class Metric(ABC):
+    """
+    A named metric with one preaggregated value per label set.
+
+    `labels(*values)` returns the value object for a label set, creating it
+    on first use; hot paths can keep it and update it directly. Unlabelled
+    metrics forward inc() / set() / observe() to their single value.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.values: Dict[tuple, object] = {}
+
+    @abstractmethod
+    def _new_value(self):
+        """A fresh value object for one label set."""
+
+    def labels(self, *values):
+        value = self.values.get(values)
+        if value is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            value = self.values[values] = self._new_value()
+        return value
+
+    def collect(self) -> Dict[tuple, object]:
+        return self.values
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.type}"]
+        for values, value in list(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, values)} {_format_value(value.value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_value(self):
+        return CounterValue()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    """
+    A gauge, either set by the code or read from `fn` at scrape time.
+
+    `fn` returns the value of an unlabelled gauge, or a dict of label value
+    tuples to values, so queue depths and pool sizes cost nothing until
+    /metrics is requested.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), fn: Optional[Callable] = None):
+        super().__init__(name, documentation, labels)
+        self.fn = fn
+
+    def _new_value(self):
+        return GaugeValue()
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def collect(self) -> Dict[tuple, object]:
+        if self.fn is None:
+            return self.values
+        try:
+            result = self.fn()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read gauge {self.name}: {e}")
+            return {}
+        if not isinstance(result, dict):
+            result = {(): result}
+        values = {}
+        for label_values, number in result.items():
+            value = values[label_values] = GaugeValue()
+            value.set(number)
+        return values
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_value(self):
+        return HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self, *values) -> Timer:
+        return Timer(self.labels(*values))
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.type}"]
+        names = self.label_names + ("le",)
+        for values, value in list(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), value.counts):
+                cumulative += count
+                labels = _format_labels(names, values + (_format_value(float(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(value.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics of one process, rendered in the Prometheus text format.
+
+    Values are plain Python numbers updated from the event loop thread, so
+    recording is a dict lookup and an add, with no locks and nothing
+    computed until a scrape. Registering a name again returns the existing
+    metric, so modules can declare the metrics they share.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def _register(self, cls, name: str, *args, **kwargs) -> Metric:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args, **kwargs)
+        elif type(metric) is not cls:
+            raise ValueError(f"Metric {name} is already registered as a {metric.type}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labels)
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+              fn: Optional[Callable] = None) -> Gauge:
+        gauge = self._register(Gauge, name, documentation, labels)
+        if fn is not None:
+            # The latest owner (e.g. a re-created queue) is the one reported
+            gauge.fn = fn
+        return gauge
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labels, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Start a Minimal HTTP Server Answering GET /metrics
+async def start_metrics_server(port: int, host: str = "0.0.0.0",
+                               registry: Optional[MetricsRegistry] = None) -> asyncio.AbstractServer:
+    registry = registry or metrics
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            method, path = request.split(b" ", 2)[:2]
+            if method == b"GET" and path.split(b"?", 1)[0] == b"/metrics":
+                status, content_type, body = "200 OK", CONTENT_TYPE, registry.render().encode()
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b"Not Found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ValueError,
+                ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+# Serve /metrics from Processes Without a Web Framework (scanner, race display)
+async def serve_metrics(port: int, host: str = "0.0.0.0", registry: Optional[MetricsRegistry] = None):
+    server = await start_metrics_server(port, host, registry)
+    logger.info(f"📈 Serving metrics on http://{host}:{port}/metrics")
+    async with server:
+        await server.serve_forever()
+
+
+# Shared metrics registry for the process
+metrics = MetricsRegistry()
@@ -0,0 +1,144 @@
+"""
+Versioned SQL migrations for TimescaleDB.
+
+Migrations are `NNNN_description.sql` files in backend/migrations, applied in
+version order, each in its own transaction, and recorded in
+`schema_migrations`. `{placeholders}` in the SQL are filled from the storage
+settings (chunk interval, compression and retention ages) when a migration is
+first applied; changing a setting later needs a new migration.
+
+Usage:
+    python -m backend.utils.migrations            # apply pending migrations
+    python -m backend.utils.migrations --status   # list applied / pending
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+INTERVAL = re.compile(r"^\d+ (second|minute|hour|day|week|month|year)s?$")
+
+# Arbitrary key so concurrent API replicas apply migrations one at a time
+ADVISORY_LOCK_KEY = 7_340_251
+
+DEFAULT_SETTINGS = {
+    "chunk_interval": "1 day",
+    "compress_after": "7 days",
+    "retention": "365 days",
+}
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """All migration files in `directory`, ordered by version."""
+    migrations = []
+    for path in directory.iterdir():
+        match = MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), path.read_text(encoding="utf-8")))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+def render(sql: str, settings: dict) -> str:
+    """Fill interval placeholders, refusing anything that is not a plain interval."""
+    for key, value in settings.items():
+        if not INTERVAL.match(value):
+            raise ValueError(f"Invalid interval for {key}: {value!r}")
+    return sql.format_map(settings)
+
+
+async def applied_migrations(conn) -> dict:
+    await conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    ''')
+    rows = await conn.fetch("SELECT version, checksum FROM schema_migrations")
+    return {row["version"]: row["checksum"] for row in rows}
+
+
+async def apply_migrations(conn, settings: dict = None, directory: Path = MIGRATIONS_DIR) -> List[int]:
+    """Apply every pending migration on `conn`. Returns the versions applied."""
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    await conn.execute("SELECT pg_advisory_lock($1)", ADVISORY_LOCK_KEY)
+    try:
+        applied = await applied_migrations(conn)
+        newly_applied = []
+        for migration in discover_migrations(directory):
+            if migration.version in applied:
+                if applied[migration.version] != migration.checksum:
+                    logger.warning(f"⚠️ Migration {migration.version:04d}_{migration.name} changed after it was applied.")
+                continue
+            async with conn.transaction():
+                await conn.execute(render(migration.sql, settings))
+                await conn.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)",
+                    migration.version, migration.name, migration.checksum,
+                )
+            logger.info(f"✅ Applied migration {migration.version:04d}_{migration.name}")
+            newly_applied.append(migration.version)
+        return newly_applied
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", ADVISORY_LOCK_KEY)
+
+
+async def run_migrations(pool, settings: dict = None) -> List[int]:
+    """Apply pending migrations using a pooled connection (used by the API lifespan)."""
+    async with pool.acquire() as conn:
+        return await apply_migrations(conn, settings)
+
+
+async def _main(status_only: bool):
+    import asyncpg
+    from config.config import (
+        TIMESCALEDB_HOST, TIMESCALEDB_PORT, TIMESCALEDB_USER, TIMESCALEDB_PASSWORD, TIMESCALEDB_DB,
+        BIKE_DATA_CHUNK_INTERVAL, BIKE_DATA_COMPRESS_AFTER, BIKE_DATA_RETENTION,
+    )
+    conn = await asyncpg.connect(user=TIMESCALEDB_USER, password=TIMESCALEDB_PASSWORD, database=TIMESCALEDB_DB,
+                                 host=TIMESCALEDB_HOST, port=TIMESCALEDB_PORT)
+    try:
+        if status_only:
+            applied = await applied_migrations(conn)
+            for migration in discover_migrations():
+                state = "applied" if migration.version in applied else "pending"
+                print(f"{migration.version:04d}_{migration.name}: {state}")
+            return
+        applied = await apply_migrations(conn, {
+            "chunk_interval": BIKE_DATA_CHUNK_INTERVAL,
+            "compress_after": BIKE_DATA_COMPRESS_AFTER,
+            "retention": BIKE_DATA_RETENTION,
+        })
+        print(f"Applied {len(applied)} migration(s).")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Apply TimescaleDB schema migrations")
+    parser.add_argument("--status", action="store_true", help="List applied and pending migrations")
+    asyncio.run(_main(parser.parse_args().status))
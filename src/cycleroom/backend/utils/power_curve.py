@@ -0,0 +1,78 @@
+import numpy as np
+
+# Durations (seconds) of every stored curve. A fixed grid lets curves merge elementwise.
+CURVE_DURATIONS = (1, 2, 3, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300, 420, 600, 900, 1200, 1800,
+                   2700, 3600, 5400, 7200)
+
+
+def duration_label(seconds: int) -> str:
+    """5 -> "5s", 60 -> "1min", 3600 -> "1h"."""
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}min"
+    return f"{seconds}s"
+
+
+def resample_1hz(timestamps, powers, max_gap: float) -> np.ndarray:
+    """
+    Power at every whole second from the first frame up to the last one.
+
+    Each frame's power holds until the next frame, as in the session
+    aggregates. A gap longer than `max_gap` holds for `max_gap` seconds and
+    is then collapsed to a single zero-power second, so a pause breaks an
+    effort without stretching the series. `timestamps` are epoch seconds in
+    ascending order; missing power counts as 0 W.
+    """
+    t = np.asarray(timestamps, dtype=np.float64)
+    p = np.nan_to_num(np.asarray(powers, dtype=np.float64))
+    if len(t) < 2:
+        return np.empty(0)
+    excess = np.clip(np.diff(t) - (max_gap + 1), 0, None)
+    t = t - np.concatenate(([0.0], np.cumsum(excess)))
+    grid = np.arange(t[0], t[-1], 1.0)
+    held = np.searchsorted(t, grid, side="right") - 1
+    series = p[held]
+    series[grid - t[held] >= max_gap] = 0
+    return series
+
+
+def mean_max(series, durations=CURVE_DURATIONS) -> np.ndarray:
+    """
+    Best average power over every window length in `durations` (ascending).
+
+    With the cumulative sum `cs`, the averages of all windows of length `d`
+    are `(cs[d:] - cs[:-d]) / d`, one vectorized pass per duration. Durations
+    longer than the series are NaN.
+    """
+    series = np.asarray(series, dtype=np.float64)
+    cumulative = np.concatenate(([0.0], np.cumsum(series)))
+    curve = np.full(len(durations), np.nan)
+    for i, duration in enumerate(durations):
+        if duration > len(series):
+            break
+        curve[i] = (cumulative[duration:] - cumulative[:-duration]).max() / duration
+    return curve
+
+
+def merge_curves(*curves) -> np.ndarray:
+    """Elementwise best of aligned curves; NaN (no data) loses to any value."""
+    merged = np.full(len(curves[0]), np.nan)
+    for curve in curves:
+        merged = np.fmax(merged, curve)
+    return merged
+
+
+def curve_to_dict(curve, durations=CURVE_DURATIONS) -> dict:
+    """JSON-friendly curve: parallel durations / watts lists, None where there is no data."""
+    return {
+        "durations": list(durations),
+        "watts": [None if np.isnan(watts) else round(float(watts), 1) for watts in curve],
+    }
+
+
+def curve_from_dict(stored: dict, durations=CURVE_DURATIONS) -> np.ndarray:
+    """Align a stored curve to `durations`, so curves saved with another grid still merge."""
+    by_duration = dict(zip(stored["durations"], stored["watts"]))
+    return np.array([np.nan if by_duration.get(d) is None else by_duration[d] for d in durations],
+                    dtype=np.float64)
@@ -0,0 +1,127 @@
+import random
+from typing import Iterator, Optional
+
+# Enough levels for ~16M keys at p = 1/2
+MAX_LEVELS = 24
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next = [None] * levels
+        # Number of positions the link at each level skips
+        self.width = [1] * levels
+
+
+class RankedSet:
+    """
+    Sorted set with O(log n) insert, remove, rank and select: an indexable skip list.
+
+    Every link stores how many positions it skips, so the rank of a key is
+    the sum of the widths walked to reach it, and the key at index i is found
+    by walking widths down from the top level. Links to the end of the list
+    keep widths too, which keeps insert and remove uniform. Keys must be
+    unique and totally ordered (e.g. tuples).
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.head = _Node(None, MAX_LEVELS)
+        self.size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _levels(self) -> int:
+        levels = 1
+        while levels < MAX_LEVELS and self._random.random() < 0.5:
+            levels += 1
+        return levels
+
+    def _predecessors(self, key):
+        """Last node before `key` at every level, and the rank of each."""
+        chain = [None] * MAX_LEVELS
+        ranks = [0] * MAX_LEVELS
+        node = self.head
+        position = -1
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            ranks[level] = position
+        return chain, ranks
+
+    def insert(self, key):
+        chain, ranks = self._predecessors(key)
+        successor = chain[0].next[0]
+        if successor is not None and successor.key == key:
+            raise KeyError(f"{key!r} is already in the set")
+        position = ranks[0] + 1
+        node = _Node(key, self._levels())
+        for level in range(len(node.next)):
+            previous = chain[level]
+            skipped = position - ranks[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            node.width[level] = previous.width[level] - skipped + 1
+            previous.width[level] = skipped
+        for level in range(len(node.next), MAX_LEVELS):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        chain, _ = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def rank(self, key) -> int:
+        """0-based position of `key`."""
+        chain, ranks = self._predecessors(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        return ranks[0] + 1
+
+    def _node_at(self, index: int) -> _Node:
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        node = self.head
+        remaining = index + 1
+        for level in reversed(range(MAX_LEVELS)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self.size
+        return self._node_at(index).key
+
+    def slice(self, start: int, count: int) -> Iterator:
+        """Up to `count` keys from index `start`, in O(log n + count)."""
+        if count <= 0 or start >= self.size:
+            return
+        node = self._node_at(max(start, 0))
+        for _ in range(count):
+            if node is None:
+                return
+            yield node.key
+            node = node.next[0]
+
+    def __iter__(self) -> Iterator:
+        node = self.head.next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
@@ -0,0 +1,27 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from backend.fast_json import dumps, etag_matches, SerializedSnapshot, RESPONSE_GZIP_MIN_BYTES
+from typing import Optional
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (when installed) instead of json.dumps."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def snapshot_response(request: Request, snapshot: SerializedSnapshot, headers: Optional[dict] = None) -> Response:
+    '''
+    Serve pre-serialized snapshot bytes with an ETag.
+
+    A matching If-None-Match gets an empty 304. Bodies of at least
+    RESPONSE_GZIP_MIN_BYTES are sent gzip-compressed to clients that accept it.
+    '''
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding", **(headers or {})}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    if len(snapshot.body) >= RESPONSE_GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(snapshot.gzipped(), media_type="application/json", headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
@@ -0,0 +1,570 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from backend.utils.batch_writer import BatchWriter
+from backend.utils.historical_export import HISTORICAL_COLUMNS
+from backend.utils.storage import Storage, timed_query
+from backend.utils.timescale_writer import frame_to_record
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+DAY_US = 86_400_000_000
+# Open-ended range bounds, in microseconds since the epoch
+MIN_US = -(2 ** 62)
+MAX_US = 2 ** 62
+# Same window as the InfluxDB `range(start: -5m) |> last()` query
+LATEST_WINDOW = timedelta(minutes=5)
+PARTITION_PREFIX = "bike_data_"
+
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS bike_latest (
+        bike_id TEXT PRIMARY KEY,
+        timestamp INTEGER NOT NULL,
+        cadence REAL,
+        heart_rate REAL,
+        power INTEGER,
+        trip_distance REAL,
+        gear INTEGER,
+        room TEXT
+    )''',
+    '''CREATE TABLE IF NOT EXISTS bike_selection (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bike_number TEXT NOT NULL,
+        device_address TEXT NOT NULL,
+        date INTEGER NOT NULL
+    )''',
+    '''CREATE INDEX IF NOT EXISTS bike_selection_bike_number_date_idx
+        ON bike_selection (bike_number, date DESC)''',
+    '''CREATE TABLE IF NOT EXISTS bike_mappings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bike_number TEXT NOT NULL,
+        device_address TEXT NOT NULL,
+        mapped_at INTEGER NOT NULL
+    )''',
+    '''CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        name TEXT,
+        started_at INTEGER NOT NULL,
+        ended_at INTEGER,
+        settings TEXT NOT NULL
+    )''',
+    '''CREATE INDEX IF NOT EXISTS sessions_started_at_idx ON sessions (started_at DESC)''',
+    '''CREATE TABLE IF NOT EXISTS session_riders (
+        session_id TEXT NOT NULL,
+        bike_id TEXT NOT NULL,
+        state TEXT NOT NULL,
+        updated_at INTEGER NOT NULL,
+        PRIMARY KEY (session_id, bike_id)
+    ) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS session_power_curves (
+        session_id TEXT NOT NULL,
+        bike_id TEXT NOT NULL,
+        curve TEXT NOT NULL,
+        computed_at INTEGER NOT NULL,
+        PRIMARY KEY (session_id, bike_id)
+    ) WITHOUT ROWID''',
+    '''CREATE TABLE IF NOT EXISTS rider_power_curves (
+        bike_id TEXT PRIMARY KEY,
+        curve TEXT NOT NULL,
+        updated_at INTEGER NOT NULL
+    )''',
+)
+
+# One table per UTC day. WITHOUT ROWID clusters rows by (bike_id, timestamp),
+# so a per-bike range is one contiguous scan, and the key makes replays idempotent.
+PARTITION_SCHEMA = '''CREATE TABLE IF NOT EXISTS {table} (
+    bike_id TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    cadence REAL,
+    heart_rate REAL,
+    power INTEGER,
+    trip_distance REAL,
+    gear INTEGER,
+    room TEXT,
+    PRIMARY KEY (bike_id, timestamp)
+) WITHOUT ROWID'''
+
+
+def to_us(timestamp: datetime) -> int:
+    """Microseconds since the epoch; naive datetimes are taken as UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+
+def from_us(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+def partition_name(day: int) -> str:
+    return PARTITION_PREFIX + (EPOCH + timedelta(days=day)).strftime("%Y%m%d")
+
+
+def _bounds(start_time: Optional[datetime], end_time: Optional[datetime]):
+    return (to_us(start_time) if start_time else MIN_US,
+            to_us(end_time) if end_time else MAX_US)
+
+
+def _historical_row(row) -> dict:
+    item = dict(zip(HISTORICAL_COLUMNS, row))
+    item["timestamp"] = from_us(item["timestamp"])
+    return item
+
+
+class SQLiteBatchWriter(BatchWriter):
+    """Batched writer inserting through SQLiteStorage.insert_records() on the storage's write thread."""
+
+    store = "sqlite"
+    display_name = "SQLite"
+    written_stat = "rows_written"
+
+    def __init__(self, storage: "SQLiteStorage", batch_size: int = 2000, flush_interval: float = 1.0,
+                 max_pending: int = 100_000):
+        super().__init__(batch_size, flush_interval, max_pending)
+        self.storage = storage
+        self.stats.update(rows_skipped=0)
+
+    async def _write_batch(self, batch: list) -> int:
+        inserted = await self.storage.insert_records([frame_to_record(frame) for frame in batch])
+        self.stats["rows_skipped"] += len(batch) - inserted
+        return inserted
+
+
+class SQLiteStorage(Storage):
+    """
+    Embedded single-file backend for one-machine deployments.
+
+    The database runs in WAL mode with one writer connection and one reader
+    connection, each on its own thread, so reads never wait for a batch
+    insert. bike_data is split into one table per UTC day: range queries
+    only touch the days they cover, and retention drops whole days instead
+    of deleting rows. A small bike_latest table is upserted with every batch
+    and seeds the live state on a cold start.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, retention_days: int = 365, batch_size: int = 2000,
+                 flush_interval: float = 1.0, retention_check_interval: float = 3600):
+        self.path = path
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_check_interval = retention_check_interval
+        # Committed partitions by day number; the reader only queries these
+        self.partitions: Dict[int, str] = {}
+        self._writer: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-write")
+        self._read_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-read")
+        self.stats = {"inserts": 0, "rows_written": 0, "last_insert_ms": 0.0, "partitions_dropped": 0}
+
+    @property
+    def available(self) -> bool:
+        return self._writer is not None
+
+    async def _write(self, fn, *args):
+        if self._writer is None:
+            raise ConnectionError("SQLite storage is not open")
+        return await asyncio.get_running_loop().run_in_executor(self._write_executor, fn, *args)
+
+    async def _read(self, fn, *args):
+        if self._reader is None:
+            raise ConnectionError("SQLite storage is not open")
+        return await asyncio.get_running_loop().run_in_executor(self._read_executor, fn, *args)
+
+    # Lifecycle
+
+    def _open(self):
+        writer = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        writer.execute("PRAGMA journal_mode=WAL")
+        # Durable at checkpoints; a power cut can only lose the last commits, never corrupt
+        writer.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            writer.execute(statement)
+        tables = writer.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?", (PARTITION_PREFIX + "[0-9]*",)
+        ).fetchall()
+        for (table,) in tables:
+            day = (datetime.strptime(table[len(PARTITION_PREFIX):], "%Y%m%d").replace(tzinfo=timezone.utc) - EPOCH).days
+            self.partitions[day] = table
+        # Files created before rooms existed lack the room column
+        for table in ("bike_latest", *self.partitions.values()):
+            if "room" not in {column[1] for column in writer.execute(f"PRAGMA table_info({table})")}:
+                writer.execute(f"ALTER TABLE {table} ADD COLUMN room TEXT")
+        reader = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        reader.execute("PRAGMA query_only=ON")
+        return writer, reader
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._writer, self._reader = await loop.run_in_executor(self._write_executor, self._open)
+        logger.info(f"✅ SQLite storage ready at {self.path} ({len(self.partitions)} day partitions)")
+        await self.enforce_retention()
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        if self._reader is not None:
+            await loop.run_in_executor(self._read_executor, self._reader.close)
+            self._reader = None
+        if self._writer is not None:
+            await loop.run_in_executor(self._write_executor, self._writer.close)
+            self._writer = None
+            logger.info("🛑 SQLite storage closed.")
+
+    def background_tasks(self) -> list:
+        return [self._retention_loop()]
+
+    def create_writers(self) -> dict:
+        writer = SQLiteBatchWriter(self, batch_size=self.batch_size, flush_interval=self.flush_interval)
+        return {"sqlite": writer}
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), **self.stats, "path": self.path, "partitions": len(self.partitions)}
+
+    # Ingest
+
+    def _insert(self, records: list) -> int:
+        rows_by_day: Dict[int, list] = {}
+        latest: Dict[str, tuple] = {}
+        for record in records:
+            timestamp = to_us(record[1])
+            row = (record[0], timestamp, *record[2:])
+            rows_by_day.setdefault(timestamp // DAY_US, []).append(row)
+            if record[0] not in latest or timestamp >= latest[record[0]][1]:
+                latest[record[0]] = row
+        conn = self._writer
+        inserted = 0
+        conn.execute("BEGIN")
+        try:
+            for day, rows in rows_by_day.items():
+                table = partition_name(day)
+                if day not in self.partitions:
+                    conn.execute(PARTITION_SCHEMA.format(table=table))
+                before = conn.total_changes
+                conn.executemany(f"INSERT OR IGNORE INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                inserted += conn.total_changes - before
+            conn.executemany(
+                '''INSERT INTO bike_latest VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (bike_id) DO UPDATE SET
+                       timestamp = excluded.timestamp, cadence = excluded.cadence,
+                       heart_rate = excluded.heart_rate, power = excluded.power,
+                       trip_distance = excluded.trip_distance, gear = excluded.gear, room = excluded.room
+                   WHERE excluded.timestamp >= bike_latest.timestamp''',
+                list(latest.values()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        # Only publish new partitions to the reader once they are committed
+        for day in rows_by_day:
+            self.partitions.setdefault(day, partition_name(day))
+        return inserted
+
+    async def insert_records(self, records: list) -> int:
+        """Insert bike_data row tuples in timescale_writer.COLUMNS order; returns rows actually inserted."""
+        started = time.perf_counter()
+        inserted = await self._write(self._insert, records)
+        self.stats["inserts"] += 1
+        self.stats["rows_written"] += inserted
+        self.stats["last_insert_ms"] = (time.perf_counter() - started) * 1000
+        return inserted
+
+    # Retention
+
+    def _drop_partitions(self, days: list):
+        for day in days:
+            self._writer.execute(f"DROP TABLE IF EXISTS {partition_name(day)}")
+
+    async def enforce_retention(self) -> int:
+        """Drop day partitions older than `retention_days`. Returns the number dropped."""
+        cutoff = (datetime.now(timezone.utc) - EPOCH).days - self.retention_days
+        expired = [day for day in self.partitions if day < cutoff]
+        if not expired:
+            return 0
+        for day in expired:
+            del self.partitions[day]
+        await self._write(self._drop_partitions, expired)
+        self.stats["partitions_dropped"] += len(expired)
+        logger.info(f"🧹 Dropped {len(expired)} SQLite partitions older than {self.retention_days} days.")
+        return len(expired)
+
+    async def _retention_loop(self):
+        while True:
+            await asyncio.sleep(self.retention_check_interval)
+            try:
+                await self.enforce_retention()
+            except Exception as e:
+                logger.error(f"❌ SQLite retention failed: {e}")
+
+    # Latest state
+
+    def _fetch_latest(self, since: int) -> list:
+        return self._reader.execute(
+            f"SELECT {', '.join(HISTORICAL_COLUMNS)}, room FROM bike_latest WHERE timestamp >= ?", (since,)
+        ).fetchall()
+
+    @timed_query
+    async def get_latest_bike_data(self) -> Dict[str, dict]:
+        try:
+            rows = await self._read(self._fetch_latest, to_us(datetime.now(timezone.utc) - LATEST_WINDOW))
+        except (sqlite3.Error, ConnectionError) as e:
+            logger.error(f"❌ Error fetching latest bike data: {e}")
+            return {}
+        latest_data = {}
+        for row in rows:
+            frame = _historical_row(row[:-1])
+            bike_id = frame.pop("bike_id")
+            latest_data[bike_id] = {"device_address": bike_id, **frame, "room": row[-1]}
+        return latest_data
+
+    # Bike selections and mappings
+
+    def _insert_selection(self, bike_number: str, device_address: str, date: int):
+        self._writer.execute(
+            "INSERT INTO bike_selection (bike_number, device_address, date) VALUES (?, ?, ?)",
+            (bike_number, device_address, date),
+        )
+
+    async def save_bike_selection(self, bike_number: str, device_address: str) -> Optional[dict]:
+        date = datetime.now(timezone.utc)
+        await self._write(self._insert_selection, bike_number, device_address, to_us(date))
+        return {"bike_number": bike_number, "device_address": device_address, "date": date}
+
+    def _fetch_latest_selections(self) -> list:
+        return self._reader.execute('''
+            SELECT bike_number, device_address, date FROM (
+                SELECT bike_number, device_address, date,
+                       row_number() OVER (PARTITION BY bike_number ORDER BY date DESC, id DESC) AS rank
+                FROM bike_selection
+            ) WHERE rank = 1
+        ''').fetchall()
+
+    @timed_query
+    async def get_latest_bike_selections(self) -> List[dict]:
+        rows = await self._read(self._fetch_latest_selections)
+        return [{"bike_number": bike_number, "device_address": device_address, "date": from_us(date)}
+                for bike_number, device_address, date in rows]
+
+    def _insert_mapping(self, bike_number: str, device_address: str, mapped_at: int):
+        self._writer.execute(
+            "INSERT INTO bike_mappings (bike_number, device_address, mapped_at) VALUES (?, ?, ?)",
+            (bike_number, device_address, mapped_at),
+        )
+
+    async def save_bike_mapping(self, bike_number: str, device_address: str) -> bool:
+        try:
+            await self._write(self._insert_mapping, bike_number, device_address,
+                              to_us(datetime.now(timezone.utc)))
+        except (sqlite3.Error, ConnectionError) as e:
+            logger.error(f"❌ Error saving bike mapping: {e}")
+            return False
+        logger.info(f"✅ Successfully saved bike mapping: {bike_number} -> {device_address}")
+        return True
+
+    @timed_query
+    async def get_bike_mappings(self) -> List[dict]:
+        try:
+            rows = await self._read(
+                lambda: self._reader.execute("SELECT bike_number, device_address FROM bike_mappings").fetchall()
+            )
+        except (sqlite3.Error, ConnectionError) as e:
+            logger.error(f"❌ Error retrieving bike mappings: {e}")
+            return []
+        return [{"bike_number": bike_number, "device_address": device_address} for bike_number, device_address in rows]
+
+    # Historical ranges
+
+    def _tables_between(self, start: int, end: int) -> List[str]:
+        first, last = start // DAY_US, end // DAY_US
+        return [self.partitions[day] for day in sorted(self.partitions) if first <= day <= last]
+
+    def _union(self, bike_id: str, start: int, end: int, columns: str):
+        """One UNION ALL over the partitions covering the range, with its parameters."""
+        tables = self._tables_between(start, end)
+        query = " UNION ALL ".join(
+            f"SELECT {columns} FROM {table} WHERE bike_id = ? AND timestamp BETWEEN ? AND ?" for table in tables
+        )
+        return query, (bike_id, start, end) * len(tables)
+
+    def _fetch_range(self, bike_id: str, start: int, end: int, limit: int = -1) -> list:
+        rows = []
+        for table in self._tables_between(start, end):
+            rows.extend(self._reader.execute(
+                f"SELECT {', '.join(HISTORICAL_COLUMNS)} FROM {table} "
+                f"WHERE bike_id = ? AND timestamp BETWEEN ? AND ? ORDER BY timestamp LIMIT ?",
+                (bike_id, start, end, limit - len(rows) if limit >= 0 else -1),
+            ).fetchall())
+            if 0 <= limit <= len(rows):
+                break
+        return rows
+
+    @timed_query
+    async def get_historical_data(self, bike_id: str, start_time: Optional[datetime],
+                                  end_time: Optional[datetime]) -> list:
+        try:
+            rows = await self._read(self._fetch_range, bike_id, *_bounds(start_time, end_time))
+        except (sqlite3.Error, ConnectionError) as e:
+            logger.error(f"❌ Error fetching historical bike data: {e}")
+            return []
+        return [_historical_row(row) for row in rows]
+
+    async def stream_historical_data(self, bike_id: str, start_time: Optional[datetime],
+                                     end_time: Optional[datetime], chunk_size: int):
+        # Keyset pagination: each chunk resumes after the last timestamp sent,
+        # so no cursor is left open if the client goes away mid-stream.
+        start, end = _bounds(start_time, end_time)
+        while start <= end:
+            rows = await self._read(self._fetch_range, bike_id, start, end, chunk_size)
+            if not rows:
+                break
+            yield [_historical_row(row) for row in rows]
+            start = rows[-1][1] + 1
+
+    def _fetch_buckets(self, bike_id: str, start: int, end: int, width: int) -> list:
+        union, params = self._union(bike_id, start, end, "timestamp, power, cadence, heart_rate, trip_distance")
+        if not union:
+            return []
+        return self._reader.execute(f'''
+            SELECT bucket, avg(power), max(power), avg(cadence), avg(heart_rate),
+                   max(CASE WHEN position = 1 THEN trip_distance END), count(*)
+            FROM (
+                SELECT timestamp - timestamp % ? AS bucket, power, cadence, heart_rate, trip_distance,
+                       row_number() OVER (PARTITION BY timestamp - timestamp % ? ORDER BY timestamp DESC) AS position
+                FROM ({union})
+            )
+            GROUP BY bucket
+            ORDER BY bucket
+        ''', (width, width, *params)).fetchall()
+
+    @timed_query
+    async def get_bucketed_historical_data(self, bike_id: str, start_time: Optional[datetime],
+                                           end_time: Optional[datetime], bucket: timedelta) -> list:
+        width = bucket // timedelta(microseconds=1)
+        try:
+            rows = await self._read(self._fetch_buckets, bike_id, *_bounds(start_time, end_time), width)
+        except (sqlite3.Error, ConnectionError) as e:
+            logger.error(f"❌ Error fetching bucketed historical bike data: {e}")
+            return []
+        return [
+            {"bike_id": bike_id, "timestamp": from_us(timestamp), "avg_power": avg_power, "max_power": max_power,
+             "avg_cadence": avg_cadence, "avg_heart_rate": avg_heart_rate, "trip_distance": trip_distance,
+             "samples": samples}
+            for timestamp, avg_power, max_power, avg_cadence, avg_heart_rate, trip_distance, samples in rows
+        ]
+
+    def _fetch_span(self, bike_id: str, start: int, end: int):
+        union, params = self._union(bike_id, start, end, "timestamp")
+        if not union:
+            return None, None
+        return self._reader.execute(f"SELECT min(timestamp), max(timestamp) FROM ({union})", params).fetchone()
+
+    @timed_query
+    async def get_historical_span(self, bike_id: str, start_time: Optional[datetime],
+                                  end_time: Optional[datetime]):
+        first, last = await self._read(self._fetch_span, bike_id, *_bounds(start_time, end_time))
+        if first is None:
+            return None, None
+        return from_us(first), from_us(last)
+
+    # Workout sessions
+
+    def _checkpoint_session(self, session: tuple, riders: list):
+        conn = self._writer
+        conn.execute("BEGIN")
+        try:
+            conn.execute(
+                '''INSERT INTO sessions VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (session_id) DO UPDATE SET
+                       name = excluded.name, ended_at = excluded.ended_at, settings = excluded.settings''',
+                session,
+            )
+            conn.executemany(
+                '''INSERT INTO session_riders VALUES (?, ?, ?, ?)
+                   ON CONFLICT (session_id, bike_id) DO UPDATE SET
+                       state = excluded.state, updated_at = excluded.updated_at''',
+                riders,
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def checkpoint_session(self, session: dict, riders: Dict[str, dict]):
+        ended_at = session["ended_at"]
+        row = (session["session_id"], session["name"], to_us(session["started_at"]),
+               to_us(ended_at) if ended_at is not None else None, json.dumps(session["settings"]))
+        updated_at = to_us(datetime.now(timezone.utc))
+        await self._write(self._checkpoint_session, row, [
+            (session["session_id"], bike_id, json.dumps(state), updated_at) for bike_id, state in riders.items()
+        ])
+
+    @staticmethod
+    def _session_row(row) -> dict:
+        session_id, name, started_at, ended_at, settings = row
+        return {"session_id": session_id, "name": name, "started_at": from_us(started_at),
+                "ended_at": from_us(ended_at) if ended_at is not None else None, "settings": json.loads(settings)}
+
+    def _fetch_session(self, session_id: str):
+        row = self._reader.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None, []
+        riders = self._reader.execute(
+            "SELECT bike_id, state FROM session_riders WHERE session_id = ?", (session_id,)
+        ).fetchall()
+        return row, riders
+
+    @timed_query
+    async def get_session(self, session_id: str) -> Optional[dict]:
+        row, riders = await self._read(self._fetch_session, session_id)
+        if row is None:
+            return None
+        return {"session": self._session_row(row), "riders": {bike_id: json.loads(state) for bike_id, state in riders}}
+
+    @timed_query
+    async def list_sessions(self, limit: int = 50) -> List[dict]:
+        rows = await self._read(
+            lambda: self._reader.execute("SELECT * FROM sessions ORDER BY started_at DESC LIMIT ?", (limit,)).fetchall()
+        )
+        return [self._session_row(row) for row in rows]
+
+    # Power curves
+
+    def _upsert_power_curve(self, bike_id: str, curve: str, session_id: Optional[str], now: int):
+        if session_id is None:
+            self._writer.execute(
+                '''INSERT INTO rider_power_curves VALUES (?, ?, ?)
+                   ON CONFLICT (bike_id) DO UPDATE SET curve = excluded.curve, updated_at = excluded.updated_at''',
+                (bike_id, curve, now),
+            )
+        else:
+            self._writer.execute(
+                '''INSERT INTO session_power_curves VALUES (?, ?, ?, ?)
+                   ON CONFLICT (session_id, bike_id) DO UPDATE SET
+                       curve = excluded.curve, computed_at = excluded.computed_at''',
+                (session_id, bike_id, curve, now),
+            )
+
+    async def save_power_curve(self, bike_id: str, curve: dict, session_id: Optional[str] = None):
+        await self._write(self._upsert_power_curve, bike_id, json.dumps(curve), session_id,
+                          to_us(datetime.now(timezone.utc)))
+
+    def _fetch_power_curve(self, bike_id: str, session_id: Optional[str]):
+        if session_id is None:
+            return self._reader.execute("SELECT curve FROM rider_power_curves WHERE bike_id = ?", (bike_id,)).fetchone()
+        return self._reader.execute(
+            "SELECT curve FROM session_power_curves WHERE session_id = ? AND bike_id = ?", (session_id, bike_id)
+        ).fetchone()
+
+    @timed_query
+    async def get_power_curve(self, bike_id: str, session_id: Optional[str] = None) -> Optional[dict]:
+        row = await self._read(self._fetch_power_curve, bike_id, session_id)
+        return json.loads(row[0]) if row else None
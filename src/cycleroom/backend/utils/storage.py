@@ -0,0 +1,136 @@
+import functools
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from backend.utils.metrics import metrics
+
+# Backends selectable with STORAGE_BACKEND
+STORAGE_BACKENDS = ("server", "sqlite")
+
+# Storage latency metrics; the batch writers label by store (influx, timescale, sqlite)
+write_seconds = metrics.histogram("cycleroom_db_write_seconds", "Time to write one batch of frames", ("store",))
+write_failures = metrics.counter("cycleroom_db_write_failures_total", "Batch writes that failed", ("store",))
+query_seconds = metrics.histogram("cycleroom_db_query_seconds", "Time to answer one storage query",
+                                  ("backend", "query"))
+
+
+def timed_query(method):
+    """Record each call of a Storage query method in the query latency histogram."""
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            query_seconds.labels(self.name, method.__name__).observe(time.perf_counter() - started)
+    return wrapper
+
+
+class Storage(ABC):
+    """
+    Storage interface used by db_utils and the routes.
+
+    A backend owns every persistent store behind the API: the latest frame
+    per bike (for seeding the live state), historical bike_data ranges, and
+    the bike selection / mapping tables. The server backend uses InfluxDB and
+    TimescaleDB; the sqlite backend keeps everything in one local file.
+
+    Historical rows are dicts (or asyncpg Records) with the keys in
+    HISTORICAL_COLUMNS, with `timestamp` as a datetime.
+    """
+
+    name = "abstract"
+
+    @property
+    @abstractmethod
+    def available(self) -> bool:
+        """Whether queries can currently be served."""
+
+    async def start(self):
+        """Open connections and apply the schema."""
+
+    async def close(self):
+        """Flush and release everything opened by `start()`."""
+
+    def background_tasks(self) -> list:
+        """Coroutines to run for the lifetime of the app (health checks, retention)."""
+        return []
+
+    def create_writers(self) -> dict:
+        """Batched ingest writers by name; each has enqueue(), run() and get_stats()."""
+        return {}
+
+    def get_stats(self) -> dict:
+        return {"backend": self.name, "available": self.available}
+
+    # Latest state
+
+    @abstractmethod
+    async def get_latest_bike_data(self) -> Dict[str, dict]:
+        """Latest frame per bike seen in the last five minutes, keyed by bike id."""
+
+    # Bike selections and mappings
+
+    @abstractmethod
+    async def save_bike_selection(self, bike_number: str, device_address: str) -> Optional[dict]:
+        """Insert a selection and return it with its `date`, or None on failure."""
+
+    @abstractmethod
+    async def get_latest_bike_selections(self) -> List[dict]:
+        """Latest selection per bike number as bike_number/device_address/date dicts."""
+
+    @abstractmethod
+    async def save_bike_mapping(self, bike_number: str, device_address: str) -> bool:
+        """Insert a bike number → device address mapping. Returns whether it was saved."""
+
+    @abstractmethod
+    async def get_bike_mappings(self) -> List[dict]:
+        """Every saved mapping as bike_number/device_address dicts."""
+
+    # Historical ranges
+
+    @abstractmethod
+    async def get_historical_data(self, bike_id: str, start_time: Optional[datetime],
+                                  end_time: Optional[datetime]) -> list:
+        """Historical rows of the range in timestamp order."""
+
+    @abstractmethod
+    def stream_historical_data(self, bike_id: str, start_time: Optional[datetime],
+                               end_time: Optional[datetime], chunk_size: int):
+        """Async iterator over chunks (lists) of historical rows in timestamp order."""
+
+    @abstractmethod
+    async def get_bucketed_historical_data(self, bike_id: str, start_time: Optional[datetime],
+                                           end_time: Optional[datetime], bucket: timedelta) -> list:
+        """Per-bucket avg/max power, avg cadence and heart rate, last distance and sample count."""
+
+    @abstractmethod
+    async def get_historical_span(self, bike_id: str, start_time: Optional[datetime],
+                                  end_time: Optional[datetime]) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """First and last timestamp in the range, or (None, None) when it is empty."""
+
+    # Workout sessions
+
+    @abstractmethod
+    async def checkpoint_session(self, session: dict, riders: Dict[str, dict]):
+        """Upsert a session row and the checkpoint state of the given riders (bike id -> state dict)."""
+
+    @abstractmethod
+    async def get_session(self, session_id: str) -> Optional[dict]:
+        """{"session": session row, "riders": {bike id: state}}, or None for an unknown id."""
+
+    @abstractmethod
+    async def list_sessions(self, limit: int = 50) -> List[dict]:
+        """Session rows (session_id, name, started_at, ended_at, settings), newest first."""
+
+    # Power curves
+
+    @abstractmethod
+    async def save_power_curve(self, bike_id: str, curve: dict, session_id: Optional[str] = None):
+        """Upsert a session's curve, or the rider's all-time curve when `session_id` is None."""
+
+    @abstractmethod
+    async def get_power_curve(self, bike_id: str, session_id: Optional[str] = None) -> Optional[dict]:
+        """Curve dict (durations / watts lists) saved by save_power_curve, or None."""
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime
+from typing import Callable
+
+from backend.utils.batch_writer import BatchWriter
+
+# Columns written per frame; (bike_id, timestamp) is the idempotency key
+COLUMNS = ("bike_id", "timestamp", "cadence", "heart_rate", "power", "trip_distance", "gear", "room")
+
+
+def frame_to_record(frame: dict) -> tuple:
+    """Convert one decoded frame dict into a bike_data row tuple in COLUMNS order."""
+    timestamp = frame["timestamp"]
+    if not isinstance(timestamp, datetime):
+        timestamp = datetime.fromisoformat(timestamp)
+    return (
+        frame["device_address"],
+        timestamp,
+        frame.get("cadence"),
+        frame.get("heart_rate"),
+        frame.get("power"),
+        frame.get("trip_distance"),
+        frame.get("gear"),
+        frame.get("room"),
+    )
+
+
+class TimescaleBatchWriter(BatchWriter):
+    """
+    Batched TimescaleDB writer for decoded frames.
+
+    Buffering and flushing come from BatchWriter. Each batch is COPYed into a
+    per-connection temporary staging table and moved into `table` with `ON
+    CONFLICT (bike_id, timestamp) DO NOTHING`, so a replayed or retried batch
+    never inserts a row twice. That needs the unique index on (bike_id,
+    timestamp) from migration 0002; the writer never changes the schema
+    itself. While `has_unique_index()` returns False (checked at startup
+    when migrations are off) it falls back to a plain INSERT.
+
+    A failed batch is retried `max_retries` times with backoff before it is
+    put back in the buffer.
+    """
+
+    store = "timescale"
+    display_name = "TimescaleDB"
+    written_stat = "rows_written"
+
+    def __init__(self, get_pool, table: str = "bike_data", batch_size: int = 5000,
+                 flush_interval: float = 1.0, max_pending: int = 100_000,
+                 max_retries: int = 3, retry_backoff: float = 0.5,
+                 has_unique_index: Callable[[], bool] = lambda: True):
+        super().__init__(batch_size, flush_interval, max_pending)
+        self.get_pool = get_pool
+        self.table = table
+        self.staging_table = f"{table}_staging"
+        self.has_unique_index = has_unique_index
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.stats.update(rows_skipped=0, retries=0)
+
+    async def _copy(self, records: list) -> int:
+        pool = self.get_pool()
+        if pool is None:
+            raise ConnectionError("TimescaleDB pool is not available")
+        columns = ", ".join(COLUMNS)
+        on_conflict = " ON CONFLICT (bike_id, timestamp) DO NOTHING" if self.has_unique_index() else ""
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    f"CREATE TEMP TABLE IF NOT EXISTS {self.staging_table} "
+                    f"(LIKE {self.table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                )
+                await conn.copy_records_to_table(self.staging_table, records=records, columns=COLUMNS)
+                status = await conn.execute(
+                    f"INSERT INTO {self.table} ({columns}) SELECT {columns} FROM {self.staging_table}{on_conflict}"
+                )
+        # Status is "INSERT 0 <rows>"
+        return int(status.rsplit(" ", 1)[-1])
+
+    async def _write_batch(self, batch: list) -> int:
+        records = [frame_to_record(frame) for frame in batch]
+        for attempt in range(self.max_retries + 1):
+            try:
+                inserted = await self._copy(records)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                self.stats["retries"] += 1
+                self.stats["last_error"] = str(e)
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        self.stats["rows_skipped"] += len(batch) - inserted
+        return inserted
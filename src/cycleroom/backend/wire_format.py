@@ -0,0 +1,36 @@
+import struct
+
+# Binary ingest record: address length, payload length, wall-clock receive time
+# in nanoseconds, followed by the UTF-8 device address and the raw Keiser
+# manufacturer payload (17-19 bytes). A WebSocket message carries one or more
+# records back to back.
+RECORD_HEADER = struct.Struct("<BBQ")
+
+
+def encode_records(records) -> bytes:
+    """Pack (device_address, received_wall_ns, payload) tuples into one message."""
+    parts = []
+    for address, received_ns, payload in records:
+        address_bytes = address.encode()
+        parts.append(RECORD_HEADER.pack(len(address_bytes), len(payload), received_ns))
+        parts.append(address_bytes)
+        parts.append(bytes(payload))
+    return b"".join(parts)
+
+
+def decode_records(message):
+    """Yield (device_address, received_wall_ns, payload) tuples from one message."""
+    view = memoryview(message)
+    offset = 0
+    end = len(view)
+    while offset < end:
+        if offset + RECORD_HEADER.size > end:
+            raise ValueError(f"Truncated record header at offset {offset}")
+        address_length, payload_length, received_ns = RECORD_HEADER.unpack_from(view, offset)
+        offset += RECORD_HEADER.size
+        payload_start = offset + address_length
+        payload_end = payload_start + payload_length
+        if payload_end > end:
+            raise ValueError(f"Truncated record body at offset {offset}")
+        yield bytes(view[offset:payload_start]).decode(), received_ns, view[payload_start:payload_end]
+        offset = payload_end
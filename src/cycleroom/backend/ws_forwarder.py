@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import os
+import time
+import websockets
+from cycleroom.backend.ble_stream import drain_queue
+from cycleroom.backend.forwarder import forward_seconds, forwarded_frames
+from cycleroom.backend.keiser_m3_ble_parser import wall_clock_ns
+from cycleroom.backend.spool import SPOOL_DRAIN_RECORDS
+from cycleroom.backend.wire_format import encode_records
+
+logger = logging.getLogger(__name__)
+
+FASTAPI_WS_URL = os.getenv("FASTAPI_WS_URL", "ws://fastapi-app:8000/ws/ingest")
+WS_MAX_RECORDS_PER_MESSAGE = int(os.getenv("WS_MAX_RECORDS_PER_MESSAGE", 500))
+
+
+class WebSocketForwarder:
+    """
+    Streams raw advertisements to the FastAPI binary ingest endpoint over one
+    persistent WebSocket, reconnecting with exponential backoff when it drops.
+
+    Expects (device_address, received_ns, payload) tuples on the queue, as
+    produced by stream_keiser_frames(raw=True).
+
+    With a `spool`, everything queued while the connection is down is encoded
+    and written to disk. After reconnecting, spooled messages are sent
+    whenever the live queue is empty, `drain_records` at a time; concatenated
+    messages are still a valid message, so each replay is one send.
+    """
+
+    def __init__(self, url: str = FASTAPI_WS_URL, max_records: int = WS_MAX_RECORDS_PER_MESSAGE,
+                 backoff_base: float = 0.5, backoff_max: float = 10.0, spool=None,
+                 drain_records: int = SPOOL_DRAIN_RECORDS):
+        self.url = url
+        self.max_records = max_records
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.spool = spool
+        self.drain_records = drain_records
+        self._pending = []
+        self.stats = {"messages_sent": 0, "frames_sent": 0, "reconnects": 0,
+                      "messages_spooled": 0, "messages_replayed": 0}
+        self._latency = forward_seconds.labels("websocket")
+        self._forwarded = {outcome: forwarded_frames.labels("websocket", outcome) for outcome in ("sent", "spooled")}
+
+    @staticmethod
+    def encode(records) -> bytes:
+        return encode_records(
+            (address, wall_clock_ns(received_ns), payload)
+            for address, received_ns, payload in records
+        )
+
+    def spool_pending(self, queue: asyncio.Queue):
+        """Move the unsent records and everything queued so far into the spool."""
+        records, self._pending = self._pending, []
+        while not queue.empty():
+            records.append(queue.get_nowait())
+        for start in range(0, len(records), self.max_records):
+            self.spool.append(self.encode(records[start:start + self.max_records]))
+            self.stats["messages_spooled"] += 1
+        self._forwarded["spooled"].inc(len(records))
+
+    async def run(self, queue: asyncio.Queue):
+        """Forward records from `queue` until cancelled."""
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    logger.info(f"🔌 Connected to binary ingest at {self.url}")
+                    attempt = 0
+                    await self._pump(queue, websocket)
+            except (OSError, websockets.WebSocketException) as e:
+                self.stats["reconnects"] += 1
+                delay = min(self.backoff_base * 2 ** attempt, self.backoff_max)
+                attempt += 1
+                logger.warning(f"⚠️ Binary ingest connection lost ({e}); reconnecting in {delay:.1f}s")
+                if self.spool is not None:
+                    self.spool_pending(queue)
+                await asyncio.sleep(delay)
+
+    async def _pump(self, queue: asyncio.Queue, websocket):
+        while True:
+            # Records taken off the queue are kept until the send succeeds, so
+            # a dropped connection does not lose them.
+            if not self._pending:
+                if queue.empty() and self.spool is not None and self.spool.backlog_records:
+                    await self._replay(websocket)
+                    continue
+                self._pending = await drain_queue(queue, self.max_records)
+            started = time.perf_counter()
+            await websocket.send(self.encode(self._pending))
+            self._latency.observe(time.perf_counter() - started)
+            self.stats["messages_sent"] += 1
+            self.stats["frames_sent"] += len(self._pending)
+            self._forwarded["sent"].inc(len(self._pending))
+            self._pending = []
+
+    async def _replay(self, websocket):
+        records = self.spool.peek(self.drain_records)
+        await websocket.send(b"".join(data for _, _, data in records))
+        self.spool.ack(records)
+        self.stats["messages_replayed"] += len(records)
@@ -5,6 +5,15 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Storage Backend: "server" (InfluxDB + TimescaleDB) or "sqlite" (one local file)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "server").lower()
+
+# Embedded SQLite Storage (STORAGE_BACKEND=sqlite)
+SQLITE_PATH = os.getenv("SQLITE_PATH", "cycleroom.db")
+SQLITE_RETENTION_DAYS = int(os.getenv("SQLITE_RETENTION_DAYS", 365))
+SQLITE_BATCH_SIZE = int(os.getenv("SQLITE_BATCH_SIZE", 2000))
+SQLITE_FLUSH_INTERVAL = float(os.getenv("SQLITE_FLUSH_INTERVAL", 1.0))
+
 # InfluxDB Configuration
 INFLUXDB_URL = os.getenv("INFLUXDB_URL", "http://localhost:8086")
 INFLUXDB_TOKEN = os.getenv("INFLUXDB_TOKEN", "default_token")
@@ -12,6 +21,45 @@ INFLUXDB_ORG = os.getenv("INFLUXDB_ORG", "default_org")
 INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET", "default_bucket")
 QUERY_INTERVAL = int(os.getenv("QUERY_INTERVAL", 2))
 
+# InfluxDB Batched Writer
+INFLUX_WRITE_ENABLED = os.getenv("INFLUX_WRITE_ENABLED", "true").lower() == "true"
+INFLUX_BATCH_SIZE = int(os.getenv("INFLUX_BATCH_SIZE", 5000))
+INFLUX_FLUSH_INTERVAL = float(os.getenv("INFLUX_FLUSH_INTERVAL", 1.0))
+INFLUX_MAX_PENDING = int(os.getenv("INFLUX_MAX_PENDING", 100000))
+INFLUX_OVERFLOW_POLICY = os.getenv("INFLUX_OVERFLOW_POLICY", "drop_oldest")
+INFLUX_SPILL_PATH = os.getenv("INFLUX_SPILL_PATH", "influx_spill.lp")
+INFLUX_SPILL_MAX_BYTES = int(os.getenv("INFLUX_SPILL_MAX_BYTES", 100_000_000))
+
+# TimescaleDB Configuration
+TIMESCALEDB_HOST = os.getenv("TIMESCALEDB_HOST", "timescaledb")
+TIMESCALEDB_PORT = int(os.getenv("TIMESCALEDB_PORT", 5432))
+TIMESCALEDB_USER = os.getenv("POSTGRES_USER", "timescale_user")
+TIMESCALEDB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "timescale_password")
+TIMESCALEDB_DB = os.getenv("POSTGRES_DB", "timescale_db")
+
+# TimescaleDB Schema (applied by backend.utils.migrations)
+RUN_MIGRATIONS = os.getenv("RUN_MIGRATIONS", "true").lower() == "true"
+BIKE_DATA_CHUNK_INTERVAL = os.getenv("BIKE_DATA_CHUNK_INTERVAL", "1 day")
+BIKE_DATA_COMPRESS_AFTER = os.getenv("BIKE_DATA_COMPRESS_AFTER", "7 days")
+BIKE_DATA_RETENTION = os.getenv("BIKE_DATA_RETENTION", "365 days")
+
+# TimescaleDB Connection Pool
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+DB_POOL_MAX_INACTIVE_LIFETIME = float(os.getenv("DB_POOL_MAX_INACTIVE_LIFETIME", 300))
+DB_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_HEALTH_CHECK_INTERVAL", 30))
+
+# TimescaleDB Batched Writer (COPY into bike_data)
+TIMESCALE_WRITE_ENABLED = os.getenv("TIMESCALE_WRITE_ENABLED", "true").lower() == "true"
+TIMESCALE_BATCH_SIZE = int(os.getenv("TIMESCALE_BATCH_SIZE", 5000))
+TIMESCALE_FLUSH_INTERVAL = float(os.getenv("TIMESCALE_FLUSH_INTERVAL", 1.0))
+TIMESCALE_MAX_PENDING = int(os.getenv("TIMESCALE_MAX_PENDING", 100000))
+TIMESCALE_MAX_RETRIES = int(os.getenv("TIMESCALE_MAX_RETRIES", 3))
+
+# Rows fetched per cursor round trip when streaming /api/historical
+HISTORICAL_CHUNK_SIZE = int(os.getenv("HISTORICAL_CHUNK_SIZE", 2000))
+
 # Pygame and Visualization Configuration
 SCREEN_WIDTH = int(os.getenv("SCREEN_WIDTH", 1200))
 SCREEN_HEIGHT = int(os.getenv("SCREEN_HEIGHT", 600))
@@ -5,6 +5,7 @@ import json
 import numpy as np
 import asyncio
 import httpx
+import time
 from datetime import datetime
 from config.config import (
     SCREEN_WIDTH, 
@@ -15,6 +16,22 @@ from config.config import (
     BIKE_ICON_PATH, 
     TRACK_IMAGE_PATH
 )
+from backend.utils.metrics import metrics, serve_metrics, FRAME_BUCKETS
+
+# Where live data comes from: "stream" follows the SSE stream, "poll" polls /api/bikes
+RACE_API_URL = os.getenv("RACE_API_URL", "http://127.0.0.1:8000")
+RACE_DATA_MODE = os.getenv("RACE_DATA_MODE", "stream")
+RACE_STREAM_HZ = float(os.getenv("RACE_STREAM_HZ", 10))
+# Rows shown on the leaderboard, ranked by the API
+RACE_LEADERBOARD_SIZE = int(os.getenv("RACE_LEADERBOARD_SIZE", 10))
+# Room (studio) to show; empty shows the API's default room
+RACE_ROOM = os.getenv("RACE_ROOM", "")
+ROOM_PARAMS = {"room": RACE_ROOM} if RACE_ROOM else {}
+# Port of the display's Prometheus /metrics endpoint; 0 disables it
+RACE_METRICS_PORT = int(os.getenv("RACE_METRICS_PORT", 9151))
+
+render_seconds = metrics.histogram("cycleroom_race_frame_seconds", "Time to draw and flip one frame",
+                                   buckets=FRAME_BUCKETS)
 
 # Initialize Pygame
 pygame.init()
@@ -27,6 +44,7 @@ WAYPOINTS = []
 BIKE_ICON = None
 TRACK_IMAGE = None
 bike_data = {}
+leaderboard = []
 bike_positions = {}
 bike_laps = {}
 bike_colors = {}
@@ -132,47 +150,88 @@ def draw_metrics(bike_id, bike_pos, color):
 
 # Draw Real-Time Leaderboard
 def draw_leaderboard():
-    sorted_bikes = sorted(bike_data.items(), key=lambda x: x[1]['trip_distance'], reverse=True)
     leaderboard_pos = (TRACK_WIDTH + 50, 50)
     y_offset = 0
 
     title_surface = font.render("Leaderboard", True, (255, 255, 255))
     screen.blit(title_surface, leaderboard_pos)
 
-    for rank, (bike_id, metrics) in enumerate(sorted_bikes, start=1):
+    for row in leaderboard:
+        bike_id = row["bike_id"]
         color = bike_colors.get(bike_id, (255, 255, 255))
-        leaderboard_text = f"{rank}. {bike_id}: {metrics['trip_distance']} miles | Laps: {bike_laps.get(bike_id, 0)}"
+        leaderboard_text = f"{row['rank']}. {bike_id}: {row['distance']} miles | Laps: {bike_laps.get(bike_id, 0)}"
         text_surface = font.render(leaderboard_text, True, color)
         screen.blit(text_surface, (leaderboard_pos[0], leaderboard_pos[1] + 25 + y_offset))
         y_offset += 25
 
 # Update Display
 def update_display():
+    started = time.perf_counter()
     screen.fill((0, 0, 0))
     if TRACK_IMAGE:
         screen.blit(TRACK_IMAGE, (0, 0))
     draw_bike_icons()
     draw_leaderboard()
     pygame.display.flip()
+    render_seconds.observe(time.perf_counter() - started)
     clock.tick(30)  # Maintain 30 FPS
 
 # Fetch Real-Time Data from FastAPI
 async def fetch_real_time_data():
-    global bike_data
+    global bike_data, leaderboard
     async with httpx.AsyncClient() as client:
         try:
-            response = await client.get("http://127.0.0.1:8000/api/bikes")
+            response = await client.get(f"{RACE_API_URL}/api/bikes", params=ROOM_PARAMS)
             if response.status_code == 200:
                 bike_data = response.json()
                 assign_bike_colors()
             else:
                 print(f"❌ Error fetching real-time data: {response.status_code}")
+            response = await client.get(f"{RACE_API_URL}/api/leaderboard", params={"k": RACE_LEADERBOARD_SIZE, **ROOM_PARAMS})
+            if response.status_code == 200:
+                leaderboard = response.json()["top"]
         except httpx.RequestError as e:
             print(f"❌ HTTP Request Error: {e}")
 
+# Follow the Live Stream: one snapshot, then per-bike deltas pushed by FastAPI
+async def follow_live_stream():
+    global bike_data, leaderboard
+    while True:
+        try:
+            async with httpx.AsyncClient(timeout=None) as client:
+                async with client.stream("GET", f"{RACE_API_URL}/api/bikes/stream",
+                                         params={"max_hz": RACE_STREAM_HZ,
+                                                 "leaderboard": RACE_LEADERBOARD_SIZE, **ROOM_PARAMS}) as response:
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data: "):
+                            continue
+                        message = json.loads(line[6:])
+                        if message["type"] == "snapshot":
+                            bike_data = message["bikes"]
+                        else:
+                            bike_data.update(message["bikes"])
+                            for bike_id in message.get("removed", ()):
+                                bike_data.pop(bike_id, None)
+                        if "leaderboard" in message:
+                            leaderboard = message["leaderboard"]
+                        assign_bike_colors()
+        except httpx.HTTPError as e:
+            print(f"❌ Live stream error: {e}; reconnecting")
+        await asyncio.sleep(1)
+
 # Main Loop
 async def main_loop():
     load_assets()
+    # Kept referenced so the task is not garbage collected while the display runs
+    metrics_server = asyncio.create_task(serve_metrics(RACE_METRICS_PORT)) if RACE_METRICS_PORT else None
+    if RACE_DATA_MODE == "stream":
+        stream = asyncio.create_task(follow_live_stream())
+        while not stream.done():
+            update_display()
+            # Let the stream task apply whatever arrived during the frame
+            await asyncio.sleep(0)
+        stream.result()
+        return
     while True:
         await fetch_real_time_data()
         update_display()
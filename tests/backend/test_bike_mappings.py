@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+from cycleroom.backend.bike_mappings import BikeMappingCache
+
+T0 = datetime(2025, 2, 9, 17, 0)
+
+def test_load_keeps_newest_owner_of_shared_address():
+    cache = BikeMappingCache()
+    cache.load([
+        {"bike_number": "2", "device_address": "AA", "date": T0 + timedelta(minutes=5)},
+        {"bike_number": "1", "device_address": "AA", "date": T0},
+        {"bike_number": "3", "device_address": "CC", "date": T0},
+    ])
+    assert cache.loaded
+    assert cache.mappings() == {"1": "AA", "2": "AA", "3": "CC"}
+    assert cache.bike_number_for("AA") == "2"
+
+def test_write_through_moves_reverse_lookup():
+    cache = BikeMappingCache()
+    cache.set("1", "AA", T0)
+    cache.set("1", "BB", T0 + timedelta(minutes=1))
+    assert cache.mappings() == {"1": "BB"}
+    assert cache.bike_number_for("AA") is None
+    assert cache.bike_number_for("BB") == "1"
+
+def test_moving_a_bike_hands_its_old_address_to_the_other_owner():
+    cache = BikeMappingCache()
+    cache.set("1", "AA", T0)
+    cache.set("2", "AA", T0 + timedelta(minutes=1))
+    cache.set("3", "AA", T0 + timedelta(minutes=2))
+    cache.set("3", "CC", T0 + timedelta(minutes=3))
+    assert cache.bike_number_for("AA") == "2"
+    assert cache.bike_number_for("CC") == "3"
+
+def test_annotate_tags_frames():
+    cache = BikeMappingCache()
+    cache.set("7", "AA", T0)
+    frames = [{"device_address": "AA"}, {"device_address": "ZZ"}]
+    cache.annotate(frames)
+    assert [frame["bike_number"] for frame in frames] == ["7", None]
@@ -0,0 +1,23 @@
+
+import asyncio
+from cycleroom.backend import ble_stream
+
+def test_enqueue_evicts_oldest_when_full():
+    async def run():
+        queue = ble_stream.create_frame_queue(maxsize=2)
+        for i in range(3):
+            ble_stream.enqueue_frame(queue, ("AA", i))
+        return await ble_stream.drain_queue(queue)
+
+    overflowed = ble_stream.stream_stats["frames_overflowed"]
+    assert asyncio.run(run()) == [("AA", 1), ("AA", 2)]
+    assert ble_stream.stream_stats["frames_overflowed"] == overflowed + 1
+
+def test_drain_queue_respects_max_items():
+    async def run():
+        queue = ble_stream.create_frame_queue()
+        for i in range(5):
+            queue.put_nowait(i)
+        return await ble_stream.drain_queue(queue, max_items=3), queue.qsize()
+
+    assert asyncio.run(run()) == ([0, 1, 2], 2)
@@ -0,0 +1,22 @@
+
+from cycleroom.backend.dedup import AdvertisementDeduplicator
+
+def test_repeated_payload_is_dropped_per_device():
+    dedup = AdvertisementDeduplicator()
+    payload = bytes(range(17))
+
+    assert not dedup.is_duplicate("AA", payload)
+    assert dedup.is_duplicate("AA", bytearray(payload))
+    # Same payload from another bike is not a duplicate
+    assert not dedup.is_duplicate("BB", payload)
+    # A changed payload is passed through and becomes the new baseline
+    assert not dedup.is_duplicate("AA", payload[::-1])
+    assert dedup.is_duplicate("AA", payload[::-1])
+
+    assert dedup.stats() == {"frames_seen": 5, "frames_dropped": 2, "devices": 2}
+
+def test_forget_resets_device():
+    dedup = AdvertisementDeduplicator()
+    dedup.is_duplicate("AA", b"\x01")
+    dedup.forget("AA")
+    assert not dedup.is_duplicate("AA", b"\x01")
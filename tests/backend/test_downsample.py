@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from cycleroom.backend.utils.downsample import auto_bucket_seconds, lttb_indices
+
+
+def test_lttb_keeps_endpoints_and_threshold():
+    x = np.arange(10_000)
+    y = np.sin(x / 100.0)
+    indices = lttb_indices(x, y, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_preserves_spike():
+    x = np.arange(1_000)
+    y = np.zeros(1_000)
+    y[437] = 900  # a short sprint that averaging would flatten
+    assert 437 in lttb_indices(x, y, 20)
+
+
+def test_lttb_returns_everything_below_threshold():
+    assert list(lttb_indices([0, 1, 2], [5, 6, 7], 10)) == [0, 1, 2]
+    with pytest.raises(ValueError):
+        lttb_indices(range(10), range(10), 2)
+
+
+def test_auto_bucket_seconds():
+    assert auto_bucket_seconds(3600, 1000) == 4
+    assert auto_bucket_seconds(10, 1000) == 1
@@ -0,0 +1,43 @@
+import gzip
+import json
+from datetime import datetime, timezone
+
+from cycleroom.backend import fast_json
+from cycleroom.backend.fast_json import SnapshotCache, dumps, etag_matches
+
+def test_dumps_matches_stdlib_output():
+    timestamp = datetime(2025, 2, 9, 17, 0, 0, 250000, tzinfo=timezone.utc)
+    value = {"AA": {"power": 250, "cadence": 90.5, "timestamp": timestamp, "gear": None}}
+    assert json.loads(dumps(value)) == {"AA": {"power": 250, "cadence": 90.5,
+                                               "timestamp": timestamp.isoformat(), "gear": None}}
+
+def test_dumps_without_orjson(monkeypatch):
+    monkeypatch.setattr(fast_json, "orjson", None)
+    timestamp = datetime(2025, 2, 9, 17, 0, tzinfo=timezone.utc)
+    assert dumps({"t": timestamp, "n": 1}) == b'{"t":"2025-02-09T17:00:00+00:00","n":1}'
+
+def test_snapshot_cache_serializes_once_per_version():
+    cache = SnapshotCache("bikes")
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"AA": {"power": len(builds)}}
+
+    first = cache.get(1, build)
+    assert cache.get(1, build) is first
+    second = cache.get(2, build)
+    assert len(builds) == 2
+    assert first.etag != second.etag
+    assert json.loads(second.body) == {"AA": {"power": 2}}
+    assert gzip.decompress(second.gzipped()) == second.body
+    assert cache.stats == {"hits": 1, "misses": 2}
+
+def test_etag_matching():
+    etag = '"bikes-abc-3"'
+    assert etag_matches('"bikes-abc-3"', etag)
+    assert etag_matches('W/"bikes-abc-3"', etag)
+    assert etag_matches('"other", "bikes-abc-3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"bikes-abc-2"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,93 @@
+
+import asyncio
+import json
+
+import httpx
+from cycleroom.backend.forwarder import BatchForwarder
+from cycleroom.backend.keiser_m3_ble_parser import decode_frame
+
+FRAME = decode_frame(bytes([6, 30, 0, 1, 0x81, 0x07, 0xE8, 0x03, 0xB0, 0x04, 0, 0, 1, 0, 0x64, 0, 12]), received_ns=0)
+
+def make_forwarder(handler, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return BatchForwarder("http://test/api/bikes/bulk", client=client, backoff_base=0, **kwargs)
+
+def test_batches_by_size_and_sends_device_address():
+    received = []
+
+    def handler(request):
+        received.append(json.loads(request.content))
+        return httpx.Response(200, json={"accepted": len(received[-1])})
+
+    async def run():
+        forwarder = make_forwarder(handler, batch_size=3, flush_interval=0.01)
+        queue = asyncio.Queue()
+        for i in range(7):
+            queue.put_nowait((f"AA:{i}", FRAME))
+        task = asyncio.create_task(forwarder.run(queue))
+        while forwarder.stats["frames_sent"] < 7:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return forwarder.stats
+
+    stats = asyncio.run(run())
+    assert [len(batch) for batch in received] == [3, 3, 1]
+    assert received[0][0]["device_address"] == "AA:0"
+    assert received[0][0]["power"] == 1200
+    assert stats["batches_sent"] == 3
+
+def test_retries_server_errors_then_gives_up():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    async def run():
+        forwarder = make_forwarder(handler, max_retries=2)
+        delivered = await forwarder.send_batch([{"device_address": "AA"}])
+        await forwarder.close()
+        return delivered, forwarder.stats
+
+    delivered, stats = asyncio.run(run())
+    assert not delivered
+    assert len(calls) == 3
+    assert stats["retries"] == 2
+    assert stats["frames_dropped"] == 1
+
+def test_failed_batches_are_spooled_and_replayed(tmp_path):
+    from cycleroom.backend.spool import Spool
+
+    server_up = False
+    received = []
+
+    def handler(request):
+        if not server_up:
+            return httpx.Response(503)
+        received.append(json.loads(request.content))
+        return httpx.Response(200, json={"accepted": len(received[-1])})
+
+    async def run():
+        nonlocal server_up
+        spool = Spool(str(tmp_path))
+        forwarder = make_forwarder(handler, max_retries=1, spool=spool)
+        assert not await forwarder.send_batch([{"device_address": "AA"}])
+        assert not await forwarder.send_batch([{"device_address": "BB"}])
+        assert spool.backlog_records == 2
+
+        server_up = True
+        queue = asyncio.Queue()
+        task = asyncio.create_task(forwarder.run(queue))
+        while spool.backlog_records:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return forwarder.stats
+
+    stats = asyncio.run(run())
+    # Both spooled batches go out together in one replay request
+    assert received == [[{"device_address": "AA"}, {"device_address": "BB"}]]
+    assert stats["frames_spooled"] == 2
+    assert stats["frames_replayed"] == 2
+    assert stats["frames_dropped"] == 0
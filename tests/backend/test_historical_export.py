@@ -0,0 +1,54 @@
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from cycleroom.backend.utils import historical_export
+
+START = datetime(2025, 2, 9, 17, 0, tzinfo=timezone.utc)
+
+def make_chunks(count, chunk_size):
+    rows = [
+        {"bike_id": "AA", "timestamp": START + timedelta(seconds=i / 4), "cadence": 90.5, "heart_rate": 120.0,
+         "power": 200 + i, "trip_distance": i / 100, "gear": 12}
+        for i in range(count)
+    ]
+
+    async def chunks():
+        for start in range(0, count, chunk_size):
+            yield rows[start:start + chunk_size]
+
+    return chunks()
+
+def collect(encoder, chunks):
+    async def run():
+        return [part async for part in encoder(chunks)]
+    return asyncio.run(run())
+
+def test_ndjson_streams_one_part_per_chunk():
+    parts = collect(historical_export.ndjson_chunks, make_chunks(5, 2))
+    assert len(parts) == 3
+    lines = b"".join(parts).decode().splitlines()
+    assert json.loads(lines[0]) == {
+        "bike_id": "AA", "timestamp": "2025-02-09T17:00:00+00:00", "cadence": 90.5,
+        "heart_rate": 120.0, "power": 200, "trip_distance": 0.0, "gear": 12,
+    }
+    assert len(lines) == 5
+
+def test_csv_has_single_header():
+    text = b"".join(collect(historical_export.csv_chunks, make_chunks(3, 2))).decode()
+    lines = text.splitlines()
+    assert lines[0] == ",".join(historical_export.HISTORICAL_COLUMNS)
+    assert len(lines) == 4
+
+def test_csv_header_only_when_empty():
+    text = b"".join(collect(historical_export.csv_chunks, make_chunks(0, 2))).decode()
+    assert text.splitlines() == [",".join(historical_export.HISTORICAL_COLUMNS)]
+
+def test_arrow_stream_round_trips():
+    pa = pytest.importorskip("pyarrow")
+    data = b"".join(collect(historical_export.arrow_chunks, make_chunks(5, 2)))
+    table = pa.ipc.open_stream(data).read_all()
+    assert table.num_rows == 5
+    assert table.column("power").to_pylist() == [200, 201, 202, 203, 204]
@@ -0,0 +1,105 @@
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from cycleroom.backend.utils.batch_writer import BatchWriter
+from cycleroom.backend.utils.influx_writer import InfluxBatchWriter, frame_to_line_protocol
+
+TIMESTAMP = datetime(2025, 2, 9, 17, 11, 56, 250000, tzinfo=timezone.utc)
+
+def make_frame(address="E5:5E:F0:73:F2:7A", power=250):
+    return {"device_address": address, "timestamp": TIMESTAMP, "cadence": 90.5, "heart_rate": 120.0,
+            "power": power, "caloric_burn": 12, "duration": 330, "trip_distance": 1.6, "gear": 12}
+
+class FakeWriteApi:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.batches = []
+
+    def write(self, bucket, org, record, write_precision):
+        if self.fail:
+            raise ConnectionError("influx down")
+        self.batches.append(record)
+
+def test_line_protocol():
+    line = frame_to_line_protocol(make_frame(address="bike 1"))
+    assert line == (
+        "bike_data,bike_id=bike\\ 1 power=250i,caloric_burn=12i,duration=330i,gear=12i,"
+        "cadence=90.5,heart_rate=120.0,trip_distance=1.6 1739121116250000000"
+    )
+
+def test_flush_writes_in_batches():
+    api = FakeWriteApi()
+    writer = InfluxBatchWriter(api, "bucket", "org", batch_size=2)
+    writer.enqueue([make_frame(power=p) for p in range(5)])
+
+    async def run():
+        while await writer.flush():
+            pass
+
+    asyncio.run(run())
+    assert [len(batch) for batch in api.batches] == [2, 2, 1]
+    assert writer.get_stats()["points_written"] == 5
+
+def test_failed_flush_keeps_frames_and_drop_oldest_bounds_buffer():
+    writer = InfluxBatchWriter(FakeWriteApi(fail=True), "bucket", "org", batch_size=10, max_pending=3)
+    writer.enqueue([make_frame(power=p) for p in range(5)])
+    assert [frame["power"] for frame in writer.pending] == [2, 3, 4]
+
+    assert asyncio.run(writer.flush()) == 0
+    stats = writer.get_stats()
+    assert stats["errors"] == 1
+    assert stats["pending"] == 3
+    assert stats["dropped"] == 2
+
+def test_line_protocol_skips_frames_without_fields():
+    frame = {"device_address": "AA", "timestamp": TIMESTAMP, "power": None, "cadence": None}
+    assert frame_to_line_protocol(frame) is None
+    api = FakeWriteApi()
+    writer = InfluxBatchWriter(api, "bucket", "org")
+    writer.enqueue([frame, make_frame()])
+    assert asyncio.run(writer.flush()) == 2
+    assert len(api.batches[0]) == 1
+
+def test_spill_policy_writes_overflow_to_file_and_replays_it(tmp_path):
+    spill = tmp_path / "spill.lp"
+    api = FakeWriteApi(fail=True)
+    writer = InfluxBatchWriter(api, "bucket", "org", max_pending=1, overflow_policy="spill", spill_path=str(spill))
+    writer.enqueue([make_frame(power=1), make_frame(power=2)])
+    assert len(writer.pending) == 1
+    # Nothing is written to disk on the ingest path
+    assert not spill.exists()
+
+    assert asyncio.run(writer.flush()) == 0
+    assert spill.read_text().count("\n") == 1
+    assert writer.get_stats()["spilled"] == 1
+
+    # Once InfluxDB is back, live frames go first, then the spill file is replayed
+    api.fail = False
+    assert asyncio.run(writer.flush()) == 1
+    assert spill.exists()
+    assert asyncio.run(writer.flush()) == 0
+    assert not spill.exists()
+    assert [len(batch) for batch in api.batches] == [1, 1]
+    assert "power=1i" in api.batches[1][0]
+    assert writer.get_stats()["replayed"] == 1
+
+def test_spill_file_is_capped(tmp_path):
+    spill = tmp_path / "spill.lp"
+    line_bytes = len(frame_to_line_protocol(make_frame())) + 1
+    writer = InfluxBatchWriter(FakeWriteApi(fail=True), "bucket", "org", max_pending=1, overflow_policy="spill",
+                               spill_path=str(spill), spill_max_bytes=2 * line_bytes)
+    writer.enqueue([make_frame(power=p) for p in range(100, 105)])
+    asyncio.run(writer.flush())
+    assert spill.read_text().count("\n") == 2
+    stats = writer.get_stats()
+    assert (stats["spilled"], stats["dropped"]) == (2, 2)
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        InfluxBatchWriter(FakeWriteApi(), "bucket", "org", overflow_policy="block")
+
+def test_batch_writer_is_abstract():
+    with pytest.raises(TypeError):
+        BatchWriter()
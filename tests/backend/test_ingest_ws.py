@@ -0,0 +1,29 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from cycleroom.backend.routes import bike_data, ingest_ws
+from cycleroom.backend.wire_format import encode_records
+# The routes import the server's `backend` package, so its registry and sinks are the ones they use
+from backend.ingest import register_sink, unregister_sink
+from backend.rooms import rooms
+
+PAYLOAD = bytes([0x00, 0x01, 0x02, 0x03, 0x00, 0x64, 0x00, 0x50, 0x00, 0x32, 0x00, 0x28, 0x00, 0x3C, 0x00, 0x10, 0x06])
+
+def test_binary_ingest_opens_a_new_room():
+    app = FastAPI()
+    app.include_router(bike_data.router)
+    app.include_router(ingest_ws.router)
+    client = TestClient(app)
+    assert client.get("/api/bikes", params={"room": "ws-new-room"}).status_code == 404
+    register_sink(rooms.dispatch)
+    try:
+        with client.websocket_connect("/ws/ingest?room=ws-new-room") as websocket:
+            websocket.send_bytes(encode_records([("AA", time.time_ns(), PAYLOAD)]))
+        response = client.get("/api/bikes", params={"room": "ws-new-room"})
+    finally:
+        unregister_sink(rooms.dispatch)
+        rooms.shards.pop("ws-new-room", None)
+    assert response.status_code == 200
+    assert response.json()["AA"]["room"] == "ws-new-room"
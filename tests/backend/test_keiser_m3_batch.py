@@ -0,0 +1,52 @@
+
+import random
+
+import numpy as np
+import pytest
+from cycleroom.backend.keiser_m3_ble_parser import KeiserM3BLEBroadcast
+from cycleroom.backend.keiser_m3_batch import decode_keiser_m3_batch, decode_keiser_m3_blob
+
+FIELDS = [
+    "build_major", "build_minor", "data_type", "ordinal_id", "real_time",
+    "cadence", "heart_rate", "power", "caloric_burn", "duration",
+    "trip_distance", "gear",
+]
+
+def random_frames(count, seed=1234):
+    rng = random.Random(seed)
+    frames = []
+    for _ in range(count):
+        body = bytes(rng.randrange(256) for _ in range(17))
+        # Mix prefixed (19 byte) and bare (17 byte) frames
+        frames.append(bytes([0x02, 0x01]) + body if rng.random() < 0.5 else body)
+    return frames
+
+def test_batch_matches_scalar_parser():
+    frames = random_frames(500)
+    decoded = decode_keiser_m3_batch(frames)
+
+    assert len(decoded) == len(frames)
+    for row, frame in zip(decoded, frames):
+        expected = KeiserM3BLEBroadcast(frame).to_dict()
+        for field in FIELDS:
+            assert row[field] == expected[field], field
+        expected_interval = -1 if expected["interval"] is None else expected["interval"]
+        assert row["interval"] == expected_interval
+
+def test_blob_with_offsets_matches_batch():
+    frames = random_frames(50, seed=7)
+    blob = b"".join(frames)
+    offsets = np.cumsum([0] + [len(f) for f in frames[:-1]])
+
+    np.testing.assert_array_equal(decode_keiser_m3_blob(blob, offsets), decode_keiser_m3_batch(frames))
+
+def test_distance_km_flag_converted_to_miles():
+    frame = bytes([6, 30, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0x64, 0x80, 1])
+    decoded = decode_keiser_m3_batch([frame])
+    assert decoded["trip_distance"][0] == pytest.approx(100 * 0.62137119 / 10.0)
+
+def test_short_frames_are_zero_filled():
+    decoded = decode_keiser_m3_batch([b"", bytes([6, 30, 0])])
+    assert list(decoded["length"]) == [0, 3]
+    assert decoded["cadence"].tolist() == [0.0, 0.0]
+    assert decoded["build_major"][1] == 6
@@ -1,6 +1,7 @@
 
 import pytest
-from cycleroom.backend.keiser_m3_ble_parser import KeiserM3BLEBroadcast
+from cycleroom.backend import keiser_m3_ble_parser
+from cycleroom.backend.keiser_m3_ble_parser import KeiserM3BLEBroadcast, decode_frame
 
 def test_parser_valid_data():
     # Example of a valid BLE data packet (adjust this to match your real data)
@@ -10,13 +11,14 @@ def test_parser_valid_data():
     parser = KeiserM3BLEBroadcast(manufacture_data)
     parsed_data = parser.to_dict()
     
-    # Check if the values are parsed correctly
-    assert parsed_data["cadence"] == 100
-    assert parsed_data["heart_rate"] == 80
-    assert parsed_data["power"] == 50
-    assert parsed_data["caloric_burn"] == 40
-    assert parsed_data["duration"] == (60 * 0x3C)
-    assert parsed_data["trip_distance"] == 1.6
+    # Check if the values are parsed correctly: 16-bit fields are little-endian,
+    # cadence and heart rate are sent in tenths
+    assert parsed_data["cadence"] == 2560.0
+    assert parsed_data["heart_rate"] == 2048.0
+    assert parsed_data["power"] == 12800
+    assert parsed_data["caloric_burn"] == 10240
+    assert parsed_data["duration"] == 0x3C
+    assert parsed_data["trip_distance"] == pytest.approx(409.6)
     assert parsed_data["gear"] == 6
 
 def test_parser_empty_data():
@@ -55,11 +57,43 @@ def test_parser_boundary_values():
     parser = KeiserM3BLEBroadcast(manufacture_data)
     parsed_data = parser.to_dict()
     
-    # Check the upper boundaries
-    assert parsed_data["cadence"] == 65535
-    assert parsed_data["heart_rate"] == 65535
+    # Check the upper boundaries (cadence and heart rate in tenths)
+    assert parsed_data["cadence"] == 6553.5
+    assert parsed_data["heart_rate"] == 6553.5
     assert parsed_data["power"] == 65535
     assert parsed_data["caloric_burn"] == 65535
     assert parsed_data["duration"] == (60 * 255) + 255
-    assert parsed_data["trip_distance"] == 6553.5  # Max value with one decimal
+    # The MSB flags kilometres: 3276.7 km converted to miles
+    assert parsed_data["trip_distance"] == pytest.approx(32767 * 0.62137119 / 10)
     assert parsed_data["gear"] == 255
+
+def test_decode_frame_matches_broadcast():
+    manufacture_data = bytes([0x02, 0x01, 0x06, 0x1E, 0x81, 0x07, 0xE8, 0x03, 0xB0, 0x04, 0xFA, 0x00, 0x20, 0x00, 0x05, 0x1E, 0x64, 0x80, 0x0C])
+    frame = decode_frame(manufacture_data, received_ns=123)
+
+    assert frame.received_ns == 123
+    assert frame.cadence == 100.0
+    assert frame.heart_rate == 120.0
+    assert frame.power == 250
+    assert frame.duration == 5 * 60 + 30
+    assert frame.interval == 1
+    assert frame.real_time is True
+
+    expected = KeiserM3BLEBroadcast(manufacture_data).to_dict()
+    actual = frame.to_dict()
+    del expected["timestamp"], actual["timestamp"]
+    assert actual == expected
+
+def test_wall_clock_offset_follows_clock_drift(monkeypatch):
+    clocks = {"monotonic": 1_000, "wall": 5_000}
+    monkeypatch.setattr(keiser_m3_ble_parser.time, "monotonic_ns", lambda: clocks["monotonic"])
+    monkeypatch.setattr(keiser_m3_ble_parser.time, "time_ns", lambda: clocks["wall"])
+    monkeypatch.setattr(keiser_m3_ble_parser, "_wall_clock_synced_ns", -keiser_m3_ble_parser.WALL_CLOCK_RESYNC_NS)
+    assert keiser_m3_ble_parser.wall_clock_ns(1_000) == 5_000
+    # The wall clock is stepped, but the offset is only re-read once it is stale
+    clocks["wall"] = 7_000
+    assert keiser_m3_ble_parser.wall_clock_ns(1_000) == 5_000
+    clocks["monotonic"] += keiser_m3_ble_parser.WALL_CLOCK_RESYNC_NS
+    clocks["wall"] += keiser_m3_ble_parser.WALL_CLOCK_RESYNC_NS
+    assert keiser_m3_ble_parser.wall_clock_ns(1_000) == 7_000
+    assert keiser_m3_ble_parser.monotonic_ns_from_wall_clock(7_000) == 1_000
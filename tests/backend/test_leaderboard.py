@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from cycleroom.backend.leaderboard import Leaderboard
+from cycleroom.backend.utils.ranked_set import RankedSet
+
+def make_frame(address, distance, bike_number=None):
+    return {"device_address": address, "trip_distance": distance, "bike_number": bike_number}
+
+def test_ranked_set_matches_a_sorted_list():
+    rng = random.Random(3)
+    ranked = RankedSet(seed=5)
+    reference = []
+    for step in range(5000):
+        if reference and rng.random() < 0.4:
+            key = rng.choice(reference)
+            ranked.remove(key)
+            reference.remove(key)
+        else:
+            key = (rng.random(), step)
+            ranked.insert(key)
+            reference.append(key)
+    reference.sort()
+    assert list(ranked) == reference
+    assert len(ranked) == len(reference)
+    for index in range(0, len(reference), 13):
+        assert ranked[index] == reference[index]
+        assert ranked.rank(reference[index]) == index
+    assert list(ranked.slice(10, 5)) == reference[10:15]
+    assert list(ranked.slice(len(reference) - 2, 5)) == reference[-2:]
+    assert ranked[-1] == reference[-1]
+
+def test_ranked_set_rejects_duplicates_and_unknown_keys():
+    ranked = RankedSet()
+    ranked.insert(1)
+    with pytest.raises(KeyError):
+        ranked.insert(1)
+    with pytest.raises(KeyError):
+        ranked.remove(2)
+    with pytest.raises(KeyError):
+        ranked.rank(2)
+    with pytest.raises(IndexError):
+        ranked[1]
+
+def test_top_k_with_gaps():
+    board = Leaderboard()
+    board.update([make_frame("AA", 1.0, "1"), make_frame("BB", 1.5, "2"), make_frame("CC", 0.5), make_frame("DD", None)])
+    top = board.top(2)
+    assert [(row["rank"], row["bike_id"], row["bike_number"]) for row in top] == [(1, "BB", "2"), (2, "AA", "1")]
+    assert top[0]["gap"] is None
+    assert top[1]["gap"] == pytest.approx(0.5)
+    # A page further down still measures its first gap to the rider ahead
+    assert board.top(5, start=2) == [{"rank": 3, "bike_id": "CC", "bike_number": None, "distance": 0.5, "gap": 0.5}]
+    assert len(board) == 3
+
+def test_position_and_neighbours():
+    board = Leaderboard()
+    board.update([make_frame("AA", 3.0), make_frame("BB", 2.0), make_frame("CC", 1.0)])
+    position = board.position("BB")
+    assert position["rank"] == 2
+    assert position["ahead"] == "AA"
+    assert position["behind"] == "CC"
+    assert position["gap"] == pytest.approx(1.0)
+    assert position["riders"] == 3
+    assert board.position("AA")["ahead"] is None
+    assert board.position("ZZ") is None
+
+def test_rank_change_events():
+    board = Leaderboard()
+    board.update([make_frame("AA", 3.0), make_frame("BB", 2.0), make_frame("CC", 1.0)])
+    seq = board.seq
+    version = board.version
+    board.update([make_frame("CC", 3.5)])
+    assert board.version == version + 1
+    assert board.events_since(seq) == [
+        {"type": "rank_change", "bike_id": "CC", "bike_number": None, "rank": 1, "previous_rank": 3,
+         "passed": ["AA", "BB"]},
+    ]
+    seq = board.seq
+    # A trip counter reset drops the rider back
+    board.update([make_frame("AA", 0.0)])
+    (event,) = board.events_since(seq)
+    assert (event["rank"], event["previous_rank"], event["passed_by"]) == (3, 2, ["BB"])
+
+    # Same distance again: no new version, no events
+    version, seq = board.version, board.seq
+    board.update([make_frame("AA", 0.0)])
+    assert (board.version, board.seq) == (version, seq)
+
+def test_remove_and_reset():
+    board = Leaderboard()
+    board.update([make_frame("AA", 3.0), make_frame("BB", 2.0)])
+    assert board.remove("AA")
+    assert not board.remove("AA")
+    assert board.position("BB")["rank"] == 1
+    board.reset()
+    assert len(board) == 0
+    assert board.top(10) == []
+    assert board.events_since(0) == []
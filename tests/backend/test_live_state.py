@@ -0,0 +1,49 @@
+
+from cycleroom.backend import live_state as live_state_module
+from cycleroom.backend.live_state import LiveStateStore
+
+def test_snapshot_is_cached_until_next_update(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(live_state_module.time, "monotonic", lambda: now[0])
+    store = LiveStateStore(ttl=10)
+
+    store.update([{"device_address": "AA", "trip_distance": 1.0}])
+    first = store.snapshot()
+    assert first == {"AA": {"device_address": "AA", "trip_distance": 1.0}}
+    assert store.snapshot() is first
+
+    store.update([{"device_address": "BB", "trip_distance": 2.0}])
+    assert store.version == 2
+    assert set(store.snapshot()) == {"AA", "BB"}
+
+def test_bikes_expire_individually(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(live_state_module.time, "monotonic", lambda: now[0])
+    store = LiveStateStore(ttl=10)
+    store.update([{"device_address": "AA"}])
+    now[0] = 105.0
+    store.update([{"device_address": "BB"}])
+
+    now[0] = 111.0
+    assert set(store.snapshot()) == {"BB"}
+    assert store.get("AA") is None
+    assert store.get("BB") == {"device_address": "BB"}
+    assert store.version == 3
+
+def test_older_frames_are_ignored():
+    store = LiveStateStore()
+    newer = {"device_address": "AA", "timestamp": "2025-02-10T18:05:00+00:00", "power": 200}
+    older = {"device_address": "AA", "timestamp": "2025-02-10T18:00:00+00:00", "power": 90}
+    assert store.update([newer]) == [newer]
+    version = store.version
+    assert store.update([older]) == []
+    assert store.get("AA") is newer
+    assert store.version == version
+    assert store.frames_outdated == 1
+
+def test_load_does_not_overwrite_live_frames():
+    store = LiveStateStore()
+    store.update([{"device_address": "AA", "power": 200}])
+    store.load({"AA": {"device_address": "AA", "power": 1}, "BB": {"device_address": "BB", "power": 2}})
+    assert store.get("AA")["power"] == 200
+    assert store.get("BB")["power"] == 2
@@ -0,0 +1,83 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from cycleroom.backend.live_stream import LiveStreamHub, encode_message
+
+def frame(address, distance):
+    return {"device_address": address, "trip_distance": distance}
+
+def test_changed_since_walks_only_newer_bikes():
+    hub = LiveStreamHub()
+    hub.update([frame("AA", 1.0), frame("BB", 1.0)])
+    seq = hub.seq
+    hub.update([frame("AA", 2.0)])
+    hub.update([frame("CC", 0.5), frame("AA", 3.0)])
+    assert hub.changed_since(seq) == {"AA": frame("AA", 3.0), "CC": frame("CC", 0.5)}
+    assert hub.changed_since(hub.seq) == {}
+
+def test_removed_bikes_are_listed_until_they_come_back():
+    hub = LiveStreamHub()
+    hub.update([frame("AA", 1.0), frame("BB", 1.0)])
+    seq = hub.seq
+    hub.remove(["AA"])
+    assert hub.changed_since(seq) == {}
+    assert hub.removed_since(seq) == ["AA"]
+    hub.update([frame("AA", 2.0)])
+    assert hub.removed_since(seq) == []
+    assert hub.changed_since(seq) == {"AA": frame("AA", 2.0)}
+
+def test_snapshot_then_coalesced_deltas():
+    async def run():
+        hub = LiveStreamHub()
+        subscription = hub.subscribe(max_hz=20)
+        messages = subscription.messages({"AA": frame("AA", 1.0)})
+        snapshot = await messages.__anext__()
+        assert hub.subscribers == 1
+
+        hub.update([frame("AA", 2.0)])
+        first = await messages.__anext__()
+        # Both updates land inside the 50 ms throttle window, so they merge into one delta
+        hub.update([frame("AA", 2.5)])
+        hub.update([frame("BB", 0.1)])
+        second = await messages.__anext__()
+        await messages.aclose()
+        return hub, snapshot, first, second
+
+    hub, snapshot, first, second = asyncio.run(run())
+    assert snapshot == {"type": "snapshot", "seq": 0, "bikes": {"AA": frame("AA", 1.0)}}
+    assert first == {"type": "delta", "seq": 1, "bikes": {"AA": frame("AA", 2.0)}}
+    assert second == {"type": "delta", "seq": 3, "bikes": {"AA": frame("AA", 2.5), "BB": frame("BB", 0.1)}}
+    assert hub.subscribers == 0
+
+def test_throttle_spaces_out_deltas():
+    async def run():
+        hub = LiveStreamHub()
+        messages = hub.subscribe(max_hz=10).messages({})
+        await messages.__anext__()
+        loop = asyncio.get_running_loop()
+        sent_at = []
+        for distance in range(3):
+            hub.update([frame("AA", distance)])
+            await messages.__anext__()
+            sent_at.append(loop.time())
+        await messages.aclose()
+        return sent_at
+
+    sent_at = asyncio.run(run())
+    assert sent_at[2] - sent_at[0] >= 0.19
+
+def test_keepalive_when_idle():
+    async def run():
+        messages = LiveStreamHub().subscribe().messages({}, keepalive=0.01)
+        await messages.__anext__()
+        message = await messages.__anext__()
+        await messages.aclose()
+        return message
+
+    assert asyncio.run(run()) is None
+
+def test_encode_message_serializes_timestamps():
+    timestamp = datetime(2025, 2, 9, 17, 0, tzinfo=timezone.utc)
+    encoded = encode_message({"bikes": {"AA": {"timestamp": timestamp}}})
+    assert json.loads(encoded) == {"bikes": {"AA": {"timestamp": "2025-02-09T17:00:00+00:00"}}}
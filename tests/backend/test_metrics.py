@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from cycleroom.backend.utils.metrics import Metric, MetricsRegistry, start_metrics_server
+
+def test_counters_and_gauges_render_in_text_format():
+    registry = MetricsRegistry()
+    frames = registry.counter("frames_total", "Frames seen", ("device",))
+    frames.labels("AA").inc()
+    frames.labels("AA").inc(2)
+    frames.labels('B"B').inc()
+    registry.gauge("queue_depth", "Queued frames", fn=lambda: 7)
+    registry.gauge("pool", "Pool connections", ("state",), fn=lambda: {("idle",): 2, ("in_use",): 1})
+    assert registry.render().splitlines() == [
+        "# HELP frames_total Frames seen",
+        "# TYPE frames_total counter",
+        'frames_total{device="AA"} 3',
+        'frames_total{device="B\\"B"} 1',
+        "# HELP queue_depth Queued frames",
+        "# TYPE queue_depth gauge",
+        "queue_depth 7",
+        "# HELP pool Pool connections",
+        "# TYPE pool gauge",
+        'pool{state="idle"} 2',
+        'pool{state="in_use"} 1',
+    ]
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("write_seconds", "Write time", ("store",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels("sqlite").observe(value)
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'write_seconds_bucket{store="sqlite",le="0.1"} 2',
+        'write_seconds_bucket{store="sqlite",le="1.0"} 3',
+        'write_seconds_bucket{store="sqlite",le="+Inf"} 4',
+        'write_seconds_sum{store="sqlite"} 3.65',
+        'write_seconds_count{store="sqlite"} 4',
+    ]
+    with latency.time("sqlite"):
+        pass
+    assert latency.labels("sqlite").counts[0] == 3
+
+def test_registering_a_name_again_returns_the_same_metric():
+    registry = MetricsRegistry()
+    counter = registry.counter("frames_total", "Frames seen")
+    assert registry.counter("frames_total", "Frames seen") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("frames_total", "Frames seen")
+    with pytest.raises(ValueError):
+        counter.labels("AA")
+
+def test_queue_overflow_is_counted_per_device():
+    ble_stream = pytest.importorskip("cycleroom.backend.ble_stream")
+    overflow = ble_stream.frames_dropped.labels("BB", "overflow")
+    before = overflow.value
+
+    async def run():
+        queue = ble_stream.create_frame_queue(maxsize=1)
+        for i in range(3):
+            ble_stream.enqueue_frame(queue, ("BB", i))
+        assert ble_stream.metrics.metrics["cycleroom_scanner_queue_depth"].collect()[()].value == 1
+    asyncio.run(run())
+    assert overflow.value == before + 2
+    assert f'cycleroom_scanner_frames_dropped_total{{device="BB",reason="overflow"}} {before + 2}' \
+        in ble_stream.metrics.render()
+
+def test_serve_metrics_answers_scrapes():
+    async def scrape(port, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        return response.decode()
+
+    async def run():
+        registry = MetricsRegistry()
+        registry.counter("frames_total", "Frames seen").inc(5)
+        server = await start_metrics_server(0, "127.0.0.1", registry)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            response = await scrape(port, "/metrics")
+            assert response.startswith("HTTP/1.1 200 OK")
+            assert "text/plain; version=0.0.4" in response
+            assert response.endswith("frames_total 5\n")
+            assert (await scrape(port, "/")).startswith("HTTP/1.1 404")
+        finally:
+            server.close()
+            await server.wait_closed()
+    asyncio.run(run())
+
+def test_metric_is_abstract():
+    with pytest.raises(TypeError):
+        Metric("untyped_total", "No value type")
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from cycleroom.backend.utils.migrations import DEFAULT_SETTINGS, apply_migrations, discover_migrations, render
+
+class FakeConnection:
+    def __init__(self, applied=None):
+        self.applied = dict(applied or {})
+        self.statements = []
+
+    def transaction(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, query, *args):
+        if query.startswith("INSERT INTO schema_migrations"):
+            self.applied[args[0]] = args[2]
+        else:
+            self.statements.append(query)
+
+    async def fetch(self, query):
+        return [{"version": version, "checksum": checksum} for version, checksum in self.applied.items()]
+
+def test_bundled_migrations_render_in_order():
+    migrations = discover_migrations()
+    assert [migration.version for migration in migrations] == sorted(migration.version for migration in migrations)
+    sql = render(migrations[1].sql, DEFAULT_SETTINGS)
+    assert "create_hypertable('bike_data'" in sql
+    assert "INTERVAL '1 day'" in sql
+
+def test_render_rejects_non_interval_settings():
+    with pytest.raises(ValueError):
+        render("{retention}", {"retention": "1 day'); DROP TABLE bike_data; --"})
+
+def test_only_pending_migrations_are_applied(tmp_path):
+    (tmp_path / "0001_first.sql").write_text("CREATE TABLE a ();")
+    (tmp_path / "0002_second.sql").write_text("SELECT add_retention_policy('a', INTERVAL '{retention}');")
+    (tmp_path / "notes.txt").write_text("ignored")
+    first = discover_migrations(tmp_path)[0]
+    conn = FakeConnection(applied={1: first.checksum})
+
+    applied = asyncio.run(apply_migrations(conn, {"retention": "30 days"}, directory=tmp_path))
+    assert applied == [2]
+    assert "SELECT add_retention_policy('a', INTERVAL '30 days');" in conn.statements
+    assert "CREATE TABLE a ();" not in conn.statements
+    assert asyncio.run(apply_migrations(conn, directory=tmp_path)) == []
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from cycleroom.backend.utils.power_curve import (
+    resample_1hz,
+    mean_max,
+    merge_curves,
+    curve_to_dict,
+    curve_from_dict,
+    duration_label,
+)
+from cycleroom.backend.utils.sqlite_storage import SQLiteStorage
+from cycleroom.backend.utils.timescale_writer import frame_to_record
+from cycleroom.backend.power_curves import PowerCurveService
+from cycleroom.backend.sessions import RiderAggregate, Session
+
+T0 = datetime(2025, 2, 10, 18, 0, tzinfo=timezone.utc)
+
+def brute_mean_max(series, duration):
+    return max(sum(series[i:i + duration]) / duration for i in range(len(series) - duration + 1))
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "cycleroom.db"), retention_days=100_000)
+    run(storage.start())
+    yield storage
+    run(storage.close())
+
+def test_mean_max_matches_brute_force():
+    series = np.random.default_rng(7).integers(50, 600, 400).astype(float)
+    durations = (1, 5, 30, 60, 300, 400, 600)
+    curve = mean_max(series, durations)
+    for duration, watts in zip(durations[:-1], curve[:-1]):
+        assert watts == pytest.approx(brute_mean_max(list(series), duration))
+    assert np.isnan(curve[-1])
+
+def test_resample_holds_power_and_collapses_pauses():
+    timestamps = [0.0, 2.0, 3.0, 1000.0, 1001.0]
+    powers = [100, 200, 300, 400, None]
+    series = resample_1hz(timestamps, powers, max_gap=5)
+    # 0-1 hold 100 W, 2 holds 200 W, 3-7 hold 300 W, 8 is the pause, 9 is 400 W
+    assert series.tolist() == [100, 100, 200, 300, 300, 300, 300, 300, 0, 400]
+    assert len(resample_1hz([0.0], [100], max_gap=5)) == 0
+
+def test_merge_and_round_trip():
+    durations = (5, 60, 300)
+    first = np.array([500.0, 300.0, np.nan])
+    second = np.array([450.0, 320.0, 250.0])
+    merged = merge_curves(first, second)
+    assert merged.tolist() == [500.0, 320.0, 250.0]
+    stored = curve_to_dict(first, durations)
+    assert stored == {"durations": [5, 60, 300], "watts": [500.0, 300.0, None]}
+    # A stored curve realigns to a different grid
+    assert curve_from_dict(stored, (60, 5, 1200)).tolist()[:2] == [300.0, 500.0]
+    assert [duration_label(d) for d in (5, 90, 60, 1200, 3600)] == ["5s", "90s", "1min", "20min", "1h"]
+
+def test_session_curves_merge_into_all_time(storage):
+    service = PowerCurveService(durations=(1, 5, 60), settle=0)
+
+    def ride(start, powers):
+        frames = [{"device_address": "AA", "timestamp": start + timedelta(seconds=i), "power": power,
+                   "cadence": 90.0, "heart_rate": 120.0, "trip_distance": 0.0, "gear": 10}
+                  for i, power in enumerate(powers)]
+        run(storage.insert_records([frame_to_record(frame) for frame in frames]))
+        return start, frames[-1]["timestamp"]
+
+    sprint = ride(T0, [200] * 10 + [800] * 5 + [200] * 10)
+    endurance = ride(T0 + timedelta(hours=2), [300] * 100)
+    run(service.save_session(storage, "s1", *sprint, ["AA"]))
+    run(service.save_session(storage, "s2", *endurance, ["AA"]))
+
+    assert run(storage.get_power_curve("AA", "s1"))["watts"] == [800, 800, None]
+    assert run(storage.get_power_curve("AA", "s2"))["watts"] == [300, 300, 300]
+    assert run(storage.get_power_curve("AA"))["watts"] == [800, 800, 300]
+    assert service.stats["curves"] == 2
+
+    # The running session is computed from its own window and merged on top
+    current = Session(started_at=T0 + timedelta(hours=2))
+    current.riders["AA"] = RiderAggregate("AA")
+    live = run(service.get_curve(storage, "AA", current.session_id, current))
+    assert live.tolist() == [300, 300, 300]
+    assert run(service.get_curve(storage, "BB")) is None
@@ -0,0 +1,121 @@
+import asyncio
+
+from cycleroom.backend import live_state as live_state_module
+from cycleroom.backend.ingest import DEFAULT_ROOM, ingest_frames, register_sink, unregister_sink
+from cycleroom.backend.live_state import LiveStateStore
+from cycleroom.backend.rooms import RoomRegistry, RoomShard
+
+def make_frame(address="AA", room=None, distance=1.0):
+    frame = {"device_address": address, "timestamp": "2025-02-10T18:00:00+00:00", "trip_distance": distance}
+    if room:
+        frame["room"] = room
+    return frame
+
+def test_ingest_tags_frames_with_their_room():
+    batches = []
+    register_sink(batches.append)
+    try:
+        ingest_frames([make_frame("AA"), make_frame("BB", room="studio-2")], "studio-1")
+        ingest_frames([make_frame("CC")])
+    finally:
+        unregister_sink(batches.append)
+    assert [frame["room"] for frame in batches[0]] == ["studio-1", "studio-2"]
+    assert batches[1][0]["room"] == DEFAULT_ROOM
+
+def test_dispatch_splits_batches_by_room():
+    registry = RoomRegistry()
+    registry.dispatch([make_frame("AA", "one", 2.0), make_frame("BB", "two"), make_frame("CC", "one", 3.0)])
+    assert sorted(registry.shards) == ["one", "two"]
+    one = registry.get("one")
+    assert sorted(one.live_state.snapshot()) == ["AA", "CC"]
+    assert [row["bike_id"] for row in one.leaderboard.top(5)] == ["CC", "AA"]
+    assert one.live_stream.seq == 1
+    assert list(registry.get("two").live_state.snapshot()) == ["BB"]
+
+def test_stale_riders_leave_the_leaderboard(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(live_state_module.time, "monotonic", lambda: now[0])
+    shard = RoomShard("one", state=LiveStateStore(ttl=10))
+    shard.apply([make_frame("AA", "one", 2.0), make_frame("BB", "one", 1.0)])
+    now[0] = 105.0
+    shard.apply([make_frame("BB", "one", 3.0)])
+    now[0] = 111.0
+    shard.apply([make_frame("CC", "one", 0.5)])
+    assert [row["bike_id"] for row in shard.leaderboard.top(5)] == ["BB", "CC"]
+    assert shard.leaderboard.position("AA") is None
+
+def test_stale_bikes_drop_out_of_the_stream(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(live_state_module.time, "monotonic", lambda: now[0])
+
+    async def run():
+        shard = RoomShard("one", state=LiveStateStore(ttl=10))
+        shard.apply([make_frame("AA", "one"), make_frame("BB", "one")])
+        messages = shard.live_stream.subscribe(max_hz=20).messages(shard.live_state.snapshot())
+        await messages.__anext__()
+        now[0] = 105.0
+        shard.apply([make_frame("BB", "one", 2.0)])
+        first = await messages.__anext__()
+        now[0] = 111.0
+        shard.apply([make_frame("BB", "one", 3.0)])
+        second = await messages.__anext__()
+        await messages.aclose()
+        return shard, first, second
+
+    shard, first, second = asyncio.run(run())
+    assert "removed" not in first
+    assert list(second["bikes"]) == ["BB"]
+    assert second["removed"] == ["AA"]
+    assert list(shard.live_stream.changes) == ["BB"]
+
+def test_replayed_frames_do_not_rewind_the_live_views():
+    shard = RoomShard("one", state=LiveStateStore())
+    newer = make_frame("AA", "one", 5.0)
+    older = make_frame("AA", "one", 1.0)
+    older["timestamp"] = "2025-02-10T17:00:00+00:00"
+    shard.apply([newer])
+    seq = shard.live_stream.seq
+    shard.apply([older])
+    assert shard.live_state.get("AA") is newer
+    assert shard.leaderboard.top(1)[0]["distance"] == 5.0
+    assert shard.live_stream.seq == seq
+
+def test_unserved_and_invalid_rooms_are_rejected():
+    registry = RoomRegistry(served=["one"])
+    registry.dispatch([make_frame("AA", "one"), make_frame("BB", "two")])
+    assert list(registry.shards) == ["one"]
+    assert registry.frames_rejected == 1
+    registry = RoomRegistry(max_rooms=1)
+    registry.dispatch([make_frame("AA", "one"), make_frame("BB", "bad room"), make_frame("CC", "three")])
+    assert list(registry.shards) == ["one"]
+    assert registry.frames_rejected == 2
+
+def test_worker_tasks_apply_batches_per_room():
+    async def run():
+        registry = RoomRegistry()
+        task = asyncio.create_task(registry.run())
+        await asyncio.sleep(0)
+        registry.dispatch([make_frame("AA", "one")])
+        registry.dispatch([make_frame("BB", "one"), make_frame("CC", "two")])
+        one = registry.get("one")
+        # Submitted, not applied yet: the room's worker coalesces both batches
+        assert one.live_state.snapshot() == {}
+        assert len(one.pending) == 2
+        await asyncio.sleep(0.01)
+        assert sorted(one.live_state.snapshot()) == ["AA", "BB"]
+        assert one.stats["batches"] == 1
+        assert list(registry.get("two").live_state.snapshot()) == ["CC"]
+        assert set(registry.tasks) == {"one", "two"}
+        registry.dispatch([make_frame("DD", "two")])
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # Shutdown applies whatever was still pending
+        assert sorted(registry.get("two").live_state.snapshot()) == ["CC", "DD"]
+        assert not registry.tasks
+    asyncio.run(run())
+
+def test_load_seeds_each_room():
+    registry = RoomRegistry()
+    registry.load({"AA": make_frame("AA", "one"), "BB": make_frame("BB")})
+    assert list(registry.get("one").live_state.snapshot()) == ["AA"]
+    assert list(registry.get(DEFAULT_ROOM).live_state.snapshot()) == ["BB"]
@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from cycleroom.backend import sessions as sessions_module
+from cycleroom.backend.sessions import RiderAggregate, Session, SessionManager, SESSION_MAX_GAP
+
+T0 = datetime(2025, 2, 10, 18, 0, tzinfo=timezone.utc)
+
+def make_frame(address="AA", offset=0.0, power=200, cadence=90.0, heart_rate=120.0, distance=0.0):
+    return {"device_address": address, "timestamp": T0 + timedelta(seconds=offset), "power": power,
+            "cadence": cadence, "heart_rate": heart_rate, "trip_distance": distance, "bike_number": "7"}
+
+def ride(aggregate, powers, start=0):
+    for i, power in enumerate(powers):
+        aggregate.add(float(start + i), power=power, cadence=90.0, heart_rate=150.0, distance=(start + i) / 100)
+
+def brute_normalized_power(samples):
+    rolling = [sum(samples[i - 29:i + 1]) / 30 for i in range(29, len(samples))]
+    return (sum(value ** 4 for value in rolling) / len(rolling)) ** 0.25
+
+class FakeStorage:
+    def __init__(self):
+        self.sessions = {}
+        self.riders = {}
+
+    async def checkpoint_session(self, session, riders):
+        self.sessions[session["session_id"]] = dict(session)
+        self.riders.setdefault(session["session_id"], {}).update(riders)
+
+    async def get_session(self, session_id):
+        if session_id not in self.sessions:
+            return None
+        return {"session": self.sessions[session_id], "riders": self.riders.get(session_id, {})}
+
+    async def list_sessions(self, limit=50):
+        rows = sorted(self.sessions.values(), key=lambda row: row["started_at"], reverse=True)
+        return rows[:limit]
+
+def test_steady_ride_totals():
+    rider = RiderAggregate("AA", ftp=200, max_hr=190)
+    ride(rider, [200] * 61)
+    summary = rider.summary()
+    assert summary["duration_s"] == 60
+    assert summary["avg_power"] == 200
+    assert summary["max_power"] == 200
+    assert summary["normalized_power"] == 200
+    assert summary["kj"] == 12.0
+    assert summary["avg_cadence"] == 90
+    assert summary["avg_heart_rate"] == 150
+    assert summary["distance"] == 0.6
+
+def test_normalized_power_matches_a_full_recompute():
+    powers = ([300] * 20 + [100] * 40) * 3
+    rider = RiderAggregate("AA")
+    ride(rider, powers)
+    # The last frame's power is only held once the next frame arrives
+    assert abs(rider.normalized_power - brute_normalized_power(powers[:-1])) < 1e-9
+    assert rider.normalized_power > rider.summary()["avg_power"]
+
+def test_too_short_for_normalized_power():
+    rider = RiderAggregate("AA")
+    ride(rider, [200] * 20)
+    assert rider.summary()["normalized_power"] is None
+
+def test_time_in_zones():
+    # FTP 200: 100 W is zone 1, 250 W is zone 6; max HR 200: 150 bpm is zone 3
+    rider = RiderAggregate("AA", ftp=200, max_hr=200)
+    ride(rider, [100] * 10 + [250] * 11)
+    summary = rider.summary()
+    assert summary["power_zones_s"] == [10, 0, 0, 0, 0, 10, 0]
+    assert summary["heart_rate_zones_s"] == [0, 0, 20, 0, 0]
+
+def test_gaps_are_pauses_and_stale_frames_are_ignored():
+    rider = RiderAggregate("AA")
+    rider.add(0.0, power=100)
+    rider.add(100.0, power=100)
+    rider.add(50.0, power=1000)
+    assert rider.moving_time == SESSION_MAX_GAP
+    assert rider.max_power == 100
+    assert rider.frames == 2
+
+def test_distance_survives_a_trip_counter_reset():
+    rider = RiderAggregate("AA")
+    for offset, distance in enumerate([1.0, 1.5, 2.0, 0.0, 0.5]):
+        rider.add(float(offset), power=100, distance=distance)
+    assert rider.distance == 1.5
+
+def test_checkpoint_restores_identical_aggregates():
+    powers = [150 + (i * 37) % 200 for i in range(120)]
+    uninterrupted = RiderAggregate("AA")
+    ride(uninterrupted, powers)
+
+    first_half = RiderAggregate("AA")
+    ride(first_half, powers[:70])
+    resumed = RiderAggregate.from_state("AA", first_half.to_state())
+    ride(resumed, powers[70:], start=70)
+    assert resumed.summary() == uninterrupted.summary()
+
+def test_manager_auto_starts_checkpoints_and_restores():
+    manager = SessionManager(auto_start=True, idle_timeout=600)
+    manager.update([make_frame("AA", i, distance=i / 100) for i in range(40)])
+    manager.update([make_frame("BB", i, power=150) for i in range(40)])
+    session = manager.current()
+    assert set(session.riders) == {"AA", "BB"}
+    assert session.riders["AA"].bike_number == "7"
+
+    storage = FakeStorage()
+    assert asyncio.run(manager.checkpoint(storage)) == 2
+    assert asyncio.run(manager.checkpoint(storage)) == 0
+    manager.update([make_frame("AA", 40)])
+    assert asyncio.run(manager.checkpoint(storage)) == 1
+
+    restarted = SessionManager()
+    [restored] = asyncio.run(restarted.restore(storage))
+    assert restored.session_id == session.session_id
+    assert restarted.current() is restored
+    assert restored.summary()["riders"] == session.summary()["riders"]
+
+def test_manager_without_auto_start_and_idle_end():
+    manager = SessionManager(auto_start=False, idle_timeout=0)
+    manager.update([make_frame()])
+    assert manager.current() is None
+
+    session = manager.start("Tuesday spin", ftp=250)
+    manager.update([make_frame()])
+    manager.end_if_idle()
+    assert manager.current() is None
+    assert session.ended_at is not None
+    assert session.riders["AA"].power_bounds[0] == 250 * 0.55
+    assert manager.list_sessions()[0]["name"] == "Tuesday spin"
+
+def test_ended_sessions_are_not_restored():
+    storage = FakeStorage()
+    session = Session(name="done")
+    session.end()
+    asyncio.run(storage.checkpoint_session(session.to_record(), {}))
+    manager = SessionManager()
+    assert asyncio.run(manager.restore(storage)) == []
+    assert manager.current() is None
+
+def test_each_room_runs_its_own_session(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(sessions_module.time, "monotonic", lambda: now[0])
+    manager = SessionManager(auto_start=True, idle_timeout=60)
+    manager.update([{**make_frame("AA"), "room": "studio-1"}, {**make_frame("BB"), "room": "studio-2"}])
+    first, second = manager.current("studio-1"), manager.current("studio-2")
+    assert set(first.riders) == {"AA"} and set(second.riders) == {"BB"}
+    assert manager.session_of("BB") is second
+
+    # studio-2 keeps riding; studio-1's class is over
+    now[0] = 150.0
+    manager.update([{**make_frame("BB", 50), "room": "studio-2"}])
+    now[0] = 200.0
+    manager.end_if_idle()
+    assert manager.current("studio-1") is None and first.ended_at is not None
+    assert manager.current("studio-2") is second
+
+    storage = FakeStorage()
+    asyncio.run(manager.checkpoint(storage))
+    restarted = SessionManager()
+    assert [session.room for session in asyncio.run(restarted.restore(storage))] == ["studio-2"]
+    assert restarted.current("studio-2").session_id == second.session_id
@@ -0,0 +1,63 @@
+import os
+
+from cycleroom.backend.spool import Spool, RECORD_HEADER
+
+def records(spool, max_records=100):
+    return [data for _, _, data in spool.peek(max_records)]
+
+def test_append_peek_ack_in_order(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=64, max_bytes=1024)
+    for i in range(5):
+        spool.append(f"batch-{i}".encode())
+    assert spool.backlog_records == 5
+    assert len(spool.segments) > 1
+
+    head = spool.peek(2)
+    assert [data for _, _, data in head] == [b"batch-0", b"batch-1"]
+    spool.ack(head)
+    assert records(spool) == [b"batch-2", b"batch-3", b"batch-4"]
+    assert spool.get_stats()["replayed_records"] == 2
+
+    spool.ack(spool.peek(10))
+    assert spool.backlog_records == 0
+    assert not spool.has_backlog.is_set()
+    # Only the active segment is kept once everything is delivered
+    assert len(os.listdir(tmp_path)) == 1
+
+def test_recovery_resumes_after_acked_records(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=1024)
+    for i in range(3):
+        spool.append(f"batch-{i}".encode())
+    spool.ack(spool.peek(1))
+    spool.close()
+
+    reopened = Spool(str(tmp_path), segment_bytes=1024)
+    assert records(reopened) == [b"batch-1", b"batch-2"]
+    assert reopened.has_backlog.is_set()
+    reopened.append(b"batch-3")
+    assert records(reopened) == [b"batch-1", b"batch-2", b"batch-3"]
+
+def test_corrupt_record_is_skipped_on_recovery(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=1024)
+    spool.append(b"good")
+    spool.append(b"flipped")
+    segment = spool.segments[0]
+    second = RECORD_HEADER.size + len(b"good")
+    segment.map[second + RECORD_HEADER.size] ^= 0xFF
+    spool.close()
+
+    reopened = Spool(str(tmp_path), segment_bytes=1024)
+    assert records(reopened) == [b"good"]
+    assert reopened.get_stats()["corrupt_records"] == 1
+    # The damaged segment is closed for writes; new records go to a fresh one
+    reopened.append(b"next")
+    assert records(reopened) == [b"good", b"next"]
+
+def test_oldest_segment_is_evicted_past_max_bytes(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=64, max_bytes=128)
+    for i in range(6):
+        spool.append(bytes([i]) * 40)
+    stats = spool.get_stats()
+    assert stats["disk_bytes"] <= 128
+    assert stats["evicted_records"] == 4
+    assert [data[0] for data in records(spool)] == [4, 5]
@@ -0,0 +1,71 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from cycleroom.backend.utils.sqlite_storage import SQLiteStorage, partition_name, to_us, DAY_US
+from cycleroom.backend.utils.timescale_writer import frame_to_record
+
+T0 = datetime(2025, 2, 9, 23, 59, 58, tzinfo=timezone.utc)
+
+def make_frame(address="AA", offset=0.0, power=200, distance=1.0):
+    return {"device_address": address, "timestamp": T0 + timedelta(seconds=offset), "cadence": 90.0,
+            "heart_rate": 120.0, "power": power, "trip_distance": distance, "gear": 10}
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "cycleroom.db"), retention_days=100_000)
+    asyncio.run(storage.start())
+    yield storage
+    asyncio.run(storage.close())
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def insert(storage, frames):
+    return run(storage.insert_records([frame_to_record(frame) for frame in frames]))
+
+def test_inserts_split_by_day_and_are_idempotent(storage):
+    # Four seconds straddling midnight UTC
+    frames = [make_frame(offset=i, power=100 + i) for i in range(4)]
+    assert insert(storage, frames) == 4
+    assert insert(storage, frames) == 0
+    assert sorted(storage.partitions.values()) == [partition_name(to_us(T0) // DAY_US),
+                                                  partition_name(to_us(T0) // DAY_US + 1)]
+
+    rows = run(storage.get_historical_data("AA", None, None))
+    assert [row["power"] for row in rows] == [100, 101, 102, 103]
+    assert rows[0]["timestamp"] == T0
+
+def test_retention_drops_old_partitions(storage):
+    insert(storage, [make_frame()])
+    storage.retention_days = 1
+    assert run(storage.enforce_retention()) == 1
+    assert storage.partitions == {}
+    assert run(storage.get_historical_data("AA", None, None)) == []
+
+def test_batch_writer_flushes_into_storage(storage):
+    writer = storage.create_writers()["sqlite"]
+    writer.enqueue([make_frame(offset=i) for i in range(3)])
+    assert run(writer.flush()) == 3
+    assert writer.get_stats()["rows_written"] == 3
+    assert len(run(storage.get_historical_data("AA", None, None))) == 3
+
+def test_files_without_rooms_are_upgraded(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE bike_latest (bike_id TEXT PRIMARY KEY, timestamp INTEGER NOT NULL, cadence REAL, "
+                 "heart_rate REAL, power INTEGER, trip_distance REAL, gear INTEGER)")
+    conn.execute(f"CREATE TABLE {partition_name(to_us(T0) // DAY_US)} (bike_id TEXT NOT NULL, "
+                 "timestamp INTEGER NOT NULL, cadence REAL, heart_rate REAL, power INTEGER, trip_distance REAL, "
+                 "gear INTEGER, PRIMARY KEY (bike_id, timestamp)) WITHOUT ROWID")
+    conn.commit()
+    conn.close()
+    storage = SQLiteStorage(path, retention_days=100_000)
+    run(storage.start())
+    try:
+        assert insert(storage, [{**make_frame(), "room": "studio-1"}]) == 1
+        assert len(run(storage.get_historical_data("AA", None, None))) == 1
+    finally:
+        run(storage.close())
@@ -0,0 +1,149 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from cycleroom.backend.utils.storage import STORAGE_BACKENDS, Storage
+
+# Recent enough for the server backend's retention, on an even second for the bucket checks
+T0 = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+
+def make_frame(address, offset=0.0, power=200, distance=1.0):
+    return {"device_address": address, "timestamp": T0 + timedelta(seconds=offset), "cadence": 90.0,
+            "heart_rate": 120.0, "power": power, "trip_distance": distance, "gear": 10}
+
+def unique(prefix: str) -> str:
+    # The server backend keeps its data between runs
+    return f"{prefix}-{uuid.uuid4().hex[:8]}"
+
+def create_storage(backend: str, tmp_path) -> Storage:
+    if backend == "sqlite":
+        from cycleroom.backend.utils.sqlite_storage import SQLiteStorage
+        return SQLiteStorage(str(tmp_path / "cycleroom.db"), retention_days=100_000)
+    db_utils = pytest.importorskip("cycleroom.backend.utils.db_utils")
+    return db_utils.ServerStorage()
+
+async def server_reachable(storage: Storage) -> bool:
+    if not storage.available:
+        return False
+    if storage.name != "server":
+        return True
+    from cycleroom.backend.utils import db_utils
+    try:
+        db_utils.init_influx_client()
+        return await asyncio.to_thread(db_utils.client.ping)
+    except Exception:
+        return False
+
+@pytest.fixture(params=STORAGE_BACKENDS)
+def with_storage(request, tmp_path):
+    """Run `check(storage)` against a started backend, all in one event loop."""
+    def run(check):
+        async def main():
+            storage = create_storage(request.param, tmp_path)
+            await storage.start()
+            try:
+                if not await server_reachable(storage):
+                    pytest.skip(f"No database reachable for the {request.param} backend")
+                return await check(storage)
+            finally:
+                await storage.close()
+        return asyncio.run(main())
+    return run
+
+async def write(storage: Storage, frames: list):
+    """Write frames through the backend's own batch writers, as the ingest path does."""
+    for writer in storage.create_writers().values():
+        writer.enqueue([dict(frame) for frame in frames])
+        while await writer.flush():
+            pass
+
+def test_storage_is_abstract():
+    class PartialStorage(Storage):
+        available = True
+
+    with pytest.raises(TypeError):
+        PartialStorage()
+
+def test_range_and_stream(with_storage):
+    bike, other = unique("AA"), unique("BB")
+
+    async def check(storage):
+        await write(storage, [make_frame(bike, offset=i, power=i) for i in range(10)])
+        await write(storage, [make_frame(other, offset=i) for i in range(10)])
+
+        rows = await storage.get_historical_data(bike, T0 + timedelta(seconds=2), T0 + timedelta(seconds=5))
+        assert [row["power"] for row in rows] == [2, 3, 4, 5]
+
+        chunks = [[row["power"] for row in chunk]
+                  async for chunk in storage.stream_historical_data(bike, None, None, 4)]
+        assert chunks == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+        assert await storage.get_historical_span(bike, None, None) == (T0, T0 + timedelta(seconds=9))
+        assert await storage.get_historical_span(unique("ZZ"), None, None) == (None, None)
+    with_storage(check)
+
+def test_bucketed_aggregates(with_storage):
+    bike = unique("AA")
+
+    async def check(storage):
+        await write(storage, [make_frame(bike, offset=i, power=i * 10, distance=i) for i in range(6)])
+        buckets = await storage.get_bucketed_historical_data(bike, None, None, timedelta(seconds=2))
+        # T0 is on an even second, so buckets hold seconds (0, 1), (2, 3), (4, 5)
+        assert [bucket["samples"] for bucket in buckets] == [2, 2, 2]
+        assert [bucket["max_power"] for bucket in buckets] == [10, 30, 50]
+        assert [bucket["avg_power"] for bucket in buckets] == [5, 25, 45]
+        assert [bucket["trip_distance"] for bucket in buckets] == [1, 3, 5]
+        assert buckets[1]["timestamp"] == T0 + timedelta(seconds=2)
+    with_storage(check)
+
+def test_latest_bike_data_keeps_newest_frame(with_storage):
+    bike, old = unique("AA"), unique("OLD")
+
+    async def check(storage):
+        now = datetime.now(timezone.utc)
+        await write(storage, [{**make_frame(bike, distance=1.0), "timestamp": now - timedelta(seconds=1)},
+                              {**make_frame(bike, distance=2.0), "timestamp": now, "room": "studio-2"},
+                              {**make_frame(old), "timestamp": now - timedelta(hours=1)}])
+        latest = await storage.get_latest_bike_data()
+        assert old not in latest
+        assert latest[bike]["trip_distance"] == 2.0
+        # Same shape as frames from the ingest path
+        assert "distance" not in latest[bike]
+        assert latest[bike]["device_address"] == bike
+        assert latest[bike]["room"] == "studio-2"
+    with_storage(check)
+
+def test_selections_and_mappings(with_storage):
+    first, second, mapped = unique("1"), unique("2"), unique("7")
+
+    async def check(storage):
+        await storage.save_bike_selection(first, "AA")
+        await storage.save_bike_selection(second, "BB")
+        await storage.save_bike_selection(first, "CC")
+        selections = {row["bike_number"]: row["device_address"]
+                      for row in await storage.get_latest_bike_selections()}
+        assert (selections[first], selections[second]) == ("CC", "BB")
+
+        assert await storage.save_bike_mapping(mapped, "AA")
+        mappings = [dict(row) for row in await storage.get_bike_mappings()]
+        assert {"bike_number": mapped, "device_address": "AA"} in mappings
+    with_storage(check)
+
+def test_session_checkpoints(with_storage):
+    session_id = unique("s1")
+
+    async def check(storage):
+        session = {"session_id": session_id, "name": "Spin", "started_at": T0, "ended_at": None,
+                   "settings": {"ftp": 250}}
+        await storage.checkpoint_session(session, {"AA": {"frames": 3}, "BB": {"frames": 1}})
+        await storage.checkpoint_session({**session, "ended_at": T0 + timedelta(hours=1)}, {"AA": {"frames": 9}})
+
+        stored = await storage.get_session(session_id)
+        assert stored["session"]["ended_at"] == T0 + timedelta(hours=1)
+        assert stored["session"]["settings"] == {"ftp": 250}
+        assert stored["riders"] == {"AA": {"frames": 9}, "BB": {"frames": 1}}
+        assert session_id in [row["session_id"] for row in await storage.list_sessions()]
+        assert await storage.get_session(unique("missing")) is None
+    with_storage(check)
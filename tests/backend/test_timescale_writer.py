@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timezone
+
+from cycleroom.backend.utils.timescale_writer import TimescaleBatchWriter, frame_to_record
+
+TIMESTAMP = datetime(2025, 2, 9, 17, 11, 56, 250000, tzinfo=timezone.utc)
+
+def make_frame(address="E5:5E:F0:73:F2:7A", power=250):
+    return {"device_address": address, "timestamp": TIMESTAMP, "cadence": 90.5, "heart_rate": 120.0,
+            "power": power, "caloric_burn": 12, "duration": 330, "trip_distance": 1.6, "gear": 12}
+
+class FakeConnection:
+    """Mimics the staging-table COPY + ON CONFLICT DO NOTHING round trip."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.rows = {}
+        self.staged = []
+        self.queries = []
+
+    def transaction(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.staged = []
+        return False
+
+    async def copy_records_to_table(self, table, records, columns):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection reset")
+        self.staged = list(records)
+
+    async def execute(self, query):
+        self.queries.append(query)
+        if not query.startswith("INSERT"):
+            return "CREATE TABLE"
+        inserted = 0
+        for record in self.staged:
+            if record[:2] not in self.rows:
+                self.rows[record[:2]] = record
+                inserted += 1
+        return f"INSERT 0 {inserted}"
+
+class FakePool:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def acquire(self):
+        return self.connection
+
+def drain(writer):
+    async def run():
+        while await writer.flush():
+            pass
+    asyncio.run(run())
+
+def test_frame_to_record_accepts_iso_timestamps():
+    record = frame_to_record({**make_frame(), "timestamp": TIMESTAMP.isoformat()})
+    assert record == ("E5:5E:F0:73:F2:7A", TIMESTAMP, 90.5, 120.0, 250, 1.6, 12, None)
+
+def test_replayed_batch_is_not_inserted_twice():
+    connection = FakeConnection()
+    writer = TimescaleBatchWriter(lambda: FakePool(connection), batch_size=2)
+    frames = [make_frame(address=f"bike-{i}") for i in range(3)]
+    writer.enqueue(frames)
+    drain(writer)
+    writer.enqueue(frames)
+    drain(writer)
+
+    stats = writer.get_stats()
+    assert len(connection.rows) == 3
+    assert stats["rows_written"] == 3
+    assert stats["rows_skipped"] == 3
+    assert stats["batches"] == 4
+
+def test_writer_never_changes_the_schema():
+    connection = FakeConnection()
+    writer = TimescaleBatchWriter(lambda: FakePool(connection), batch_size=1)
+    writer.enqueue([make_frame(address=f"bike-{i}") for i in range(2)])
+    drain(writer)
+    assert not [query for query in connection.queries if "INDEX" in query]
+    assert all(query.endswith("ON CONFLICT (bike_id, timestamp) DO NOTHING")
+               for query in connection.queries if query.startswith("INSERT"))
+
+def test_plain_insert_without_unique_index():
+    connection = FakeConnection()
+    writer = TimescaleBatchWriter(lambda: FakePool(connection), has_unique_index=lambda: False)
+    writer.enqueue([make_frame()])
+    drain(writer)
+    inserts = [query for query in connection.queries if query.startswith("INSERT")]
+    assert inserts and "ON CONFLICT" not in inserts[0]
+    assert writer.get_stats()["rows_written"] == 1
+
+def test_batch_is_retried_then_requeued():
+    connection = FakeConnection(failures=3)
+    writer = TimescaleBatchWriter(lambda: FakePool(connection), max_retries=1, retry_backoff=0)
+    writer.enqueue([make_frame(address=f"bike-{p}", power=p) for p in range(3)])
+
+    assert asyncio.run(writer.flush()) == 0
+    stats = writer.get_stats()
+    assert stats["retries"] == 1 and stats["errors"] == 1
+    assert [frame["power"] for frame in writer.pending] == [0, 1, 2]
+
+    # Third attempt fails, the retry succeeds
+    assert asyncio.run(writer.flush()) == 3
+    assert len(connection.rows) == 3
+
+def test_missing_pool_keeps_frames():
+    writer = TimescaleBatchWriter(lambda: None, max_retries=0)
+    writer.enqueue([make_frame()])
+    assert asyncio.run(writer.flush()) == 0
+    assert writer.get_stats()["pending"] == 1
@@ -0,0 +1,16 @@
+
+import pytest
+from cycleroom.backend.wire_format import decode_records, encode_records
+
+def test_records_round_trip():
+    records = [
+        ("E5:5E:F0:73:F2:7A", 1_700_000_000_123_456_789, bytes(range(19))),
+        ("0F2C6B1E-UUID-STYLE-ADDRESS", 1, bytes(17)),
+    ]
+    decoded = [(address, ts, bytes(payload)) for address, ts, payload in decode_records(encode_records(records))]
+    assert decoded == records
+
+def test_truncated_message_is_rejected():
+    message = encode_records([("AA", 1, bytes(17))])
+    with pytest.raises(ValueError):
+        list(decode_records(message[:-1]))